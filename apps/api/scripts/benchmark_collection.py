@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""采集阶段离线压测脚本。
+
+启动本地模拟提供商（search/tools/mock_providers.py），将各渠道的 base_url 指向模拟服务器，
+以给定并发对一批合成降雨事件调用 ``SearchWorkflow._collect_sources``，输出吞吐量、
+单事件采集耗时分位数与各提供商的请求/状态码统计。不消耗任何真实 API 配额。
+
+使用方法：
+    # 默认：40 个事件，4 个事件并发，全部渠道
+    python apps/api/scripts/benchmark_collection.py
+
+    # 长尾延迟 + 5% 错误率 + 每提供商每秒 5 次（超出返回 429）
+    python apps/api/scripts/benchmark_collection.py --events 100 --concurrency 8 \\
+        --latency-ms 300 --p99-ms 3000 --error-rate 0.05 --rate-limit 5
+
+    # 只压测部分渠道，并启用客户端限流/配额（RATE_LIMIT_ENABLED）
+    python apps/api/scripts/benchmark_collection.py --channels official,news_thenewsapi --client-rate-limit
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 文件在 apps/api/scripts/ 下，向上 3 级为项目根目录
+project_root = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(project_root))
+
+from search.collectors.loader import CollectorLoader
+from search.config.settings import settings
+from search.orchestrator.workflow import EventContext, SearchWorkflow
+from search.query.channel_plan import get_channel_plan
+from search.tools.mock_providers import add_behavior_arguments, cluster_from_args
+from search.watcher.rain_event_watcher import RainEvent
+
+logger = logging.getLogger("benchmark_collection")
+
+# 合成事件使用的地点（覆盖不同的主要语言，使查询计划包含英语与本地语言）
+_LOCATIONS = [
+    ("Valencia", "Spain", 39.47, -0.38),
+    ("Porto Alegre", "Brazil", -30.03, -51.23),
+    ("Dhaka", "Bangladesh", 23.81, 90.41),
+    ("Lagos", "Nigeria", 6.52, 3.38),
+    ("Emilia-Romagna", "Italy", 44.49, 11.34),
+    ("Zhengzhou", "China", 34.75, 113.63),
+]
+
+
+def _percentile(values, q: float) -> float:
+    """最近秩分位数；空列表返回 0。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _synthetic_events(count: int):
+    event_time = datetime.utcnow() - timedelta(hours=12)
+    for index in range(count):
+        location, country, latitude, longitude = _LOCATIONS[index % len(_LOCATIONS)]
+        yield RainEvent(
+            event_id=f"bench_{index:04d}",
+            event_time=event_time,
+            location_name=location,
+            country=country,
+            latitude=latitude,
+            longitude=longitude,
+            rainfall_mm=60.0 + (index % 5) * 30,
+            severity="high",
+            data_source="benchmark",
+        )
+
+
+def _load_collectors(config, channel_names):
+    """直接构造指定渠道的采集器（不受 collector_config.json 启用状态影响）。"""
+    loader = CollectorLoader(config)
+    collectors = {}
+    for category, registry in CollectorLoader.COLLECTOR_REGISTRY.items():
+        for name in registry:
+            if name not in channel_names:
+                continue
+            collector = loader.instantiate(category, name)
+            if collector is None:
+                continue
+            # Tavily SDK 会直连 api.tavily.com，压测时强制走 REST 路径
+            if hasattr(collector, "_has_sdk"):
+                collector._has_sdk = False
+            collectors[name] = collector
+    return collectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="采集阶段离线压测（本地模拟提供商）")
+    parser.add_argument("--events", type=int, default=40, help="合成事件数（默认 40）")
+    parser.add_argument("--concurrency", type=int, default=4, help="同时采集的事件数（默认 4）")
+    parser.add_argument("--channels", type=str, default=None, help="逗号分隔的渠道名（默认全部）")
+    parser.add_argument(
+        "--client-rate-limit",
+        action="store_true",
+        help="启用客户端限流与配额（RATE_LIMIT_ENABLED），默认关闭以测量提供商侧 429",
+    )
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    parser.add_argument("--log-level", type=str, default="WARNING", help="日志级别（默认 WARNING）")
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.WARNING),
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    channel_names = set(args.channels.split(",")) if args.channels else {
+        name for registry in CollectorLoader.COLLECTOR_REGISTRY.values() for name in registry
+    }
+    scratch = tempfile.TemporaryDirectory(prefix="collect-bench-")
+    config = settings.model_copy(
+        update={
+            "SEARCH_CACHE_ENABLED": False,
+            "SEARCH_CACHE_DIR": Path(scratch.name),
+            "RATE_LIMIT_ENABLED": args.client_rate_limit,
+            "TAVILY_API_KEY": "mock",
+            "THENEWSAPI_KEY": "mock",
+            "GNEWS_API_KEY": "mock",
+            "SERPAPI_KEY": "mock",
+            "YOUTUBE_API_KEY": "mock",
+            "X_BEARER_TOKEN": "mock",
+            "INSTAGRAM_ACCESS_TOKEN": "mock",
+        }
+    )
+
+    with cluster_from_args(args) as cluster:
+        base_urls = cluster.channel_base_urls()
+        workflow = SearchWorkflow(config)
+        workflow._collectors = _load_collectors(config, channel_names)
+        workflow._collectors_version = get_channel_plan().version
+
+        contexts = []
+        for event in _synthetic_events(args.events):
+            context = EventContext(rain_event=event)
+            context.location_profile = workflow._resolve_location(event)
+            context.query_plan = workflow._build_query_plan(context)
+            for name, channel in (context.query_plan.get("channels") or {}).items():
+                channel["enabled"] = name in workflow._collectors
+                if name in base_urls:
+                    channel["base_url"] = base_urls[name]
+            contexts.append(context)
+
+        def run(context):
+            started = time.perf_counter()
+            try:
+                results = workflow._collect_sources(context)
+            finally:
+                for stream in context.source_streams.values():
+                    stream.close()
+                context.source_streams.clear()
+            return time.perf_counter() - started, sum(len(items) for items in results.values())
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            outcomes = list(pool.map(run, contexts))
+        elapsed = time.perf_counter() - started
+        provider_stats = cluster.stats()
+
+    scratch.cleanup()
+    latencies = [seconds for seconds, _ in outcomes]
+    items = [count for _, count in outcomes]
+    requests_total = sum(stats.get("requests", 0) for stats in provider_stats.values())
+    report = {
+        "events": len(outcomes),
+        "concurrency": args.concurrency,
+        "collectors": sorted(workflow._collectors),
+        "wall_seconds": round(elapsed, 3),
+        "events_per_second": round(len(outcomes) / elapsed, 3) if elapsed else 0.0,
+        "requests_per_second": round(requests_total / elapsed, 3) if elapsed else 0.0,
+        "event_latency_seconds": {
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "max": round(max(latencies, default=0.0), 3),
+        },
+        "items_per_event": round(sum(items) / len(items), 1) if items else 0.0,
+        "empty_events": sum(1 for count in items if count == 0),
+        "providers": provider_stats,
+    }
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print("=" * 60)
+    print(f"采集器: {', '.join(report['collectors'])}")
+    print(f"事件数: {report['events']}（并发 {report['concurrency']}），总耗时 {report['wall_seconds']:.2f}s")
+    print(f"吞吐量: {report['events_per_second']:.2f} 事件/s，{report['requests_per_second']:.2f} 请求/s")
+    latency = report["event_latency_seconds"]
+    print(
+        f"单事件采集耗时: p50 {latency['p50']:.2f}s  p95 {latency['p95']:.2f}s  "
+        f"p99 {latency['p99']:.2f}s  max {latency['max']:.2f}s"
+    )
+    print(f"平均条目数: {report['items_per_event']}，无结果事件: {report['empty_events']}")
+    print("-" * 60)
+    for provider, stats in provider_stats.items():
+        if not stats.get("requests"):
+            continue
+        statuses = "  ".join(f"{key}: {value}" for key, value in sorted(stats.items()) if key != "requests")
+        print(f"{provider:<12} 请求 {stats['requests']:<6} {statuses}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
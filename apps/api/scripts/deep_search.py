@@ -16,15 +16,29 @@
 
     # 从JSON创建事件（用于API调用）
     python apps/api/scripts/deep_search.py --json '{"id":"...","date":"...",...}'
+
+    # 忽略检查点，所有阶段重新执行
+    python apps/api/scripts/deep_search.py --event-id "20251011_Valencia_1" --no-checkpoint
+
+    # 常驻模式：按 POLL_INTERVAL_SECONDS 轮询并处理待处理事件（Ctrl+C 退出）
+    python apps/api/scripts/deep_search.py --daemon --workers 4
+
+    # 输出冷启动耗时（核心模块导入、各采集器导入与构造）
+    python apps/api/scripts/deep_search.py --json '...' --profile-startup
 """
 
 import argparse
+import atexit
 import json
 import logging
 import os
 import sys
+import time
 from pathlib import Path
 
+# 启动计时起点（--profile-startup 使用）
+_STARTUP_T0 = time.perf_counter()
+
 # 添加项目根目录到 Python 路径
 # 文件现在在 apps/api/scripts/deep_search.py，需要向上3级到项目根目录
 project_root = Path(__file__).resolve().parents[3]
@@ -39,6 +53,8 @@ from search.orchestrator.workflow import SearchWorkflow
 from search.utils.detailed_logger import get_detailed_logger, reset_detailed_logger
 from search.watcher.rain_event_watcher import RainEvent, RainEventWatcher
 
+_CORE_IMPORT_SECONDS = time.perf_counter() - _STARTUP_T0
+
 # 配置日志
 def get_log_level(level_str: str) -> int:
     """将字符串日志级别转换为 logging 常量。"""
@@ -93,6 +109,24 @@ def create_event_from_dict(data: dict) -> RainEvent:
     )
 
 
+def log_startup_profile(workflow: SearchWorkflow, workflow_seconds: float) -> None:
+    """输出冷启动各阶段耗时（写入日志/stderr，不影响 stdout 的 JSON 结果）。"""
+    from search.collectors.loader import CollectorLoader
+
+    logger.info("=" * 60)
+    logger.info("启动耗时分析")
+    logger.info("  核心模块导入: %.0f ms", _CORE_IMPORT_SECONDS * 1000)
+    logger.info("  SearchWorkflow 初始化: %.0f ms", workflow_seconds * 1000)
+    profile = CollectorLoader.import_profile
+    for name, timing in sorted(profile.items(), key=lambda pair: -sum(pair[1].values())):
+        logger.info("  采集器 %s: 导入 %.0f ms，构造 %.0f ms", name, timing["import"] * 1000, timing["init"] * 1000)
+    skipped = [name for name in (workflow._collectors or {}) if name not in profile]
+    if skipped:
+        logger.info("  未加载的采集器（渠道未启用）: %s", ", ".join(skipped))
+    logger.info("  总运行时间: %.0f ms", (time.perf_counter() - _STARTUP_T0) * 1000)
+    logger.info("=" * 60)
+
+
 def main():
     parser = argparse.ArgumentParser(description="测试搜索流程")
     parser.add_argument(
@@ -110,6 +144,32 @@ def main():
         type=str,
         help="从 JSON 字符串创建事件（用于直接测试）",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="绕过采集器响应缓存，强制重新请求各搜索 API",
+    )
+    parser.add_argument(
+        "--no-checkpoint",
+        action="store_true",
+        help="不读写事件检查点，所有阶段重新执行",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="常驻模式：定时轮询待处理事件并交给工作线程处理（多个进程可同时运行，同一事件只处理一次）",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="常驻模式的工作线程数（默认 DAEMON_WORKERS）",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="运行结束时输出模块导入与各采集器加载耗时（写入日志，不影响 stdout）",
+    )
     parser.add_argument(
         "--log-file",
         type=str,
@@ -131,7 +191,23 @@ def main():
     logger.info(f"日志级别: {settings.LOG_LEVEL}")
     logger.info("=" * 60)
     
-    workflow = SearchWorkflow()
+    workflow_started = time.perf_counter()
+    overrides = {}
+    if args.no_cache:
+        logger.info("【NO CACHE】本次运行不读写采集器响应缓存")
+        overrides["SEARCH_CACHE_ENABLED"] = False
+    if args.no_checkpoint:
+        logger.info("【NO CHECKPOINT】本次运行不读写事件检查点")
+        overrides["CHECKPOINT_ENABLED"] = False
+    workflow = SearchWorkflow(settings.model_copy(update=overrides)) if overrides else SearchWorkflow()
+    if args.profile_startup:
+        atexit.register(log_startup_profile, workflow, time.perf_counter() - workflow_started)
+    
+    if args.daemon:
+        from search.watcher.daemon import WatcherDaemon
+
+        WatcherDaemon(workflow.config, workers=args.workers, workflow=workflow).run()
+        return 0
     
     if args.json:
         # 从 JSON 字符串创建事件
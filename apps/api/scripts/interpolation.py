@@ -52,13 +52,14 @@ def is_epsg3035_coordinates(x, y):
     return x > 1000000 and y > 1000000
 
 def transform_coordinates_batch(x_coords, y_coords):
-    """批量将EPSG:3035坐标转换为WGS84（经纬度）"""
+    """批量将EPSG:3035坐标转换为WGS84（经纬度），返回 (lons, lats) 数组"""
     try:
+        import numpy as np
         import pyproj
         transformer = pyproj.Transformer.from_crs("epsg:3035", "epsg:4326", always_xy=True)
-        # 批量转换，效率更高
-        transformed_coords = [transformer.transform(float(x), float(y)) for x, y in zip(x_coords, y_coords)]
-        return transformed_coords
+        # 整列数组一次转换，不生成逐点元组
+        lons, lats = transformer.transform(np.asarray(x_coords, dtype='float64'), np.asarray(y_coords, dtype='float64'))
+        return lons, lats
     except ImportError:
         return None
     except Exception:
@@ -136,6 +137,728 @@ def _estimate_return_period(r: float, t2: Optional[float], t5: Optional[float],
     rp = 20.0 + max(0.0, (r - t20) / step) * 15.0
     return band, rp
 
+_COUNTRY_CODE_TO_NAME = {
+    'ES': 'Spain', 'PT': 'Portugal', 'FR': 'France', 'DE': 'Germany', 'IT': 'Italy',
+    'NO': 'Norway', 'SE': 'Sweden', 'FI': 'Finland', 'DK': 'Denmark', 'NL': 'Netherlands',
+    'BE': 'Belgium', 'LU': 'Luxembourg', 'IE': 'Ireland', 'GB': 'United Kingdom',
+    'UK': 'United Kingdom', 'HR': 'Croatia', 'RO': 'Romania', 'BG': 'Bulgaria',
+    'GR': 'Greece', 'PL': 'Poland', 'CZ': 'Czechia', 'AT': 'Austria'
+}
+
+# 输出模式 -> 默认文件扩展名
+_OUTPUT_EXTENSIONS = {
+    'json': '.json',
+    'ndjson': '.ndjson',
+    'flatgeobuf': '.fgb',
+    'geoparquet': '.parquet',
+    'mvt': '_tiles',  # 目录：{z}/{x}/{y}.pbf
+    'pmtiles': '.pmtiles',
+}
+
+# 多边形聚合统计列（aggregate_mode=stats）与聚类列
+_AGGREGATE_COLUMNS = ['exceed_count', 'area_fraction', 'mean_value', 'max_value', 'max_return_period',
+                      'centroid_lon', 'centroid_lat', 'cluster_id']
+
+# 瓦片输出模式（不受 max_points 限制，按缩放级别抽稀）
+_TILE_FORMATS = ('mvt', 'pmtiles')
+_MVT_EXTENT = 4096
+_MVT_LAYER_NAME = 'exceedance_points'
+
+# 内部点表类型：行政区等重复字符串列使用 category（整数编码）；坐标、值与阈值列保持 float64，
+# 阈值比较与输出数字与原始流程完全一致
+_POINT_CATEGORY_COLUMNS = ('return_period_band', 'province_name', 'city_name', 'country_code', 'country_name')
+
+def _compact_point_table(df, category_columns=()):
+    """就地压缩点表列类型（逐列替换，不复制整表）：指定字符串列转 category"""
+    for c in category_columns:
+        if c in df.columns and df[c].dtype == object:
+            df[c] = df[c].astype('category')
+    return df
+
+def _float_list(series) -> List[Optional[float]]:
+    """列转 Python float 列表（NaN 为 None）"""
+    arr = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64')
+    return [None if v != v else v for v in arr.tolist()]
+
+def _iter_point_items(final_points, grid_rp_for_filter: str):
+    """逐行生成输出点字典（JSON/NDJSON 共用），不在内存中累积整个列表"""
+    columns = final_points.columns
+    extra_cols = [c for c in dict.fromkeys(['threshold_2y', 'threshold_5y', 'threshold_20y', f'threshold_{grid_rp_for_filter}', 'return_period_band']) if c in columns]
+    agg_cols = [c for c in _AGGREGATE_COLUMNS if c in columns]
+    # 按列一次性转换，逐行只做拼装（避免 iterrows 为每行构造 Series）
+    lons = _float_list(final_points['longitude'])
+    lats = _float_list(final_points['latitude'])
+    values = _float_list(final_points['value'])
+    extras = {}
+    for c in extra_cols:
+        if pd.api.types.is_numeric_dtype(final_points[c]):
+            extras[c] = _float_list(final_points[c])
+        else:
+            extras[c] = [str(v) if pd.notna(v) else None for v in final_points[c].tolist()]
+    aggs = {}
+    for c in agg_cols:
+        col = _float_list(final_points[c])
+        aggs[c] = [int(v) if v is not None else None for v in col] if c in ('exceed_count', 'cluster_id') else col
+    regions = {}
+    for c in ('province_name', 'city_name', 'country_code'):
+        if c in columns:
+            regions[c] = [str(v) if pd.notna(v) else None for v in final_points[c].tolist()]
+    for i in range(len(final_points)):
+        item = {
+            "longitude": lons[i],
+            "latitude": lats[i],
+            "value": values[i]
+        }
+        # 附加阈值/重现期信息（如有）
+        for c, col in extras.items():
+            if col[i] is not None:
+                item[c] = col[i]
+        # 附加聚合统计/聚类信息（如有）
+        for c, col in aggs.items():
+            if col[i] is not None:
+                item[c] = col[i]
+        # 附加行政区（如果有）
+        if 'province_name' in regions and regions['province_name'][i] is not None:
+            item['province_name'] = regions['province_name'][i]
+        if 'city_name' in regions and regions['city_name'][i] is not None:
+            item['city_name'] = regions['city_name'][i]
+        if 'country_code' in regions and regions['country_code'][i] is not None:
+            code = regions['country_code'][i]
+            item['country_code'] = code
+            item['country_name'] = _COUNTRY_CODE_TO_NAME.get(code, code)
+        yield item
+
+def _write_stdout_json(result: Dict[str, Any]):
+    """以 UTF-8 输出单个 JSON 文档到 stdout"""
+    try:
+        # 使用 UTF-8 明确输出，避免 Windows 上 GBK 编码报错
+        sys.stdout.buffer.write(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.flush()
+    except Exception:
+        # 退化到安全替代：强制 ASCII 转义，保证不中断
+        fallback = json.dumps(result, ensure_ascii=True)
+        sys.stdout.buffer.write(fallback.encode('ascii', errors='ignore'))
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.flush()
+
+def _write_ndjson(stream, items, flush_every: int = 1000):
+    """将点逐行写为 NDJSON（每行一个 JSON 对象），按块刷新以便下游边读边处理"""
+    count = 0
+    for item in items:
+        stream.write(json.dumps(item, ensure_ascii=False).encode('utf-8'))
+        stream.write(b"\n")
+        count += 1
+        if count % flush_every == 0:
+            stream.flush()
+    stream.flush()
+    return count
+
+def _write_geo_file(final_points, output_file: str, output_format: str, grid_rp_for_filter: str):
+    """将点集写为 FlatGeobuf（带空间索引）或 GeoParquet 文件"""
+    try:
+        import geopandas as gpd
+    except ImportError:
+        raise ImportError("Missing dependency: geopandas. Please install: pip install geopandas pyarrow")
+    keep_cols = ['longitude', 'latitude', 'value', 'threshold_2y', 'threshold_5y', 'threshold_20y',
+                 f'threshold_{grid_rp_for_filter}', 'return_period_band', 'province_name', 'city_name', 'country_code'] + _AGGREGATE_COLUMNS
+    # 去重（grid_rp_for_filter 对应列可能与 threshold_2y 等重复）
+    keep_cols = [c for c in dict.fromkeys(keep_cols) if c in final_points.columns]
+    attrs = pd.DataFrame(final_points[keep_cols]).reset_index(drop=True)
+    if output_format == 'flatgeobuf':
+        # OGR 字段不支持 category，写出前还原为字符串
+        for c in attrs.columns:
+            if isinstance(attrs[c].dtype, pd.CategoricalDtype):
+                attrs[c] = attrs[c].astype(object)
+    if 'country_code' in attrs.columns:
+        attrs['country_name'] = attrs['country_code'].map(
+            lambda x: _COUNTRY_CODE_TO_NAME.get(str(x), str(x)) if pd.notna(x) else None
+        )
+    gdf = gpd.GeoDataFrame(
+        attrs,
+        geometry=gpd.points_from_xy(attrs['longitude'], attrs['latitude']),
+        crs="EPSG:4326"
+    )
+    out_dir = os.path.dirname(os.path.abspath(output_file))
+    os.makedirs(out_dir, exist_ok=True)
+    if output_format == 'flatgeobuf':
+        # FlatGeobuf 自带打包 Hilbert R-Tree 空间索引，可按 bbox 局部读取
+        gdf.to_file(output_file, driver='FlatGeobuf', SPATIAL_INDEX='YES')
+    elif output_format == 'geoparquet':
+        gdf.to_parquet(output_file, index=False)
+    else:
+        raise ValueError(f"Unsupported geo output format: {output_format}")
+
+def _tile_coordinates(lons, lats, zoom: int):
+    """经纬度 -> Web Mercator 瓦片坐标（浮点，整数部分为瓦片号，小数部分为瓦片内位置）"""
+    import numpy as np
+    n = float(2 ** zoom)
+    lons = np.asarray(lons, dtype='float64')
+    lats = np.clip(np.asarray(lats, dtype='float64'), -85.05112878, 85.05112878)
+    lat_rad = np.radians(lats)
+    tx = (lons + 180.0) / 360.0 * n
+    ty = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / np.pi) / 2.0 * n
+    # 边界点归入最后一个瓦片
+    np.clip(tx, 0.0, n - 1e-9, out=tx)
+    np.clip(ty, 0.0, n - 1e-9, out=ty)
+    return tx, ty
+
+def _thin_by_value(tx, ty, values, bin_pixels: float):
+    """按屏幕像素网格抽稀：每个 bin_pixels×bin_pixels 像素格只保留值最大的点。返回保留点的位置索引"""
+    import numpy as np
+    cells_per_tile = 256.0 / max(float(bin_pixels), 1e-6)
+    gx = np.floor(tx * cells_per_tile).astype('int64')
+    gy = np.floor(ty * cells_per_tile).astype('int64')
+    # 值降序（NaN 排最后），同格内第一次出现的即为最大值点
+    order = np.argsort(-np.nan_to_num(values, nan=-np.inf), kind='stable')
+    keys = np.stack([gx[order], gy[order]], axis=1)
+    _, first = np.unique(keys, axis=0, return_index=True)
+    return np.sort(order[first])
+
+def _iter_vector_tiles(final_points, grid_rp_for_filter: str, min_zoom: int, max_zoom: int, bin_pixels: float):
+    """生成 (z, x, y, pbf_bytes, feature_count)；低于 max_zoom 的层级按值抽稀，max_zoom 保留全部点"""
+    import numpy as np
+    try:
+        import mapbox_vector_tile
+    except ImportError:
+        raise ImportError("Missing dependency: mapbox-vector-tile. Please install: pip install mapbox-vector-tile")
+    prop_cols = ['value', 'threshold_2y', 'threshold_5y', 'threshold_20y', f'threshold_{grid_rp_for_filter}',
+                 'return_period_band', 'province_name', 'city_name', 'country_code'] + _AGGREGATE_COLUMNS
+    prop_cols = [c for c in dict.fromkeys(prop_cols) if c in final_points.columns]
+    attrs = pd.DataFrame(final_points[prop_cols]).reset_index(drop=True)
+    lons = final_points['longitude'].to_numpy(dtype='float64')
+    lats = final_points['latitude'].to_numpy(dtype='float64')
+    values = pd.to_numeric(final_points['value'], errors='coerce').to_numpy(dtype='float64')
+    for z in range(min_zoom, max_zoom + 1):
+        tx, ty = _tile_coordinates(lons, lats, z)
+        keep = np.arange(len(lons)) if z >= max_zoom else _thin_by_value(tx, ty, values, bin_pixels)
+        tile_x = np.floor(tx[keep]).astype('int64')
+        tile_y = np.floor(ty[keep]).astype('int64')
+        px = np.floor((tx[keep] - tile_x) * _MVT_EXTENT).astype('int64')
+        py = np.floor((ty[keep] - tile_y) * _MVT_EXTENT).astype('int64')
+        # 按瓦片分组（一次排序，切片取各组）
+        tile_order = np.lexsort((tile_y, tile_x))
+        tile_keys = np.stack([tile_x[tile_order], tile_y[tile_order]], axis=1)
+        uniq, starts = np.unique(tile_keys, axis=0, return_index=True)
+        bounds = list(starts) + [len(tile_order)]
+        for i, (x, y) in enumerate(uniq):
+            sel = tile_order[bounds[i]:bounds[i + 1]]
+            records = attrs.iloc[keep[sel]].to_dict('records')
+            features = []
+            for j, rec in zip(sel, records):
+                props = {}
+                for k, v in rec.items():
+                    if v is None or (isinstance(v, float) and np.isnan(v)):
+                        continue
+                    props[k] = float(v) if isinstance(v, (int, float, np.floating, np.integer)) else str(v)
+                if 'country_code' in props:
+                    props['country_name'] = _COUNTRY_CODE_TO_NAME.get(props['country_code'], props['country_code'])
+                features.append({"geometry": f"POINT({int(px[j])} {int(py[j])})", "properties": props})
+            data = mapbox_vector_tile.encode(
+                [{"name": _MVT_LAYER_NAME, "features": features}],
+                default_options={"extents": _MVT_EXTENT, "y_coord_down": True},
+            )
+            yield z, int(x), int(y), data, len(features)
+
+def _write_vector_tiles(final_points, output_path: str, output_format: str, grid_rp_for_filter: str,
+                        min_zoom: int, max_zoom: int, bin_pixels: float) -> Dict[str, Any]:
+    """写出 MVT 目录（{z}/{x}/{y}.pbf + metadata.json）或 PMTiles 单文件归档，返回瓦片统计"""
+    import gzip
+    stats = {"tiles": 0, "features_per_zoom": {}, "min_zoom": min_zoom, "max_zoom": max_zoom, "layer": _MVT_LAYER_NAME}
+    if len(final_points) > 0:
+        bbox = [float(final_points['longitude'].min()), float(final_points['latitude'].min()),
+                float(final_points['longitude'].max()), float(final_points['latitude'].max())]
+    else:
+        bbox = [-180.0, -85.0, 180.0, 85.0]
+    stats["bounds"] = bbox
+    tiles = _iter_vector_tiles(final_points, grid_rp_for_filter, min_zoom, max_zoom, bin_pixels)
+    if output_format == 'mvt':
+        import shutil
+        import tempfile
+        # 写入同级临时目录后整体替换，上次运行的瓦片不会残留（也不会出现新旧混合的目录）
+        output_path = os.path.abspath(output_path)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=os.path.basename(output_path) + '.tmp-', dir=os.path.dirname(output_path))
+        try:
+            for z, x, y, data, n in tiles:
+                tile_dir = os.path.join(staging, str(z), str(x))
+                os.makedirs(tile_dir, exist_ok=True)
+                with open(os.path.join(tile_dir, f"{y}.pbf"), 'wb') as fp:
+                    fp.write(data)
+                stats["tiles"] += 1
+                stats["features_per_zoom"][z] = stats["features_per_zoom"].get(z, 0) + n
+            with open(os.path.join(staging, 'metadata.json'), 'w', encoding='utf-8') as fp:
+                json.dump({"format": "pbf", "minzoom": min_zoom, "maxzoom": max_zoom, "bounds": bbox,
+                           "vector_layers": [{"id": _MVT_LAYER_NAME}]}, fp, ensure_ascii=False)
+            if os.path.exists(output_path):
+                retired = staging + '.old'
+                os.rename(output_path, retired)
+                os.rename(staging, output_path)
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                os.rename(staging, output_path)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return stats
+    try:
+        from pmtiles.tile import zxy_to_tileid, TileType, Compression
+        from pmtiles.writer import Writer
+    except ImportError:
+        raise ImportError("Missing dependency: pmtiles. Please install: pip install pmtiles")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'wb') as fp:
+        writer = Writer(fp)
+        # PMTiles 要求按 tile_id 升序写入；各缩放级别 tile_id 区间不重叠，逐级排序即可
+        pending = []
+        current_zoom = None
+        for z, x, y, data, n in tiles:
+            if current_zoom is not None and z != current_zoom:
+                for tile_id, blob in sorted(pending):
+                    writer.write_tile(tile_id, blob)
+                pending = []
+            current_zoom = z
+            pending.append((zxy_to_tileid(z, x, y), gzip.compress(data)))
+            stats["tiles"] += 1
+            stats["features_per_zoom"][z] = stats["features_per_zoom"].get(z, 0) + n
+        for tile_id, blob in sorted(pending):
+            writer.write_tile(tile_id, blob)
+        writer.finalize(
+            {
+                "tile_type": TileType.MVT,
+                "tile_compression": Compression.GZIP,
+                "min_zoom": min_zoom,
+                "max_zoom": max_zoom,
+                "min_lon_e7": int(bbox[0] * 1e7),
+                "min_lat_e7": int(bbox[1] * 1e7),
+                "max_lon_e7": int(bbox[2] * 1e7),
+                "max_lat_e7": int(bbox[3] * 1e7),
+                "center_zoom": min_zoom,
+                "center_lon_e7": int((bbox[0] + bbox[2]) / 2 * 1e7),
+                "center_lat_e7": int((bbox[1] + bbox[3]) / 2 * 1e7),
+            },
+            {"vector_layers": [{"id": _MVT_LAYER_NAME, "minzoom": min_zoom, "maxzoom": max_zoom}]},
+        )
+    return stats
+
+def _estimate_cell_area_km2(x_raw, y_raw) -> Optional[float]:
+    """根据规则网格的投影坐标（EPSG:3035，米）估算单元面积（km²）：取相邻列/行的最小正间距"""
+    import numpy as np
+    def _spacing(values):
+        uniq = np.unique(np.asarray(values, dtype='float64'))
+        if len(uniq) < 2:
+            return None
+        diffs = np.diff(uniq)
+        diffs = diffs[diffs > 1e-6]
+        return float(diffs.min()) if len(diffs) else None
+    dx = _spacing(x_raw)
+    dy = _spacing(y_raw)
+    if not dx or not dy:
+        return None
+    return dx * dy / 1e6
+
+def _aggregate_per_polygon(points_within, poly_area_km2=None, cell_area_km2: Optional[float] = None):
+    """按多边形（index_right）一次分组统计：超阈值点数、面积占比、均值/最大值、最大重现期、超阈值点质心。
+    每个多边形保留最大值点作为代表记录（携带域属性），并附加统计列。"""
+    import numpy as np
+    grouped = points_within.groupby('index_right', sort=False)
+    stats = grouped.agg(
+        exceed_count=('value', 'size'),
+        mean_value=('value', 'mean'),
+        max_value=('value', 'max'),
+        centroid_lon=('longitude', 'mean'),
+        centroid_lat=('latitude', 'mean'),
+    )
+    if 'return_period' in points_within.columns:
+        stats['max_return_period'] = grouped['return_period'].max()
+    if cell_area_km2 and poly_area_km2 is not None:
+        area = poly_area_km2.reindex(stats.index).to_numpy(dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = stats['exceed_count'].to_numpy(dtype='float64') * cell_area_km2 / area
+        stats['area_fraction'] = np.clip(np.where(area > 0, frac, np.nan), 0.0, 1.0)
+    representatives = points_within.sort_values(by='value', ascending=False).drop_duplicates(subset='index_right', keep='first')
+    aggregated = representatives.join(stats, on='index_right')
+    return aggregated.sort_values(by='value', ascending=False)
+
+def _grid_dbscan(lons, lats, eps_km: float, min_samples: int, chunk_pairs: int = 2_000_000):
+    """向量化的网格 DBSCAN。返回每个点的簇标签（-1 为噪声），簇编号按核心点首次出现的顺序。
+    点按 eps 高的纬度带与经度排序（复合键），每个点用 searchsorted 在本带与上一带中取经度窗口内的候选，
+    分块生成点对、按等距近似（cos 取点对平均纬度）筛出 eps 内的邻居边；
+    核心点之间的边用向量化的最小标签传播求连通分量，边界点归入相邻核心点中编号最小的簇"""
+    import numpy as np
+    lons = np.asarray(lons, dtype='float64')
+    lats = np.asarray(lats, dtype='float64')
+    n = len(lons)
+    labels = np.full(n, -1, dtype='int64')
+    if n == 0:
+        return labels
+    km_per_deg_lat = 110.574
+    km_per_deg_lon = 111.320
+    eps_deg_lat = eps_km / km_per_deg_lat
+    band = np.floor(lats / eps_deg_lat).astype('int64')
+    order = np.lexsort((lons, band))
+    s_lon = lons[order]
+    s_lat = lats[order]
+    s_band = band[order]
+    band_values, band_rank = np.unique(s_band, return_inverse=True)
+    # 邻居 j 满足 |lat_j| <= |lat_i| + eps，经度窗口按该纬度的 cos 放宽（保守，不漏邻居）
+    cos_edge = np.cos(np.radians(np.minimum(np.abs(s_lat) + eps_deg_lat, 89.9)))
+    dlon = eps_km / (km_per_deg_lon * cos_edge)
+    lon_min = float(s_lon.min())
+    # 复合键 = 带序号 * 跨度 + 经度偏移，跨度大于经度范围加窗口，窗口不会跨带
+    span = float(s_lon.max()) - lon_min + 2.0 * float(dlon.max()) + 1.0
+    keys = band_rank * span + (s_lon - lon_min)
+    eps2 = eps_km * eps_km
+    edges_u: List[Any] = []
+    edges_v: List[Any] = []
+    index = np.arange(n)
+    # 只与本带（j > i）及上一带配对，每条无向边只生成一次
+    for offset in (0, 1):
+        target = np.searchsorted(band_values, s_band + offset)
+        present = (target < len(band_values)) & (band_values[np.minimum(target, len(band_values) - 1)] == s_band + offset)
+        qi = index[present]
+        base = target[present] * span + (s_lon[present] - lon_min)
+        lo = np.searchsorted(keys, base - dlon[present], side='left')
+        hi = np.searchsorted(keys, base + dlon[present], side='right')
+        if offset == 0:
+            lo = np.maximum(lo, qi + 1)
+        counts = np.maximum(hi - lo, 0)
+        # 按候选数分块，峰值内存约为 chunk_pairs 个点对
+        cum = np.cumsum(counts)
+        prev = 0
+        while prev < len(qi):
+            done = int(cum[prev - 1]) if prev else 0
+            stop = max(int(np.searchsorted(cum, done + chunk_pairs, side='right')), prev + 1)
+            sel = slice(prev, stop)
+            prev = stop
+            c = counts[sel]
+            total = int(c.sum())
+            if total == 0:
+                continue
+            u = np.repeat(qi[sel], c)
+            starts = np.repeat(lo[sel] - (np.cumsum(c) - c), c)
+            v = starts + np.arange(total)
+            mid = np.radians((s_lat[u] + s_lat[v]) * 0.5)
+            dx = (s_lon[u] - s_lon[v]) * km_per_deg_lon * np.cos(mid)
+            dy = (s_lat[u] - s_lat[v]) * km_per_deg_lat
+            keep = dx * dx + dy * dy <= eps2
+            edges_u.append(u[keep])
+            edges_v.append(v[keep])
+    eu = np.concatenate(edges_u) if edges_u else np.empty(0, dtype='int64')
+    ev = np.concatenate(edges_v) if edges_v else np.empty(0, dtype='int64')
+    # 邻域点数含自身
+    degree = 1 + np.bincount(eu, minlength=n) + np.bincount(ev, minlength=n)
+    core = degree >= min_samples
+    if not core.any():
+        return labels
+    # 核心点连通分量：最小标签传播 + 指针跳跃，根为分量内最小的排序下标
+    both = core[eu] & core[ev]
+    cu, cv = eu[both], ev[both]
+    parent = np.arange(n)
+    while True:
+        ru, rv = parent[cu], parent[cv]
+        differ = ru != rv
+        if not differ.any():
+            break
+        low = np.minimum(ru[differ], rv[differ])
+        np.minimum.at(parent, ru[differ], low)
+        np.minimum.at(parent, rv[differ], low)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+    # 簇编号按分量中最早出现（原始顺序）的核心点排序，与逐点扩展的结果一致
+    core_idx = index[core]
+    roots, comp = np.unique(parent[core_idx], return_inverse=True)
+    first_seen = np.full(len(roots), n, dtype='int64')
+    np.minimum.at(first_seen, comp, order[core_idx])
+    rank = np.empty(len(roots), dtype='int64')
+    rank[np.argsort(first_seen, kind='stable')] = np.arange(len(roots))
+    s_labels = np.full(n, -1, dtype='int64')
+    s_labels[core_idx] = rank[comp]
+    # 边界点：非核心但与核心点相邻
+    border_u = core[ev] & ~core[eu]
+    border_v = core[eu] & ~core[ev]
+    border = np.concatenate([eu[border_u], ev[border_v]])
+    owner = np.concatenate([s_labels[ev[border_u]], s_labels[eu[border_v]]])
+    if len(border):
+        best = np.full(n, np.iinfo('int64').max, dtype='int64')
+        np.minimum.at(best, border, owner)
+        claimed = best != np.iinfo('int64').max
+        s_labels[claimed] = best[claimed]
+    labels[order] = s_labels
+    return labels
+
+def _attach_cluster_ids(final_points, exceedance_points, labels):
+    """将簇标签附到输出记录：点记录（含每多边形最大值点）按点索引取标签；
+    多边形聚合记录（aggregate_mode=stats）取区内点的主簇（非噪声点最多的簇，并列取编号小的，全为噪声时 -1）"""
+    if final_points is exceedance_points:
+        return final_points.assign(cluster_id=labels)
+    if 'exceed_count' in final_points.columns and 'index_right' in final_points.columns and 'index_right' in exceedance_points.columns:
+        frame = pd.DataFrame({'index_right': exceedance_points['index_right'].to_numpy(), 'cluster_id': labels})
+        sizes = frame[frame['cluster_id'] >= 0].groupby(['index_right', 'cluster_id']).size().reset_index(name='n')
+        dominant = (sizes.sort_values(['n', 'cluster_id'], ascending=[False, True])
+                    .drop_duplicates(subset='index_right').set_index('index_right')['cluster_id'])
+        ids = final_points['index_right'].map(dominant)
+    else:
+        # 同一点落入多个多边形时行索引重复，坐标相同，簇标签也相同
+        by_point = pd.Series(labels, index=exceedance_points.index)
+        ids = by_point[~by_point.index.duplicated()].reindex(final_points.index)
+    return final_points.assign(cluster_id=ids.fillna(-1).astype('int64').to_numpy())
+
+def _summarize_clusters(points, labels) -> List[Dict[str, Any]]:
+    """将簇标签汇总为簇记录（点数、最大/平均值、质心、范围），按最大值降序"""
+    frame = pd.DataFrame({
+        'cluster_id': labels,
+        'longitude': points['longitude'].to_numpy(),
+        'latitude': points['latitude'].to_numpy(),
+        'value': pd.to_numeric(points['value'], errors='coerce').to_numpy(),
+    })
+    frame = frame[frame['cluster_id'] >= 0]
+    if frame.empty:
+        return []
+    agg = frame.groupby('cluster_id').agg(
+        count=('value', 'size'),
+        max_value=('value', 'max'),
+        mean_value=('value', 'mean'),
+        centroid_lon=('longitude', 'mean'),
+        centroid_lat=('latitude', 'mean'),
+        min_lon=('longitude', 'min'),
+        min_lat=('latitude', 'min'),
+        max_lon=('longitude', 'max'),
+        max_lat=('latitude', 'max'),
+    ).sort_values(by='max_value', ascending=False)
+    clusters = []
+    for cid, row in agg.iterrows():
+        clusters.append({
+            "cluster_id": int(cid),
+            "count": int(row['count']),
+            "max_value": float(row['max_value']) if pd.notna(row['max_value']) else None,
+            "mean_value": float(row['mean_value']) if pd.notna(row['mean_value']) else None,
+            "centroid_lon": float(row['centroid_lon']),
+            "centroid_lat": float(row['centroid_lat']),
+            "bbox": [float(row['min_lon']), float(row['min_lat']), float(row['max_lon']), float(row['max_lat'])],
+        })
+    return clusters
+
+def _read_and_project_points(input_file: str, enable_coord_transform: bool):
+    """读取输入文件、检测列并完成坐标投影。返回 (df_valid, value_col, needs_transform)"""
+    # 读取数据文件（支持无表头，优先使用制表符分隔）
+    print("[Progress] Reading data file...", file=sys.stderr)
+    file_ext = os.path.splitext(input_file)[1].lower()
+    if file_ext in ['.csv', '.txt']:
+        # 先尝试制表符分隔（与原始脚本一致）
+        try:
+            df = pd.read_csv(input_file, sep='\t', header=None, names=['x', 'y', 'value'], engine='python')
+            print(f"[Progress] Read {len(df)} rows with tab separator", file=sys.stderr)
+        except:
+            # 如果制表符失败，尝试自动检测
+            with open(input_file, 'r', encoding='utf-8') as f:
+                first_line = f.readline().strip()
+                has_header = not first_line.replace('.', '').replace('-', '').replace('\t', '').replace(' ', '').isdigit()
+            
+            df = None
+            for sep in ['\t', ',', ' ', ';']:
+                try:
+                    df = pd.read_csv(input_file, sep=sep, header=None if not has_header else 0, engine='python')
+                    if len(df.columns) >= 2:
+                        break
+                except:
+                    continue
+            
+            if df is None or len(df.columns) < 2:
+                df = pd.read_csv(input_file, sep='\t', header=None, engine='python')
+    elif file_ext in ['.xlsx', '.xls']:
+        df = pd.read_excel(input_file, header=None)
+    else:
+        error_msg = json.dumps({
+            "success": False,
+            "error": f"Unsupported file format: {file_ext}"
+        }, ensure_ascii=False)
+        print(error_msg, file=sys.stderr)
+        sys.exit(1)
+    
+    # 如果列名是数字（无表头），重命名为x, y, value
+    if len(df.columns) >= 3 and all(isinstance(col, (int, float)) for col in df.columns[:3]):
+        df.columns = ['x', 'y', 'value'] + [f'col_{i}' for i in range(3, len(df.columns))]
+    elif len(df.columns) >= 2:
+        df.columns = ['x', 'y'] + [f'col_{i}' for i in range(2, len(df.columns))]
+        if len(df.columns) >= 3:
+            df.columns = ['x', 'y', 'value'] + list(df.columns[3:])
+    
+    # 检测列
+    lon_col, lat_col, value_col = detect_coordinate_columns(df)
+    
+    if not lon_col or not lat_col:
+        error_msg = json.dumps({
+            "success": False,
+            "error": "Cannot detect longitude/latitude columns"
+        }, ensure_ascii=False)
+        print(error_msg, file=sys.stderr)
+        sys.exit(1)
+    
+    # 提取有效点：只构建坐标/值三列的点表，不复制原始列
+    df_valid = pd.DataFrame({
+        'x_raw': pd.to_numeric(df[lon_col], errors='coerce'),
+        'y_raw': pd.to_numeric(df[lat_col], errors='coerce'),
+        'value': pd.to_numeric(df[value_col], errors='coerce') if value_col else 0,
+    }, index=df.index)
+    del df
+    
+    # 移除无效值
+    valid_mask = df_valid['x_raw'].notna().to_numpy() & df_valid['y_raw'].notna().to_numpy()
+    if not valid_mask.all():
+        df_valid = df_valid[valid_mask]
+    
+    print(f"[Progress] Valid points: {len(df_valid)}", file=sys.stderr)
+    
+    # 检测是否需要坐标转换
+    sample_x = df_valid['x_raw'].iloc[0] if len(df_valid) > 0 else 0
+    sample_y = df_valid['y_raw'].iloc[0] if len(df_valid) > 0 else 0
+    needs_transform = enable_coord_transform and is_epsg3035_coordinates(sample_x, sample_y)
+    
+    print(f"[Progress] Coordinate transform needed: {needs_transform}", file=sys.stderr)
+    
+    # 进行坐标转换（如果需要）
+    if needs_transform:
+        print("[Progress] Transforming coordinates (EPSG:3035 -> WGS84)...", file=sys.stderr)
+        try:
+            # 批量转换坐标，效率更高（与原始脚本一致）
+            transformed_coords = transform_coordinates_batch(
+                df_valid['x_raw'].to_numpy(),
+                df_valid['y_raw'].to_numpy()
+            )
+            if transformed_coords:
+                df_valid['longitude'], df_valid['latitude'] = transformed_coords
+                df_valid = df_valid.dropna(subset=['longitude', 'latitude'])
+                print(f"[Progress] Coordinates transformed: {len(df_valid)} points", file=sys.stderr)
+            else:
+                raise Exception("Coordinate transformation returned None")
+        except Exception as e:
+            print(f"[Warning] Coordinate transform failed: {str(e)}, using raw coordinates", file=sys.stderr)
+            df_valid['longitude'] = df_valid['x_raw']
+            df_valid['latitude'] = df_valid['y_raw']
+    else:
+        df_valid['longitude'] = df_valid['x_raw']
+        df_valid['latitude'] = df_valid['y_raw']
+    
+    return df_valid, value_col, needs_transform
+
+def _file_fingerprint(path: str) -> str:
+    """按 (绝对路径, 大小, mtime) 生成输入文件指纹，用于缓存目录划分；不读取文件内容，
+    大文件每次运行不必整体哈希一遍。文件被改写时大小或 mtime 随之变化，旧缓存不再命中"""
+    st = os.stat(path)
+    return _stage_key(os.path.realpath(path), st.st_size, st.st_mtime_ns)
+
+def _stage_key(*parts) -> str:
+    """由阶段参数（路径、mtime、插值方法等）生成稳定的短键"""
+    import hashlib
+    raw = json.dumps([str(p) for p in parts], ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+class _ArtifactCache:
+    """中间结果缓存：cache_dir/<输入文件指纹>/<阶段>.pkl。
+    同一输入重复运行（仅阈值/多边形/输出参数变化）时复用点表、阈值采样与落区结果；
+    按访问时间只保留最近 max_entries 个输入，且总大小不超过 max_bytes（当前输入除外）。"""
+
+    def __init__(self, cache_dir: str, input_hash: str, max_entries: int = 8, max_bytes: int = 2 << 30):
+        self.root = cache_dir
+        self.dir = os.path.join(cache_dir, input_hash)
+        os.makedirs(self.dir, exist_ok=True)
+        # 标记最近使用
+        os.utime(self.dir, None)
+        self._prune(max_entries, max_bytes)
+
+    def _prune(self, max_entries: int, max_bytes: int):
+        import shutil
+        try:
+            entries = [os.path.join(self.root, name) for name in os.listdir(self.root)]
+            entries = [p for p in entries if os.path.isdir(p)]
+            entries.sort(key=os.path.getmtime, reverse=True)
+            total = 0
+            for index, entry in enumerate(entries):
+                total += _dir_size(entry)
+                # 当前输入（最近使用，排在首位）始终保留
+                if index > 0 and (index >= max_entries or total > max_bytes):
+                    shutil.rmtree(entry, ignore_errors=True)
+        except Exception as e:
+            print(f"[Warning] Cache prune failed: {e}", file=sys.stderr)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, f"{name}.pkl")
+
+    def load(self, name: str):
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            obj = pd.read_pickle(path)
+            print(f"[Progress] Cache hit: {name}", file=sys.stderr)
+            return obj
+        except Exception as e:
+            print(f"[Warning] Cache read failed ({name}): {e}", file=sys.stderr)
+            return None
+
+    def save(self, name: str, obj):
+        # 先写临时文件再替换，避免并发运行读到半个文件
+        path = self._path(name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            pd.to_pickle(obj, tmp)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"[Warning] Cache write failed ({name}): {e}", file=sys.stderr)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+def _memo_within_join(artifact_cache, stage: str, points, load_polygons):
+    """点落区（within）结果按点索引记忆：只对缓存中尚未判定过的点执行 sjoin。
+    load_polygons() 返回 (polygons_gdf, extra)，extra（属性表、面积等）随记忆一起缓存。
+    返回 (pairs, extra)，pairs 以点索引为索引、含 index_right 列"""
+    import geopandas as gpd
+    memo = artifact_cache.load(stage) or {
+        'pairs': pd.DataFrame({'index_right': pd.Series(dtype='int64')}),
+        'checked': pd.Index([]),
+        'extra': None,
+    }
+    unique_points = points[~points.index.duplicated()]
+    missing = unique_points.index.difference(memo['checked'])
+    if len(missing) > 0:
+        print(f"[Progress] Spatial join for {len(missing)} uncached points...", file=sys.stderr)
+        polygons, extra = load_polygons()
+        subset = unique_points.loc[missing]
+        gdf_points = gpd.GeoDataFrame(
+            index=subset.index,
+            geometry=gpd.points_from_xy(subset['longitude'], subset['latitude']),
+            crs="EPSG:4326",
+        )
+        joined = gpd.sjoin(gdf_points, polygons[['geometry']], how='inner', predicate='within')
+        memo['pairs'] = pd.concat([memo['pairs'], joined[['index_right']]])
+        memo['checked'] = memo['checked'].append(missing)
+        memo['extra'] = extra
+        artifact_cache.save(stage, memo)
+    pairs = memo['pairs']
+    return pairs[pairs.index.isin(points.index)], memo['extra']
+
+def _attach_polygon_attrs(points, pairs, attrs):
+    """按 (点, 多边形) 配对重建与 gpd.sjoin(how='inner') 相同形态的结果：重名列加 _left/_right 后缀"""
+    joined = points.join(pairs, how='inner')
+    overlap = set(joined.columns) & set(attrs.columns)
+    left = joined.rename(columns={c: f"{c}_left" for c in overlap})
+    right = attrs.rename(columns={c: f"{c}_right" for c in overlap})
+    return left.join(right, on='index_right')
+
 def main():
     args = {}
     if len(sys.argv) > 1:
@@ -203,111 +926,66 @@ def main():
     max_points = args.get('max_points', 1000)
     enable_coord_transform = args.get('enable_coord_transform', True)
     take_max_per_polygon = args.get('take_max_per_polygon', True)
+    # 多边形聚合：max（每区只保留最大值点，受 take_max_per_polygon 控制）| stats（每区一条统计记录）
+    aggregate_mode = str(args.get('aggregate_mode', 'max')).lower()
+    grid_cell_size_m = args.get('grid_cell_size_m')  # 网格分辨率（米），用于面积占比；缺省时从 EPSG:3035 坐标估算
+    # 可选：基于网格哈希的 DBSCAN 聚类（cluster_eps_km 为空则不聚类）
+    cluster_eps_km = args.get('cluster_eps_km')
+    cluster_min_samples = int(args.get('cluster_min_samples', 3))
+    # 输出模式：json（默认，整体输出到 stdout）| ndjson | flatgeobuf | geoparquet | mvt | pmtiles
+    output_format = str(args.get('output_format', 'json')).lower()
+    output_file = args.get('output_file')
+    if output_format not in _OUTPUT_EXTENSIONS:
+        error_msg = json.dumps({
+            "success": False,
+            "error": f"Unsupported output format: {output_format}"
+        }, ensure_ascii=False)
+        print(error_msg, file=sys.stderr)
+        sys.exit(1)
+    # 瓦片金字塔参数（mvt/pmtiles）：缩放范围与抽稀网格（像素）
+    tile_min_zoom = int(args.get('tile_min_zoom', 4))
+    tile_max_zoom = int(args.get('tile_max_zoom', 12))
+    tile_bin_pixels = float(args.get('tile_bin_pixels', 4))
+    if output_format in ('flatgeobuf', 'geoparquet') + _TILE_FORMATS and not output_file:
+        # 未指定输出路径时，写到输入文件旁
+        output_file = os.path.splitext(input_file)[0] + '_points' + _OUTPUT_EXTENSIONS[output_format]
+    
+    # 中间结果缓存目录（可选）：按输入文件指纹复用点表、阈值采样与落区结果
+    cache_dir = args.get('cache_dir')
+    cache_max_entries = int(args.get('cache_max_entries', 8))
+    cache_max_bytes = int(float(args.get('cache_max_mb', 2048)) * (1 << 20))
     
     try:
         print(f"[Progress] Starting processing... Input file: {input_file}", file=sys.stderr)
         
-        # 读取数据文件（支持无表头，优先使用制表符分隔）
-        print("[Progress] Reading data file...", file=sys.stderr)
-        file_ext = os.path.splitext(input_file)[1].lower()
-        if file_ext in ['.csv', '.txt']:
-            # 先尝试制表符分隔（与原始脚本一致）
+        artifact_cache = None
+        if cache_dir:
             try:
-                df = pd.read_csv(input_file, sep='\t', header=None, names=['x', 'y', 'value'], engine='python')
-                print(f"[Progress] Read {len(df)} rows with tab separator", file=sys.stderr)
-            except:
-                # 如果制表符失败，尝试自动检测
-                with open(input_file, 'r', encoding='utf-8') as f:
-                    first_line = f.readline().strip()
-                    has_header = not first_line.replace('.', '').replace('-', '').replace('\t', '').replace(' ', '').isdigit()
-                
-                df = None
-                for sep in ['\t', ',', ' ', ';']:
-                    try:
-                        df = pd.read_csv(input_file, sep=sep, header=None if not has_header else 0, engine='python')
-                        if len(df.columns) >= 2:
-                            break
-                    except:
-                        continue
-                
-                if df is None or len(df.columns) < 2:
-                    df = pd.read_csv(input_file, sep='\t', header=None, engine='python')
-        elif file_ext in ['.xlsx', '.xls']:
-            df = pd.read_excel(input_file, header=None)
-        else:
-            error_msg = json.dumps({
-                "success": False,
-                "error": f"Unsupported file format: {file_ext}"
-            }, ensure_ascii=False)
-            print(error_msg, file=sys.stderr)
-            sys.exit(1)
-        
-        # 如果列名是数字（无表头），重命名为x, y, value
-        if len(df.columns) >= 3 and all(isinstance(col, (int, float)) for col in df.columns[:3]):
-            df.columns = ['x', 'y', 'value'] + [f'col_{i}' for i in range(3, len(df.columns))]
-        elif len(df.columns) >= 2:
-            df.columns = ['x', 'y'] + [f'col_{i}' for i in range(2, len(df.columns))]
-            if len(df.columns) >= 3:
-                df.columns = ['x', 'y', 'value'] + list(df.columns[3:])
-        
-        # 检测列
-        lon_col, lat_col, value_col = detect_coordinate_columns(df)
-        
-        if not lon_col or not lat_col:
-            error_msg = json.dumps({
-                "success": False,
-                "error": "Cannot detect longitude/latitude columns"
-            }, ensure_ascii=False)
-            print(error_msg, file=sys.stderr)
-            sys.exit(1)
-        
-        # 提取有效点
-        df_valid = df[[lon_col, lat_col]].copy()
-        df_valid['x_raw'] = pd.to_numeric(df_valid[lon_col], errors='coerce')
-        df_valid['y_raw'] = pd.to_numeric(df_valid[lat_col], errors='coerce')
+                input_hash = _file_fingerprint(input_file)
+                artifact_cache = _ArtifactCache(cache_dir, input_hash, cache_max_entries, cache_max_bytes)
+                print(f"[Progress] Artifact cache: {artifact_cache.dir}", file=sys.stderr)
+            except Exception as e:
+                print(f"[Warning] Artifact cache disabled: {e}", file=sys.stderr)
         
-        if value_col:
-            df_valid['value'] = pd.to_numeric(df[value_col], errors='coerce')
+        # 读取并投影点数据（可按输入哈希复用缓存）
+        points_stage = f"points_t{int(bool(enable_coord_transform))}"
+        cached_points = artifact_cache.load(points_stage) if artifact_cache else None
+        if cached_points is not None:
+            df_valid, value_col, needs_transform = cached_points
+            print(f"[Progress] Reusing cached points: {len(df_valid)} (transform={needs_transform})", file=sys.stderr)
         else:
-            df_valid['value'] = 0
-        
-        # 移除无效值
-        df_valid = df_valid.dropna(subset=['x_raw', 'y_raw'])
-        
-        print(f"[Progress] Valid points: {len(df_valid)}", file=sys.stderr)
+            df_valid, value_col, needs_transform = _read_and_project_points(input_file, enable_coord_transform)
+            if artifact_cache:
+                artifact_cache.save(points_stage, (df_valid, value_col, needs_transform))
         
-        # 检测是否需要坐标转换
-        sample_x = df_valid['x_raw'].iloc[0] if len(df_valid) > 0 else 0
-        sample_y = df_valid['y_raw'].iloc[0] if len(df_valid) > 0 else 0
-        needs_transform = enable_coord_transform and is_epsg3035_coordinates(sample_x, sample_y)
-        
-        print(f"[Progress] Coordinate transform needed: {needs_transform}", file=sys.stderr)
-        
-        # 进行坐标转换（如果需要）
-        if needs_transform:
-            print("[Progress] Transforming coordinates (EPSG:3035 -> WGS84)...", file=sys.stderr)
-            try:
-                # 批量转换坐标，效率更高（与原始脚本一致）
-                transformed_coords = transform_coordinates_batch(
-                    df_valid['x_raw'].tolist(), 
-                    df_valid['y_raw'].tolist()
-                )
-                if transformed_coords:
-                    df_valid[['longitude', 'latitude']] = pd.DataFrame(
-                        transformed_coords, 
-                        index=df_valid.index
-                    )
-                    df_valid = df_valid.dropna(subset=['longitude', 'latitude'])
-                    print(f"[Progress] Coordinates transformed: {len(df_valid)} points", file=sys.stderr)
-                else:
-                    raise Exception("Coordinate transformation returned None")
-            except Exception as e:
-                print(f"[Warning] Coordinate transform failed: {str(e)}, using raw coordinates", file=sys.stderr)
-                df_valid['longitude'] = df_valid['x_raw']
-                df_valid['latitude'] = df_valid['y_raw']
-        else:
-            df_valid['longitude'] = df_valid['x_raw']
-            df_valid['latitude'] = df_valid['y_raw']
+        # 估算网格单元面积（仅 stats 聚合需要面积占比）
+        cell_area_km2 = None
+        if aggregate_mode == 'stats':
+            if grid_cell_size_m:
+                cell_area_km2 = float(grid_cell_size_m) ** 2 / 1e6
+            elif needs_transform:
+                cell_area_km2 = _estimate_cell_area_km2(df_valid['x_raw'], df_valid['y_raw'])
+            print(f"[Progress] Grid cell area: {cell_area_km2} km2", file=sys.stderr)
         
         # 应用阈值筛选（支持 fixed / grid）
         if value_col:
@@ -316,53 +994,62 @@ def main():
             before_count = len(df_valid)
             if threshold_mode == 'grid':
                 print(f"[Progress] Threshold mode: grid ({grid_rp_for_filter}), method={grid_interp_method}", file=sys.stderr)
-                # 准备需要的阈值网格
-                da_002 = _load_threshold_grid(rp_files['002y']) if rp_files.get('002y') else None
-                da_005 = _load_threshold_grid(rp_files['005y']) if rp_files.get('005y') else None
-                da_020 = _load_threshold_grid(rp_files['020y']) if rp_files.get('020y') else None
+                import numpy as np
+                # 阈值网格按需加载与采样；同一重现期只采样一次，原始采样结果按输入哈希缓存
+                sampled_thresholds: Dict[str, Any] = {}
+                def sample_rp(rp_key):
+                    if rp_key in sampled_thresholds:
+                        return sampled_thresholds[rp_key]
+                    nc_path = rp_files[rp_key]
+                    stage = None
+                    vals = None
+                    if artifact_cache:
+                        stage = 'thr_' + _stage_key(points_stage, os.path.abspath(nc_path), os.path.getmtime(nc_path), grid_interp_method)
+                        vals = artifact_cache.load(stage)
+                    if vals is None:
+                        vals = _sample_thresholds(
+                            _load_threshold_grid(nc_path),
+                            df_valid['longitude'].tolist(),
+                            df_valid['latitude'].tolist(),
+                            method=grid_interp_method
+                        )
+                        if stage:
+                            artifact_cache.save(stage, vals)
+                    # 回退处理
+                    vals = np.where(~pd.isna(vals), vals, grid_fallback)
+                    sampled_thresholds[rp_key] = vals
+                    return vals
                 if grid_rp_for_filter not in rp_files or not rp_files[grid_rp_for_filter]:
                     # 若未提供指定RP文件，退回 fixed
                     print(f"[Warning] Missing NC for selected RP {grid_rp_for_filter}, fallback to fixed {value_threshold}", file=sys.stderr)
-                    thr_for_filter = pd.Series([value_threshold] * len(df_valid), index=df_valid.index)
+                    thr_for_filter = np.full(len(df_valid), value_threshold, dtype='float64')
                 else:
-                    da_sel = {'002y': da_002, '005y': da_005, '020y': da_020}[grid_rp_for_filter]
-                    vals = _sample_thresholds(
-                        da_sel,
-                        df_valid['longitude'].tolist(),
-                        df_valid['latitude'].tolist(),
-                        method=grid_interp_method
-                    )
-                    # 回退处理
-                    import numpy as np
-                    vals = np.where(~pd.isna(vals), vals, grid_fallback)
-                    thr_for_filter = pd.Series(vals, index=df_valid.index, dtype='float64')
-                    df_valid[f'threshold_{grid_rp_for_filter}'] = thr_for_filter
+                    thr_for_filter = np.asarray(sample_rp(grid_rp_for_filter), dtype='float64')
+                # 使用选择的RP阈值进行筛选（>= 阈值）；先按掩码取子集，阈值/RP 列只为保留的点生成
+                keep_mask = df_valid['value'].to_numpy(dtype='float64') > thr_for_filter
+                rp_columns: Dict[str, Any] = {}
+                if grid_rp_for_filter in rp_files and rp_files[grid_rp_for_filter]:
+                    rp_columns[f'threshold_{grid_rp_for_filter}'] = thr_for_filter[keep_mask]
                 # 计算其它阈值与RP（如需）
                 if output_rp_columns:
-                    import numpy as np
-                    if da_002 is not None:
-                        v2 = _sample_thresholds(da_002, df_valid['longitude'].tolist(), df_valid['latitude'].tolist(), method=grid_interp_method)
-                        v2 = np.where(~pd.isna(v2), v2, grid_fallback)
-                        df_valid['threshold_2y'] = v2
-                    if da_005 is not None:
-                        v5 = _sample_thresholds(da_005, df_valid['longitude'].tolist(), df_valid['latitude'].tolist(), method=grid_interp_method)
-                        v5 = np.where(~pd.isna(v5), v5, grid_fallback)
-                        df_valid['threshold_5y'] = v5
-                    if da_020 is not None:
-                        v20 = _sample_thresholds(da_020, df_valid['longitude'].tolist(), df_valid['latitude'].tolist(), method=grid_interp_method)
-                        v20 = np.where(~pd.isna(v20), v20, grid_fallback)
-                        df_valid['threshold_20y'] = v20
+                    if rp_files.get('002y'):
+                        rp_columns['threshold_2y'] = sample_rp('002y')[keep_mask]
+                    if rp_files.get('005y'):
+                        rp_columns['threshold_5y'] = sample_rp('005y')[keep_mask]
+                    if rp_files.get('020y'):
+                        rp_columns['threshold_20y'] = sample_rp('020y')[keep_mask]
                     # 估算重现期
-                    if all(col in df_valid.columns for col in ['threshold_2y', 'threshold_5y', 'threshold_20y']):
+                    if all(col in rp_columns for col in ['threshold_2y', 'threshold_5y', 'threshold_20y']):
                         bands = []
                         rps = []
-                        for r, t2, t5, t20 in zip(df_valid['value'].tolist(), df_valid['threshold_2y'].tolist(), df_valid['threshold_5y'].tolist(), df_valid['threshold_20y'].tolist()):
+                        kept_values = df_valid['value'].to_numpy(dtype='float64')[keep_mask]
+                        for r, t2, t5, t20 in zip(kept_values.tolist(), rp_columns['threshold_2y'].tolist(), rp_columns['threshold_5y'].tolist(), rp_columns['threshold_20y'].tolist()):
                             band, rp = _estimate_return_period(r, t2, t5, t20)
                             bands.append(band)
                             rps.append(rp)
-                        df_valid['return_period_band'] = bands
-                # 使用选择的RP阈值进行筛选（>= 阈值）
-                df_valid = df_valid[df_valid['value'] > thr_for_filter]
+                        rp_columns['return_period_band'] = pd.Categorical(bands)
+                        rp_columns['return_period'] = rps
+                df_valid = df_valid[keep_mask].assign(**rp_columns)
                 df_valid = df_valid.sort_values(by='value', ascending=False)
                 print(f"[Progress] After grid-threshold: {len(df_valid)}/{before_count} points (rp={grid_rp_for_filter})", file=sys.stderr)
             else:
@@ -375,33 +1062,65 @@ def main():
         
         # 如果提供了GeoJSON文件，进行空间筛选
         final_points = df_valid
+        exceedance_points = df_valid
         if geojson_file and os.path.exists(geojson_file):
             try:
                 print(f"[Progress] Loading GeoJSON file: {geojson_file}", file=sys.stderr)
                 import geopandas as gpd
-                from shapely.geometry import Point
-                
-                print("[Progress] Reading GeoJSON...", file=sys.stderr)
-                # 读取GeoJSON
-                gdf_base = gpd.read_file(geojson_file)
-                print(f"[Progress] GeoJSON loaded: {len(gdf_base)} polygons", file=sys.stderr)
                 
-                if gdf_base.crs != "EPSG:4326":
-                    print("[Progress] Converting CRS to EPSG:4326...", file=sys.stderr)
-                    gdf_base = gdf_base.to_crs(epsg=4326)
+                def load_domain():
+                    print("[Progress] Reading GeoJSON...", file=sys.stderr)
+                    # 读取GeoJSON
+                    gdf = gpd.read_file(geojson_file)
+                    print(f"[Progress] GeoJSON loaded: {len(gdf)} polygons", file=sys.stderr)
+                    if gdf.crs != "EPSG:4326":
+                        print("[Progress] Converting CRS to EPSG:4326...", file=sys.stderr)
+                        gdf = gdf.to_crs(epsg=4326)
+                    return gdf
                 
-                print(f"[Progress] Creating point geometry from {len(df_valid)} points...", file=sys.stderr)
-                # 将点数据转换为GeoDataFrame
-                geometry = [Point(xy) for xy in zip(df_valid['longitude'], df_valid['latitude'])]
-                gdf_points = gpd.GeoDataFrame(df_valid, geometry=geometry, crs="EPSG:4326")
+                def polygon_areas(gdf):
+                    # 多边形面积在等积投影（EPSG:3035）下计算
+                    return gdf.geometry.to_crs(epsg=3035).area / 1e6
                 
-                print("[Progress] Performing spatial join...", file=sys.stderr)
-                # 空间筛选：找出在GeoJSON区域内的点
-                points_within = gpd.sjoin(gdf_points, gdf_base, how="inner", predicate="within")
+                poly_area_km2 = None
+                if artifact_cache:
+                    # 落区结果按点记忆：再次运行只对新增的点做空间连接
+                    domain_stage = 'domain_' + _stage_key(points_stage, os.path.abspath(geojson_file), os.path.getmtime(geojson_file))
+                    def load_domain_with_attrs():
+                        gdf = load_domain()
+                        return gdf, {
+                            'attrs': pd.DataFrame(gdf.drop(columns=gdf.geometry.name)),
+                            'area_km2': polygon_areas(gdf),
+                        }
+                    pairs, domain_extra = _memo_within_join(artifact_cache, domain_stage, df_valid, load_domain_with_attrs)
+                    if domain_extra is None:
+                        points_within = df_valid.iloc[0:0]
+                    else:
+                        points_within = _attach_polygon_attrs(df_valid, pairs, domain_extra['attrs'])
+                        poly_area_km2 = domain_extra['area_km2']
+                else:
+                    gdf_base = load_domain()
+                    
+                    print(f"[Progress] Creating point geometry from {len(df_valid)} points...", file=sys.stderr)
+                    # 将点数据转换为GeoDataFrame
+                    geometry = gpd.points_from_xy(df_valid['longitude'], df_valid['latitude'])
+                    gdf_points = gpd.GeoDataFrame(df_valid, geometry=geometry, crs="EPSG:4326")
+                    
+                    print("[Progress] Performing spatial join...", file=sys.stderr)
+                    # 空间筛选：找出在GeoJSON区域内的点
+                    points_within = gpd.sjoin(gdf_points, gdf_base, how="inner", predicate="within")
+                    if aggregate_mode == 'stats' and cell_area_km2:
+                        poly_area_km2 = polygon_areas(gdf_base)
                 print(f"[Progress] Found {len(points_within)} points within polygons", file=sys.stderr)
                 
+                exceedance_points = points_within
+                
                 if not points_within.empty:
-                    if take_max_per_polygon:
+                    if aggregate_mode == 'stats' and 'index_right' in points_within.columns:
+                        print("[Progress] Aggregating statistics per polygon...", file=sys.stderr)
+                        final_points = _aggregate_per_polygon(points_within, poly_area_km2, cell_area_km2)
+                        print(f"[Progress] Aggregated {len(points_within)} points into {len(final_points)} polygon records", file=sys.stderr)
+                    elif take_max_per_polygon:
                         print("[Progress] Taking max value per polygon...", file=sys.stderr)
                         print(f"[Progress] Points before max selection: {len(points_within)}", file=sys.stderr)
                         # 每个多边形区域内取最大值点
@@ -500,13 +1219,7 @@ def main():
                             pass
                         if country_col:
                             # 简单国家码到名称映射
-                            code_to_name = {
-                                'ES': 'Spain', 'PT': 'Portugal', 'FR': 'France', 'DE': 'Germany', 'IT': 'Italy',
-                                'NO': 'Norway', 'SE': 'Sweden', 'FI': 'Finland', 'DK': 'Denmark', 'NL': 'Netherlands',
-                                'BE': 'Belgium', 'LU': 'Luxembourg', 'IE': 'Ireland', 'GB': 'United Kingdom', 'UK': 'United Kingdom',
-                                'HR': 'Croatia', 'RO': 'Romania', 'BG': 'Bulgaria', 'GR': 'Greece', 'PL': 'Poland', 'CZ': 'Czechia',
-                                'AT': 'Austria'
-                            }
+                            code_to_name = _COUNTRY_CODE_TO_NAME
                             # 如果已经从 NAME/其它列得到 country_code，则优先用该列映射
                             if 'country_code' in final_points.columns:
                                 final_points['country_name'] = final_points['country_code'].map(lambda x: code_to_name.get(str(x), str(x)))
@@ -544,6 +1257,18 @@ def main():
                 print(error_msg, file=sys.stderr)
                 sys.exit(1)
         
+        # 行政区等重复字符串列转 category，后续落区/聚类/输出不再携带逐行字符串对象
+        _compact_point_table(final_points, _POINT_CATEGORY_COLUMNS)
+        
+        # 聚类（在全部超阈值点上进行，输出簇记录；输出记录附带簇标签）
+        clusters = None
+        if cluster_eps_km and len(exceedance_points) > 0:
+            print(f"[Progress] Grid DBSCAN clustering: eps={cluster_eps_km}km, min_samples={cluster_min_samples}", file=sys.stderr)
+            labels = _grid_dbscan(exceedance_points['longitude'], exceedance_points['latitude'], float(cluster_eps_km), cluster_min_samples)
+            clusters = _summarize_clusters(exceedance_points, labels)
+            final_points = _attach_cluster_ids(final_points, exceedance_points, labels)
+            print(f"[Progress] Clusters found: {len(clusters)}", file=sys.stderr)
+        
         # 行政区落区（在最终点集基础上进行，可与 GeoJSON 过滤配合）
         province_name_col = None
         city_name_col = None
@@ -558,13 +1283,12 @@ def main():
                         pass
                 try:
                     import geopandas as gpd
-                    from shapely.geometry import Point
                 except ImportError:
                     gpd = None
                 if gpd is not None:
                     # 将最终点集转为 GeoDataFrame
-                    geometry = [Point(xy) for xy in zip(final_points['longitude'], final_points['latitude'])]
-                    points_gdf_for_join = gpd.GeoDataFrame(final_points.copy(), geometry=geometry, crs="EPSG:4326")
+                    geometry = gpd.points_from_xy(final_points['longitude'], final_points['latitude'])
+                    points_gdf_for_join = gpd.GeoDataFrame(final_points, geometry=geometry, crs="EPSG:4326")
                     # 再次确保不存在 index_right 列（避免与 sjoin 生成列名冲突）
                     if 'index_right' in points_gdf_for_join.columns:
                         try:
@@ -576,22 +1300,39 @@ def main():
 
                     # 市级（LAU）：仅取 LAU_NAME 为 city_name
                     if lau_file and os.path.exists(lau_file):
-                        print(f"[Progress] Loading LAU for city join: {lau_file}", file=sys.stderr)
-                        lau_gdf = gpd.read_file(lau_file, layer=lau_layer) if lau_layer else gpd.read_file(lau_file)
-                        if lau_gdf.crs != "EPSG:4326":
-                            lau_gdf = lau_gdf.to_crs(epsg=4326)
-                        city_name_col = None
-                        for c in ['LAU_NAME', 'LAU_NAME_right', 'LAU_NAME_left']:
-                            if c in lau_gdf.columns:
-                                city_name_col = c
-                                break
-                        select_cols = [city_name_col, 'geometry'] if city_name_col else ['geometry']
-                        lau_gdf = lau_gdf[select_cols]
-                        joined = gpd.sjoin(points_gdf_for_join, lau_gdf, how='left', predicate='within')
-                        if city_name_col and city_name_col in joined.columns:
-                            points_gdf_for_join['city_name'] = joined[city_name_col]
+                        def load_lau():
+                            print(f"[Progress] Loading LAU for city join: {lau_file}", file=sys.stderr)
+                            lau = gpd.read_file(lau_file, layer=lau_layer) if lau_layer else gpd.read_file(lau_file)
+                            if lau.crs != "EPSG:4326":
+                                lau = lau.to_crs(epsg=4326)
+                            name_col = None
+                            for c in ['LAU_NAME', 'LAU_NAME_right', 'LAU_NAME_left']:
+                                if c in lau.columns:
+                                    name_col = c
+                                    break
+                            select_cols = [name_col, 'geometry'] if name_col else ['geometry']
+                            return lau[select_cols], name_col
+                        if artifact_cache:
+                            # 市名按点记忆：再次运行只对新进入最终点集的点做 LAU 连接
+                            lau_stage = 'lau_' + _stage_key(points_stage, os.path.abspath(lau_file), os.path.getmtime(lau_file), lau_layer)
+                            def load_lau_with_names():
+                                lau, name_col = load_lau()
+                                return lau, {'city_name_col': name_col, 'names': lau[name_col] if name_col else None}
+                            pairs, lau_extra = _memo_within_join(artifact_cache, lau_stage, final_points, load_lau_with_names)
+                            names = lau_extra['names'] if lau_extra else None
+                            city_name_col = lau_extra['city_name_col'] if lau_extra else None
+                            if names is not None:
+                                first_match = pairs[~pairs.index.duplicated()]['index_right']
+                                points_gdf_for_join['city_name'] = first_match.map(names).reindex(points_gdf_for_join.index)
+                            else:
+                                points_gdf_for_join['city_name'] = None
                         else:
-                            points_gdf_for_join['city_name'] = None
+                            lau_gdf, city_name_col = load_lau()
+                            joined = gpd.sjoin(points_gdf_for_join, lau_gdf, how='left', predicate='within')
+                            if city_name_col and city_name_col in joined.columns:
+                                points_gdf_for_join['city_name'] = joined[city_name_col]
+                            else:
+                                points_gdf_for_join['city_name'] = None
                         # 不写入/覆盖国家与省
                     else:
                         points_gdf_for_join = points_gdf_for_join.assign(city_name=None)
@@ -601,73 +1342,60 @@ def main():
                         final_points = pd.DataFrame(points_gdf_for_join.drop(columns=['geometry']))
         except Exception as e:
             print(f"[Warning] NUTS/LAU join failed: {str(e)}", file=sys.stderr)
+        _compact_point_table(final_points, _POINT_CATEGORY_COLUMNS)
 
-        # 限制点数
-        if len(final_points) > max_points:
+        # 限制点数（瓦片模式按缩放级别抽稀，不做截断）
+        if output_format not in _TILE_FORMATS and len(final_points) > max_points:
             final_points = final_points.head(max_points)
         
-        # 构建结果
-        points = []
-        for _, row in final_points.iterrows():
-            item = {
-                "longitude": float(row['longitude']),
-                "latitude": float(row['latitude']),
-                "value": float(row['value']) if pd.notna(row['value']) else None
-            }
-            # 附加阈值/重现期信息（如有）
-            for c in ['threshold_2y', 'threshold_5y', 'threshold_20y', f'threshold_{grid_rp_for_filter}', 'return_period_band']:
-                if c in final_points.columns and pd.notna(row.get(c)):
-                    v = row.get(c)
-                    item[c] = float(v) if isinstance(v, (int, float)) and pd.notna(v) else (str(v) if v is not None else None)
-            # 附加行政区（如果有）
-            if 'province_name' in row and pd.notna(row['province_name']):
-                item['province_name'] = str(row['province_name'])
-            if 'city_name' in row and pd.notna(row['city_name']):
-                item['city_name'] = str(row['city_name'])
-            if 'country_code' in row and pd.notna(row['country_code']):
-                code = str(row['country_code'])
-                item['country_code'] = code
-                # 简单国家码到名称映射（可按需补充）
-                code_to_name = {
-                    'ES': 'Spain', 'PT': 'Portugal', 'FR': 'France', 'DE': 'Germany', 'IT': 'Italy',
-                    'NO': 'Norway', 'SE': 'Sweden', 'FI': 'Finland', 'DK': 'Denmark', 'NL': 'Netherlands',
-                    'BE': 'Belgium', 'LU': 'Luxembourg', 'IE': 'Ireland', 'GB': 'United Kingdom',
-                    'UK': 'United Kingdom', 'HR': 'Croatia', 'RO': 'Romania', 'BG': 'Bulgaria',
-                    'GR': 'Greece', 'PL': 'Poland', 'CZ': 'Czechia', 'AT': 'Austria'
-                }
-                item['country_name'] = code_to_name.get(code, code)
-            points.append(item)
-        
-        result = {
-            "success": True,
-            "summary": {
-                "total_points": len(points),
-                "value_threshold": float(value_threshold),
-                "threshold_mode": threshold_mode,
-                "grid_rp_for_filter": grid_rp_for_filter if threshold_mode == 'grid' else None,
-                "grid_interp_method": grid_interp_method if threshold_mode == 'grid' else None,
-                "max_points": int(max_points),
-                "coordinate_transform": bool(needs_transform),
-                "geojson_filtered": bool(geojson_file is not None and os.path.exists(geojson_file) if geojson_file else False),
-                "total_before_filter": len(df_valid),
-                "points_after_geojson": len(final_points) if geojson_file else None,
-                "lau_join": bool(lau_file is not None and os.path.exists(lau_file) if lau_file else False)
-            },
-            "points": points
+        summary = {
+            "total_points": len(final_points),
+            "value_threshold": float(value_threshold),
+            "threshold_mode": threshold_mode,
+            "grid_rp_for_filter": grid_rp_for_filter if threshold_mode == 'grid' else None,
+            "grid_interp_method": grid_interp_method if threshold_mode == 'grid' else None,
+            "max_points": int(max_points),
+            "coordinate_transform": bool(needs_transform),
+            "geojson_filtered": bool(geojson_file is not None and os.path.exists(geojson_file) if geojson_file else False),
+            "total_before_filter": len(df_valid),
+            "points_after_geojson": len(final_points) if geojson_file else None,
+            "lau_join": bool(lau_file is not None and os.path.exists(lau_file) if lau_file else False),
+            "output_format": output_format,
+            "aggregate_mode": aggregate_mode,
+            "total_clusters": len(clusters) if clusters is not None else None,
         }
-        
-        print("[Progress] Generating output...", file=sys.stderr)
-        try:
-            # 使用 UTF-8 明确输出，避免 Windows 上 GBK 编码报错
-            sys.stdout.buffer.write(json.dumps(result, ensure_ascii=False).encode('utf-8'))
-            sys.stdout.buffer.write(b"\n")
-            sys.stdout.flush()
-        except Exception as enc_err:
-            # 退化到安全替代：强制 ASCII 转义，保证不中断
-            fallback = json.dumps(result, ensure_ascii=True)
-            sys.stdout.buffer.write(fallback.encode('ascii', errors='ignore'))
-            sys.stdout.buffer.write(b"\n")
-            sys.stdout.flush()
+
+        print(f"[Progress] Generating output ({output_format})...", file=sys.stderr)
+        if output_format == 'json':
+            # 构建结果（整体 JSON 文档，保持原有行为）
+            result = {
+                "success": True,
+                "summary": summary,
+                "points": list(_iter_point_items(final_points, grid_rp_for_filter))
+            }
+            if clusters is not None:
+                result["clusters"] = clusters
+            _write_stdout_json(result)
+        elif output_format == 'ndjson' and not output_file:
+            # NDJSON 流式输出到 stdout：首行为摘要，其后每行一个点
+            _write_stdout_json({"success": True, "summary": summary, "clusters": clusters})
+            _write_ndjson(sys.stdout.buffer, _iter_point_items(final_points, grid_rp_for_filter))
+        else:
+            # 文件输出：stdout 只返回摘要与输出路径，由 API/地图层按需读取
+            if output_format == 'ndjson':
+                with open(output_file, 'wb') as fp:
+                    _write_ndjson(fp, _iter_point_items(final_points, grid_rp_for_filter))
+            elif output_format in _TILE_FORMATS:
+                summary["tiles"] = _write_vector_tiles(
+                    final_points, output_file, output_format, grid_rp_for_filter,
+                    tile_min_zoom, tile_max_zoom, tile_bin_pixels
+                )
+                summary["max_points"] = None
+            else:
+                _write_geo_file(final_points, output_file, output_format, grid_rp_for_filter)
+            print(f"[Progress] Output written: {output_file}", file=sys.stderr)
+            summary["output_file"] = os.path.abspath(output_file)
+            _write_stdout_json({"success": True, "summary": summary, "clusters": clusters})
         print("[Progress] Done!", file=sys.stderr)
         
     except Exception as e:
@@ -690,10 +690,19 @@ export function registerPythonModule(app: Express) {
         max_points: z.number().optional().default(1000),
         geojson_file: z.string().optional(),
         take_max_per_polygon: z.boolean().optional().default(true),
+        // 输出模式：json（默认）| ndjson | flatgeobuf | geoparquet | mvt | pmtiles；文件模式下 stdout 只返回摘要与路径
+        output_format: z.enum(['json', 'ndjson', 'flatgeobuf', 'geoparquet', 'mvt', 'pmtiles']).optional(),
+        // 可选：多边形聚合统计（stats）与 DBSCAN 聚类（邻域半径 km、最少点数）
+        aggregate_mode: z.enum(['max', 'stats']).optional(),
+        cluster_eps_km: z.number().positive().optional(),
+        cluster_min_samples: z.number().int().min(1).optional(),
         timeout: z.number().optional()
       });
       
-      const { filename, fileId, value_threshold, max_points, geojson_file, take_max_per_polygon, timeout } = schema.parse(req.body);
+      const {
+        filename, fileId, value_threshold, max_points, geojson_file, take_max_per_polygon, output_format,
+        aggregate_mode, cluster_eps_km, cluster_min_samples, timeout
+      } = schema.parse(req.body);
       
       // 查找输入文件
       const { getUploadDir } = await import('./config');
@@ -770,6 +779,21 @@ export function registerPythonModule(app: Express) {
       const uploadsRootForNc = path.dirname(uploadDirForNc);
       const thresholdDir = path.join(uploadsRootForNc, 'threshold_file');
 
+      // 非 json 模式：结果写入输出目录（stdout 只有摘要），由前端/地图层按需读取
+      let outputFile: string | undefined;
+      if (output_format && output_format !== 'json') {
+        const { getOutputDir } = await import('./config');
+        const extMap: Record<string, string> = { ndjson: '.ndjson', flatgeobuf: '.fgb', geoparquet: '.parquet', pmtiles: '.pmtiles' };
+        outputFile = output_format === 'mvt'
+          // MVT 瓦片目录：{outputDir}/tiles/{name}/{z}/{x}/{y}.pbf，由 /python/tiles 接口按需提供
+          ? path.join(getOutputDir(), 'tiles', path.parse(inputFile).name)
+          : path.join(getOutputDir(), `${path.parse(inputFile).name}_points${extMap[output_format]}`);
+      }
+
+      // 中间结果缓存：同一输入调整阈值/多边形后重跑时复用点表、阈值采样与落区结果
+      const { getOutputDir: getOutputDirForCache } = await import('./config');
+      const interpCacheDir = path.join(getOutputDirForCache(), 'interp_cache');
+
       // 调用Python脚本
         const pyArgs: any = {
         input_file: inputFile,
@@ -779,6 +803,13 @@ export function registerPythonModule(app: Express) {
         take_max_per_polygon: take_max_per_polygon !== false,
         nuts_file,
         lau_file,
+        output_format: output_format || undefined,
+        output_file: outputFile,
+        // 可选：多边形聚合统计（aggregate_mode=stats）与 DBSCAN 聚类（cluster_eps_km）
+        aggregate_mode,
+        cluster_eps_km,
+        cluster_min_samples,
+        cache_dir: interpCacheDir,
         ...buildGridThresholdArgs(thresholdMode, gridRpForFilter, gridInterpMethod, value_threshold, thresholdDir)
         };
 
@@ -787,9 +818,16 @@ export function registerPythonModule(app: Express) {
       });
       
       if (result.success) {
+        // 文件模式：返回结果的访问地址（MVT 为瓦片 URL 模板）
+        const outputUrl = outputFile
+          ? (output_format === 'mvt'
+            ? `/python/tiles/${path.basename(outputFile)}/{z}/{x}/{y}.pbf`
+            : `/python/outputs/${path.basename(outputFile)}`)
+          : undefined;
         res.json({
           success: true,
           data: result.data,
+          outputUrl,
           executionTime: result.executionTime
         });
       } else {
@@ -815,6 +853,53 @@ export function registerPythonModule(app: Express) {
     }
   });
   
+  // 插值结果矢量瓦片（MVT）：地图只请求可视范围内的瓦片
+  app.get('/python/tiles/:name/:z/:x/:y.pbf', async (req: Request, res: Response) => {
+    try {
+      const { getOutputDir } = await import('./config');
+      const { name, z, x, y } = req.params;
+      if (!/^[\w.-]+$/.test(name) || ![z, x, y].every(v => /^\d+$/.test(v))) {
+        return res.status(400).json({ success: false, error: 'Invalid tile path' });
+      }
+      const fs = await import('fs');
+      const tilePath = path.join(getOutputDir(), 'tiles', name, z, x, `${y}.pbf`);
+      if (!fs.existsSync(tilePath)) {
+        // 该瓦片没有点：返回空内容
+        return res.status(204).end();
+      }
+      res.setHeader('Content-Type', 'application/x-protobuf');
+      res.setHeader('Cache-Control', 'public, max-age=3600');
+      fs.createReadStream(tilePath).pipe(res);
+    } catch (error: any) {
+      res.status(500).json({ success: false, error: error.message || 'Unknown error' });
+    }
+  });
+
+  // 插值结果文件（ndjson / flatgeobuf / geoparquet / pmtiles）；sendFile 支持 Range 请求，PMTiles 客户端可按需读取
+  app.get('/python/outputs/:file', async (req: Request, res: Response) => {
+    try {
+      const { getOutputDir } = await import('./config');
+      const { file } = req.params;
+      const match = /^[\w.-]+_points\.(ndjson|fgb|parquet|pmtiles)$/.exec(file);
+      if (!match) {
+        return res.status(400).json({ success: false, error: 'Invalid output file' });
+      }
+      const filePath = path.join(getOutputDir(), file);
+      if (!fs.existsSync(filePath)) {
+        return res.status(404).json({ success: false, error: 'Output file not found' });
+      }
+      const contentTypes: Record<string, string> = {
+        ndjson: 'application/x-ndjson',
+        fgb: 'application/octet-stream',
+        parquet: 'application/vnd.apache.parquet',
+        pmtiles: 'application/vnd.pmtiles',
+      };
+      res.sendFile(filePath, { headers: { 'Content-Type': contentTypes[match[1]], 'Cache-Control': 'no-cache' } });
+    } catch (error: any) {
+      res.status(500).json({ success: false, error: error.message || 'Unknown error' });
+    }
+  });
+
   // 查询 rain_event 表统计信息
   app.get('/python/rain/stats', async (_req: Request, res: Response) => {
     try {
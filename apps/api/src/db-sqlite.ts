@@ -42,6 +42,7 @@ export class SQLiteAdapter implements IDatabaseAdapter {
       CREATE INDEX IF NOT EXISTS idx_re_date ON rain_event(date);
       CREATE INDEX IF NOT EXISTS idx_re_region ON rain_event(province);
       CREATE INDEX IF NOT EXISTS idx_re_value ON rain_event(value);
+      CREATE INDEX IF NOT EXISTS idx_re_pending ON rain_event(date, rain_event_id) WHERE (searched IS NULL OR searched = 0);
       CREATE UNIQUE INDEX IF NOT EXISTS uniq_rain_event_dupe ON rain_event(date, file_name, longitude, latitude);
 
       CREATE TABLE IF NOT EXISTS rain_flood_impact (
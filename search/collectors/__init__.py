@@ -1,10 +1,12 @@
 ﻿"""数据采集器模块。"""
 
+from .async_base import AsyncBaseCollector
 from .base import BaseCollector
 from .config_loader import CollectorConfigLoader
 from .loader import CollectorLoader
 
 __all__ = [
+    "AsyncBaseCollector",
     "BaseCollector",
     "CollectorConfigLoader",
     "CollectorLoader",
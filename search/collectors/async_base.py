@@ -0,0 +1,210 @@
+"""异步采集器基础抽象。
+
+与 ``BaseCollector`` 使用相同的钩子（build_payload / dispatch / parse_response /
+post_process），区别在于 ``dispatch`` 为协程，请求经由进程内共享的
+``httpx.AsyncClient`` 发出：连接池与 keep-alive 跨事件复用，安装 ``h2`` 时启用 HTTP/2。
+
+对外仍暴露同步的 ``collect(context)``：协程提交到后台事件循环线程执行，
+因此 SearchWorkflow 可以让异步采集器与旧的同步采集器并存，按渠道逐个迁移。
+未安装 httpx 时异步采集器记录错误并返回空结果。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .base import BaseCollector
+from .resilience import CircuitOpenError, QuotaDeniedError, call_with_retry_async, is_idempotent, provider_key
+from ..config.settings import Settings
+from ..orchestrator.workflow import EventContext
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_client = None
+_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """获取（必要时启动）后台事件循环线程。"""
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None or _loop_thread is None or not _loop_thread.is_alive():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="collector-async-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def _get_client(config: Settings):
+    """获取共享的 httpx.AsyncClient（仅在事件循环线程内调用）。"""
+    global _client
+    if _client is None:
+        import httpx
+
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        limits = httpx.Limits(
+            max_connections=config.ASYNC_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.ASYNC_HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=config.ASYNC_HTTP_KEEPALIVE_SECONDS,
+        )
+        _client = httpx.AsyncClient(http2=http2, limits=limits, follow_redirects=True)
+        logger.debug("已创建共享异步 HTTP 客户端（http2=%s）", http2)
+    return _client
+
+
+async def _in_context(coro, ctx: contextvars.Context) -> Any:
+    for var, value in ctx.items():
+        var.set(value)
+    return await coro
+
+
+def run_coroutine(coro, timeout: Optional[float] = None) -> Any:
+    """在后台事件循环中执行协程并同步等待结果；超时时取消协程并抛出 TimeoutError。
+
+    协程在调用方 contextvars 的副本中运行（详细日志的事件归属），``asyncio.to_thread`` 会继续传递。
+    """
+    future = asyncio.run_coroutine_threadsafe(_in_context(coro, contextvars.copy_context()), _get_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+def shutdown() -> None:
+    """关闭共享客户端并停止事件循环（进程退出时自动调用）。"""
+    global _client, _loop
+    loop = _loop
+    if loop is None or not loop.is_running():
+        return
+    if _client is not None:
+        client, _client = _client, None
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(5)
+        except Exception:
+            logger.debug("关闭异步 HTTP 客户端失败", exc_info=True)
+    loop.call_soon_threadsafe(loop.stop)
+    _loop = None
+
+
+atexit.register(shutdown)
+
+
+class AsyncBaseCollector(BaseCollector):
+    """基于共享异步 HTTP 客户端的采集器基类。
+
+    子类与同步采集器一样实现 ``build_payload`` 与 ``parse_response``；
+    ``parse_response`` 收到的是 ``httpx.Response``（``status_code`` / ``json()`` 与 requests 一致）。
+    """
+
+    is_async = True
+
+    def collect(self, context: EventContext) -> List[Dict[str, Any]]:
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            logger.error("未安装 httpx，跳过异步采集器 %s。Please install: pip install httpx[http2]", self.channel_name)
+            return []
+        return run_coroutine(self.collect_async(context), self.collect_timeout(context))
+
+    def collect_timeout(self, context: EventContext) -> float:
+        """与 SearchWorkflow 相同的单采集器时限；超时后取消协程，不再占用事件循环与连接。"""
+        channel_config = ((context.query_plan or {}).get("channels") or {}).get(self.channel_name) or {}
+        return float(channel_config.get("timeout_seconds") or self.config.COLLECTOR_TIMEOUT_SECONDS)
+
+    async def collect_async(self, context: EventContext) -> List[Dict[str, Any]]:
+        plan = context.query_plan or {}
+        channel_config = (plan.get("channels") or {}).get(self.channel_name)
+        if not channel_config or not channel_config.get("enabled", True):
+            logger.debug("%s 渠道未启用，跳过", self.channel_name)
+            return []
+
+        semaphore = asyncio.Semaphore(max(1, self.config.COLLECTOR_LANGUAGE_CONCURRENCY))
+        continuations: Dict[str, Dict[str, Any]] = {}
+
+        async def fetch_language(language: str, keywords: List[str], query_string: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    # 详细日志、缓存与限流器读写 SQLite/文件，放到线程中执行，不阻塞共享事件循环
+                    payload = await asyncio.to_thread(
+                        self.prepare_request, context, channel_config, language, keywords, query_string
+                    )
+                    response = await self.fetch_page_async(context, channel_config, payload, language)
+                    if response is not None:
+                        self.remember_next_page(continuations, payload, response, language)
+                        return await asyncio.to_thread(self.finish_response, response, language)
+                except CircuitOpenError as exc:
+                    logger.warning("%s 跳过语言 %s：%s", self.channel_name, language, exc)
+                except Exception:
+                    logger.exception("%s 渠道采集失败（语言 %s）", self.channel_name, language)
+                self.mark_skipped(context, language)
+                return []
+
+        # gather 按提交顺序返回，结果顺序与查询计划中的语言顺序一致
+        chunks = await asyncio.gather(*(fetch_language(*task) for task in self.language_tasks(context)))
+        fetched: List[Dict[str, Any]] = []
+        for chunk in chunks:
+            fetched.extend(chunk)
+        items = self.post_process(fetched, channel_config)
+        self.open_stream(context, channel_config, fetched, items, continuations)
+        return items
+
+    async def fetch_page_async(
+        self, context: EventContext, channel_config: Dict[str, Any], payload: Dict[str, Any], language: str
+    ) -> Optional[Any]:
+        cache_key, response = await asyncio.to_thread(self.cache_lookup, context, payload, language)
+        if response is None:
+            try:
+                response = await self.dispatch(payload, permit=lambda: self.acquire_quota(context, channel_config))
+            except QuotaDeniedError:
+                return None
+            await asyncio.to_thread(self.report_rate_limit, channel_config, response)
+            await asyncio.to_thread(self.cache_store, cache_key, channel_config, response)
+        return response
+
+    def fetch_page(
+        self, context: EventContext, channel_config: Dict[str, Any], payload: Dict[str, Any], language: str
+    ) -> Optional[Any]:
+        """同步取页（供结果流在消费者线程中逐页拉取），请求仍经共享异步客户端发出。"""
+        return run_coroutine(
+            self.fetch_page_async(context, channel_config, payload, language), self.collect_timeout(context)
+        )
+
+    async def dispatch(self, payload: Dict[str, Any], permit: Optional[Callable[[], bool]] = None):
+        """发送请求：与同步版本相同的重试与熔断策略，每次尝试前获取 permit 许可。"""
+        import httpx
+
+        return await call_with_retry_async(
+            provider_key(payload),
+            lambda: self.send(payload),
+            self.config,
+            idempotent=is_idempotent(payload),
+            transient=(httpx.TransportError,),
+        )
+
+    async def send(self, payload: Dict[str, Any]):
+        """单次发出 HTTP 请求（不重试）。"""
+        client = _get_client(self.config)
+        method = payload.get("method", "GET").upper()
+        url = payload["url"]
+        logger.debug("%s 请求 %s", self.channel_name, url)
+        return await client.request(
+            method,
+            url,
+            headers=payload.get("headers"),
+            params=payload.get("params"),
+            json=payload.get("data") if method == "POST" else None,
+            timeout=payload.get("timeout", 20),
+        )
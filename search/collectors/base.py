@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
+import contextvars
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 from requests import Response
 
+from .resilience import CircuitOpenError, QuotaDeniedError
 from ..config.settings import Settings, settings
 from ..orchestrator.workflow import EventContext
+from ..utils.http import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -19,67 +23,325 @@ class BaseCollector:
     """统一处理请求、错误与结果格式。"""
 
     channel_name: str = "base"
+    # 是否为异步采集器（见 async_base.AsyncBaseCollector）
+    is_async: bool = False
 
     def __init__(self, config: Settings | None = None):
         self.config = config or settings
-        self.session = requests.Session()
+
+    @property
+    def session(self) -> requests.Session:
+        """当前线程的会话；连接池进程级共享，跨采集器与事件复用 keep-alive 连接。"""
+        return get_session(self.config)
 
     def collect(self, context: EventContext) -> List[Dict[str, Any]]:
-        from ..utils.detailed_logger import get_detailed_logger
-        
-        detailed_logger = get_detailed_logger()
         plan = context.query_plan or {}
         channel_config = (plan.get("channels") or {}).get(self.channel_name)
         if not channel_config or not channel_config.get("enabled", True):
             logger.debug("%s 渠道未启用，跳过", self.channel_name)
             return []
 
+        continuations: Dict[str, Dict[str, Any]] = {}
+
+        def fetch_language(language: str, keywords: List[str], query_string: str) -> List[Dict[str, Any]]:
+            payload = self.prepare_request(context, channel_config, language, keywords, query_string)
+            response = self.fetch_page(context, channel_config, payload, language)
+            if response is None:
+                self.mark_skipped(context, language)
+                return []
+            self.remember_next_page(continuations, payload, response, language)
+            return self.finish_response(response, language)
+
+        fetched = self.collect_languages(context, fetch_language)
+        items = self.post_process(fetched, channel_config)
+        self.open_stream(context, channel_config, fetched, items, continuations)
+        return items
+
+    def fetch_page(
+        self, context: EventContext, channel_config: Dict[str, Any], payload: Dict[str, Any], language: str
+    ) -> Optional[Any]:
+        """取得一页响应：先查缓存，未命中时请求并写缓存；每次尝试（含重试）都需限流许可，被拒绝时返回 None。"""
+        cache_key, response = self.cache_lookup(context, payload, language)
+        if response is None:
+            try:
+                response = self.dispatch(payload, permit=lambda: self.acquire_quota(context, channel_config))
+            except QuotaDeniedError:
+                return None
+            self.report_rate_limit(channel_config, response)
+            self.cache_store(cache_key, channel_config, response)
+        return response
+
+    def next_page_payload(self, payload: Dict[str, Any], response: Any) -> Optional[Dict[str, Any]]:
+        """由当前页请求与响应构造下一页请求；不支持分页或已是最后一页时返回 None。"""
+        return None
+
+    def remember_next_page(
+        self, continuations: Dict[str, Dict[str, Any]], payload: Dict[str, Any], response: Any, language: str
+    ) -> None:
+        try:
+            next_payload = self.next_page_payload(payload, response)
+        except Exception:
+            logger.debug("%s 解析分页信息失败（语言 %s）", self.channel_name, language, exc_info=True)
+            return
+        if next_payload:
+            continuations[language] = next_payload
+
+    def open_stream(
+        self,
+        context: EventContext,
+        channel_config: Dict[str, Any],
+        fetched: List[Dict[str, Any]],
+        kept: List[Dict[str, Any]],
+        continuations: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """为后续消费者登记惰性结果流（context.source_streams[channel]）。
+
+        流先产出首页中被 max_results 截断的条目，再按需逐页请求；消费者够数后停止迭代，
+        后续页就不会被请求。
+        """
+        max_pages = channel_config.get("max_pages") or self.config.COLLECTOR_MAX_PAGES
+        seen = {item.get("url") for item in kept}
+        leftovers = [item for item in self.deduplicate(fetched) if item.get("url") not in seen]
+        if max_pages <= 1:
+            continuations = {}
+        if not leftovers and not continuations:
+            return
+        stream = self.iter_more(context, channel_config, leftovers, dict(continuations), seen, max_pages)
+        with context.streams_lock:
+            # 采集超时被放弃时事件可能已经收尾，不再登记
+            if not context.streams_closed:
+                context.source_streams[self.channel_name] = stream
+
+    def iter_more(
+        self,
+        context: EventContext,
+        channel_config: Dict[str, Any],
+        leftovers: List[Dict[str, Any]],
+        continuations: Dict[str, Dict[str, Any]],
+        seen: set,
+        max_pages: int,
+    ) -> Iterator[Dict[str, Any]]:
+        """惰性产出更多结果：先产出首页剩余条目，再按语言轮询请求后续页，直到没有下一页或达到 max_pages。
+
+        后续页与首页一样经过 post_process 与时间窗过滤（不按 max_results 截断）。
+        """
+        for item in self.filter_window(context, leftovers):
+            seen.add(item.get("url"))
+            yield item
+        page_config = {**channel_config, "max_results": None}
+        pending = [(language, payload, 2) for language, payload in continuations.items()]
+        while pending:
+            language, payload, page = pending.pop(0)
+            logger.debug("%s 拉取第 %s 页（语言 %s）", self.channel_name, page, language)
+            try:
+                response = self.fetch_page(context, channel_config, payload, language)
+                if response is None:
+                    continue
+                chunk = self.finish_response(response, language)
+                chunk = self.filter_window(context, self.post_process(chunk, page_config))
+                next_payload = self.next_page_payload(payload, response)
+            except CircuitOpenError as exc:
+                logger.warning("%s 停止分页（语言 %s）：%s", self.channel_name, language, exc)
+                continue
+            except Exception:
+                logger.exception("%s 分页采集失败（语言 %s，第 %s 页）", self.channel_name, language, page)
+                continue
+            for item in chunk:
+                url = item.get("url")
+                if not url or url in seen:
+                    continue
+                seen.add(url)
+                yield item
+            if next_payload and page < max_pages:
+                pending.append((language, next_payload, page + 1))
+
+    def prepare_request(
+        self,
+        context: EventContext,
+        channel_config: Dict[str, Any],
+        language: str,
+        keywords: List[str],
+        query_string: str,
+    ) -> Dict[str, Any]:
+        """构建请求负载并记录搜索请求（同步/异步采集器共用）。"""
+        from ..utils.detailed_logger import get_detailed_logger
+
+        payload = self.build_payload(
+            context=context,
+            channel_config=channel_config,
+            language=language,
+            keywords=keywords,  # 保留原始列表（用于日志）
+            query_string=query_string,  # 自然语言查询字符串（用于实际搜索）
+        )
+        # 记录搜索请求
+        get_detailed_logger().log_search_request(
+            collector_name=self.__class__.__name__,
+            channel=self.channel_name,
+            language=language,
+            keywords=keywords,
+            payload=payload,
+            query_string=query_string,
+        )
+        return payload
+
+    def mark_skipped(self, context: EventContext, language: str) -> None:
+        """记录某语言的首页请求未完成（限流/配额拒绝、熔断或请求失败），渠道产出统计不计入该语言。"""
+        context.metadata.setdefault("skipped_requests", []).append([self.channel_name, language])
+
+    def provider_name(self, channel_config: Dict[str, Any]) -> str:
+        return channel_config.get("provider") or self.channel_name
+
+    def acquire_quota(self, context: EventContext, channel_config: Dict[str, Any]) -> bool:
+        """按提供商限流与每日配额获取请求许可（可能阻塞等待令牌）；被拒绝时返回 False。"""
+        from .rate_limit import get_rate_limiter
+
+        if not (channel_config.get("rate_per_minute") or channel_config.get("daily_quota")):
+            return True
+        limiter = get_rate_limiter(self.config)
+        if limiter is None:
+            return True
+        allowed = limiter.acquire(
+            self.provider_name(channel_config),
+            rate_per_minute=channel_config.get("rate_per_minute"),
+            burst=channel_config.get("burst"),
+            daily_quota=channel_config.get("daily_quota"),
+            priority=context.rain_event.rainfall_mm or 0.0,
+        )
+        if not allowed:
+            logger.warning("%s 受限流/配额限制，跳过事件 %s 的本次请求", self.channel_name, context.rain_event.event_id)
+        return allowed
+
+    def report_rate_limit(self, channel_config: Dict[str, Any], response: Any) -> None:
+        """响应为 429 时通知限流器暂停该提供商。"""
+        from .rate_limit import get_rate_limiter
+
+        if getattr(response, "status_code", None) != 429:
+            return
+        limiter = get_rate_limiter(self.config)
+        if limiter is None:
+            return
+        retry_after = None
+        try:
+            retry_after = float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+        limiter.report_throttled(self.provider_name(channel_config), retry_after)
+
+    def cache_lookup(
+        self, context: EventContext, payload: Dict[str, Any], language: str
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """查询响应缓存，返回 (cache_key, cached_response)。
+
+        缓存被禁用或本次运行要求绕过时返回 (None, None)；命中时记录到详细日志，不再发起网络请求。
+        """
+        from .cache import get_response_cache, make_cache_key
+        from ..utils.detailed_logger import get_detailed_logger
+
+        if context.metadata.get("no_cache"):
+            return None, None
+        cache = get_response_cache(self.config)
+        if cache is None:
+            return None, None
+        key = make_cache_key(self.channel_name, payload)
+        try:
+            cached = cache.get(key)
+        except Exception:
+            logger.exception("%s 读取响应缓存失败", self.channel_name)
+            return key, None
+        if cached is not None:
+            get_detailed_logger().log_cache_hit(
+                collector_name=self.__class__.__name__,
+                channel=self.channel_name,
+                language=language,
+                cache_key=key,
+                age_seconds=cached.age_seconds,
+            )
+        return key, cached
+
+    def cache_store(self, cache_key: Optional[str], channel_config: Dict[str, Any], response: Any) -> None:
+        """将成功响应（HTTP 200 或 SDK 返回的 JSON）写入缓存。"""
+        from .cache import get_response_cache
+
+        if not cache_key:
+            return
+        if getattr(response, "status_code", 200) != 200:
+            return
+        cache = get_response_cache(self.config)
+        if cache is None:
+            return
+        ttl = channel_config.get("cache_ttl_seconds") or self.config.SEARCH_CACHE_TTL_SECONDS
+        try:
+            cache.put(cache_key, self.channel_name, response, ttl)
+        except Exception:
+            logger.exception("%s 写入响应缓存失败", self.channel_name)
+
+    def finish_response(self, response: Any, language: str) -> List[Dict[str, Any]]:
+        """解析响应并记录搜索响应（同步/异步采集器共用）。"""
+        from ..utils.detailed_logger import get_detailed_logger
+
+        chunk = list(self.parse_response(response, language))
+        # 记录搜索响应
+        get_detailed_logger().log_search_response(
+            collector_name=self.__class__.__name__,
+            channel=self.channel_name,
+            language=language,
+            response_data=chunk,
+            items_count=len(chunk),
+        )
+        return chunk
+
+    @staticmethod
+    def language_tasks(context: EventContext) -> List[tuple]:
+        """从查询计划中取出 (language, keywords, query_string) 列表，保持计划中的语言顺序。"""
+        plan = context.query_plan or {}
         keywords_map = plan.get("keywords") or {}
         query_strings_map = plan.get("query_strings") or {}  # 新增：自然语言查询字符串
-        items: List[Dict[str, Any]] = []
+        tasks = []
         for language, keywords in keywords_map.items():
             if not keywords:
                 continue
-            
-            # 获取自然语言查询字符串（如果可用）
-            query_string = query_strings_map.get(language)
-            if not query_string:
-                # 如果没有提供，使用关键词列表组合（但会有重复问题）
-                query_string = " ".join(keywords)
-            
+            # 获取自然语言查询字符串（如果可用）；否则使用关键词列表组合（但会有重复问题）
+            query_string = query_strings_map.get(language) or " ".join(keywords)
+            tasks.append((language, keywords, query_string))
+        return tasks
+
+    def collect_languages(
+        self,
+        context: EventContext,
+        fetch: Callable[[str, List[str], str], List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """按语言并发执行 fetch(language, keywords, query_string)。
+
+        并发度由 ``COLLECTOR_LANGUAGE_CONCURRENCY`` 控制；单个语言失败只记录日志。
+        结果按查询计划中的语言顺序拼接，与完成先后无关，保证输出确定。
+        """
+        tasks = self.language_tasks(context)
+        if not tasks:
+            return []
+
+        def run(task) -> List[Dict[str, Any]]:
+            language, keywords, query_string = task
             try:
-                payload = self.build_payload(
-                    context=context,
-                    channel_config=channel_config,
-                    language=language,
-                    keywords=keywords,  # 保留原始列表（用于日志）
-                    query_string=query_string,  # 自然语言查询字符串（用于实际搜索）
-                )
-                # 记录搜索请求
-                detailed_logger.log_search_request(
-                    collector_name=self.__class__.__name__,
-                    channel=self.channel_name,
-                    language=language,
-                    keywords=keywords,
-                    payload=payload,
-                    query_string=query_string,
-                )
-                
-                response = self.dispatch(payload)
-                chunk = list(self.parse_response(response, language))
-                items.extend(chunk)
-                
-                # 记录搜索响应
-                detailed_logger.log_search_response(
-                    collector_name=self.__class__.__name__,
-                    channel=self.channel_name,
-                    language=language,
-                    response_data=chunk,
-                    items_count=len(chunk),
-                )
+                return fetch(language, keywords, query_string)
+            except CircuitOpenError as exc:
+                logger.warning("%s 跳过语言 %s：%s", self.channel_name, language, exc)
             except Exception:
-                logger.exception("%s 渠道采集失败", self.channel_name)
-        return self.post_process(items, channel_config)
+                logger.exception("%s 渠道采集失败（语言 %s）", self.channel_name, language)
+            self.mark_skipped(context, language)
+            return []
+
+        workers = max(1, min(self.config.COLLECTOR_LANGUAGE_CONCURRENCY, len(tasks)))
+        if workers == 1:
+            chunks = [run(task) for task in tasks]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.channel_name}-lang") as pool:
+                # 每个任务复制调用方的 contextvars（详细日志的事件归属）
+                futures = [pool.submit(contextvars.copy_context().run, run, task) for task in tasks]
+                chunks = [future.result() for future in futures]
+        items: List[Dict[str, Any]] = []
+        for chunk in chunks:
+            items.extend(chunk)
+        return items
 
     # ------------------------------------------------------------------
     def build_payload(
@@ -98,7 +360,24 @@ class BaseCollector:
         """
         raise NotImplementedError
 
-    def dispatch(self, payload: Dict[str, Any]) -> Response:
+    def dispatch(self, payload: Dict[str, Any], permit: Optional[Callable[[], bool]] = None) -> Response:
+        """发送请求：幂等请求在网络错误与 5xx 时按抖动退避重试，并经提供商熔断器放行。
+
+        permit 在每次尝试前调用（限流/配额许可），返回 False 时抛出 QuotaDeniedError。
+        """
+        from .resilience import call_with_retry, is_idempotent, provider_key
+
+        return call_with_retry(
+            provider_key(payload),
+            lambda: self.send(payload),
+            self.config,
+            idempotent=is_idempotent(payload),
+            transient=(requests.ConnectionError, requests.Timeout),
+            permit=permit,
+        )
+
+    def send(self, payload: Dict[str, Any]) -> Response:
+        """单次发出 HTTP 请求（不重试）。"""
         method = payload.get("method", "GET")
         url = payload["url"]
         headers = payload.get("headers")
@@ -122,6 +401,10 @@ class BaseCollector:
             items = items[: max_results]
         return self.deduplicate(items)
 
+    def filter_window(self, context: EventContext, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """按事件时间窗过滤条目（默认不过滤）；采集结果与结果流的后续页共用。"""
+        return items
+
     @staticmethod
     def deduplicate(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         seen = set()
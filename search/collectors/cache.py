@@ -0,0 +1,186 @@
+"""采集器 HTTP 响应缓存。
+
+对同一事件重复运行 deep_search（重试、调整提示词、重新处理）时，相同的请求负载
+直接命中本地缓存，不再消耗 TheNewsAPI 每日配额与 Tavily 额度。
+
+- 键：规范化后的请求负载（method、url、params、data）哈希，排除 API Key 等密钥字段与 headers；
+- 存储：SQLite 单文件（``SEARCH_CACHE_DIR/responses.sqlite3``）；
+- 过期：按渠道 TTL（渠道配置 ``cache_ttl_seconds``，缺省 ``SEARCH_CACHE_TTL_SECONDS``）；
+- 容量：超过 ``SEARCH_CACHE_MAX_MB`` 时按最近访问时间（LRU）淘汰；
+- 绕过：``SEARCH_CACHE_ENABLED=false``、``context.metadata["no_cache"]`` 或 ``deep_search.py --no-cache``。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# 不参与缓存键的字段（小写比较）
+_SECRET_FIELDS = {
+    "api_key",
+    "apikey",
+    "api_token",
+    "key",
+    "token",
+    "access_token",
+    "bearer_token",
+    "client_secret",
+    "x-api-key",
+    "authorization",
+}
+
+
+def _strip_secrets(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _strip_secrets(v) for k, v in value.items() if str(k).lower() not in _SECRET_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [_strip_secrets(v) for v in value]
+    return value
+
+
+def make_cache_key(channel: str, payload: Dict[str, Any]) -> str:
+    """由渠道名与请求负载生成缓存键（排除密钥与 headers）。"""
+    normalized = {
+        "channel": channel,
+        "method": str(payload.get("method", "GET")).upper(),
+        "url": payload.get("url"),
+        "params": _strip_secrets(payload.get("params") or {}),
+        "data": _strip_secrets(payload.get("data") or {}),
+    }
+    raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CachedResponse:
+    """缓存命中时返回的响应对象，提供 parse_response 用到的 requests/httpx 接口子集。"""
+
+    from_cache = True
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes, url: str = "", age_seconds: float = 0.0):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.age_seconds = age_seconds
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class ResponseCache:
+    """基于 SQLite 的响应缓存（线程安全，进程内共享一个连接）。"""
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                channel TEXT NOT NULL,
+                url TEXT,
+                status_code INTEGER NOT NULL,
+                headers TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status_code, headers, body, url, created_at, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            status_code, headers, body, url, created_at, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return CachedResponse(status_code, json.loads(headers or "{}"), body, url or "", now - created_at)
+
+    def put(self, key: str, channel: str, response: Any, ttl_seconds: float) -> None:
+        """写入响应。response 可以是 requests/httpx 响应，也可以是 SDK 返回的 JSON 对象。"""
+        if isinstance(response, (dict, list)):
+            status_code, headers, url = 200, {}, ""
+            body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        else:
+            status_code = response.status_code
+            headers = {"content-type": response.headers.get("content-type", "")}
+            url = str(getattr(response, "url", "") or "")
+            body = response.content
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, channel, url, status_code, json.dumps(headers), body, len(body), now, now + ttl_seconds, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """删除过期条目；总大小超限时按 accessed_at 从旧到新淘汰。"""
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        logger.debug("响应缓存超出上限，已淘汰 %s 条（%.1f KB）", len(stale), freed / 1024)
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(config: Settings, name: str = "responses") -> Optional[ResponseCache]:
+    """获取进程内共享的缓存（``SEARCH_CACHE_DIR/<name>.sqlite3``）；缓存被禁用或无法打开时返回 None。"""
+    if not config.SEARCH_CACHE_ENABLED:
+        return None
+    path = Path(config.SEARCH_CACHE_DIR) / f"{name}.sqlite3"
+    with _caches_lock:
+        cache = _caches.get(str(path))
+        if cache is None:
+            try:
+                cache = ResponseCache(path, int(config.SEARCH_CACHE_MAX_MB * 1024 * 1024))
+            except Exception:
+                logger.exception("无法打开响应缓存 %s，本次不使用缓存", path)
+                return None
+            _caches[str(path)] = cache
+        return cache
@@ -1,10 +1,17 @@
-"""采集器动态加载器。"""
+"""采集器动态加载器。
+
+默认返回惰性代理（``COLLECTOR_LAZY_LOADING``）：采集器模块与 SDK 在第一次真正采集时才导入并实例化，
+查询计划中未启用的渠道完全不导入。每个采集器的导入与构造耗时记录在
+``CollectorLoader.import_profile``，供 ``deep_search.py --profile-startup`` 输出。
+"""
 
 from __future__ import annotations
 
 import importlib
 import logging
-from typing import Any, Dict, Type
+import threading
+import time
+from typing import Any, Dict, List, Type
 
 from .base import BaseCollector
 from .config_loader import CollectorConfigLoader
@@ -13,9 +20,54 @@ from ..config.settings import Settings, settings
 logger = logging.getLogger(__name__)
 
 
+class LazyCollector:
+    """采集器惰性代理：首次调用 collect（且渠道在查询计划中启用）时才导入模块并构造实例。"""
+
+    def __init__(self, loader: "CollectorLoader", category: str, collector_name: str):
+        self._loader = loader
+        self._category = category
+        # 注册表中的名称即渠道名
+        self.channel_name = collector_name
+        self._instance: BaseCollector | None = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def _materialize(self) -> BaseCollector | None:
+        with self._lock:
+            if self._instance is None and not self._failed:
+                self._instance = self._loader.instantiate(self._category, self.channel_name)
+                self._failed = self._instance is None
+            return self._instance
+
+    def collect(self, context: Any) -> List[Dict[str, Any]]:
+        channel_config = ((context.query_plan or {}).get("channels") or {}).get(self.channel_name)
+        if not channel_config or not channel_config.get("enabled", True):
+            logger.debug("%s 渠道未启用，跳过（未加载采集器）", self.channel_name)
+            return []
+        instance = self._materialize()
+        if instance is None:
+            return []
+        return instance.collect(context)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        instance = self._materialize()
+        if instance is None:
+            raise AttributeError(name)
+        return getattr(instance, name)
+
+
 class CollectorLoader:
     """根据配置动态加载采集器。"""
 
+    # 各采集器的导入与构造耗时（秒），进程内累计：{collector_name: {"import": s, "init": s}}
+    import_profile: Dict[str, Dict[str, float]] = {}
+
     # 采集器类映射表
     COLLECTOR_REGISTRY: Dict[str, Dict[str, str]] = {
         "news": {
@@ -39,23 +91,50 @@ class CollectorLoader:
         self.config = config or settings
         self.config_loader = CollectorConfigLoader(self.config)
 
-    def load_all(self) -> Dict[str, BaseCollector]:
-        """根据配置加载所有启用的采集器。"""
+    def load_all(self) -> Dict[str, Any]:
+        """根据配置加载所有启用的采集器（惰性加载时返回 LazyCollector 代理）。"""
         enabled = self.config_loader.get_enabled_collectors()
-        collectors: Dict[str, BaseCollector] = {}
+        collectors: Dict[str, Any] = {}
 
         for category, collector_names in enabled.items():
             for collector_name in collector_names:
-                try:
-                    collector_class = self._load_collector_class(category, collector_name)
-                    if collector_class:
-                        collectors[collector_name] = collector_class(self.config)
-                        logger.debug("已加载采集器: %s", collector_name)
-                except Exception:
-                    logger.exception("加载采集器 %s 失败", collector_name)
+                if self.config.COLLECTOR_LAZY_LOADING:
+                    if self.COLLECTOR_REGISTRY.get(category, {}).get(collector_name):
+                        collectors[collector_name] = LazyCollector(self, category, collector_name)
+                    else:
+                        logger.warning("未找到采集器 %s 的注册信息", collector_name)
+                    continue
+                collector = self.instantiate(category, collector_name)
+                if collector is not None:
+                    collectors[collector_name] = collector
 
         return collectors
 
+    def instantiate(self, category: str, collector_name: str) -> BaseCollector | None:
+        """导入并构造单个采集器，记录耗时；失败时返回 None。"""
+        try:
+            started = time.perf_counter()
+            collector_class = self._load_collector_class(category, collector_name)
+            imported = time.perf_counter()
+            if not collector_class:
+                return None
+            collector = collector_class(self.config)
+            self.import_profile[collector_name] = {
+                "import": imported - started,
+                "init": time.perf_counter() - imported,
+            }
+            logger.debug(
+                "已加载采集器: %s（%s，导入 %.0fms，构造 %.0fms）",
+                collector_name,
+                "async" if collector_class.is_async else "sync",
+                (imported - started) * 1000,
+                self.import_profile[collector_name]["init"] * 1000,
+            )
+            return collector
+        except Exception:
+            logger.exception("加载采集器 %s 失败", collector_name)
+            return None
+
     def _load_collector_class(
         self, category: str, collector_name: str
     ) -> Type[BaseCollector] | None:
@@ -71,6 +150,7 @@ class CollectorLoader:
             module_path, class_name = class_path.rsplit(".", 1)
             module = importlib.import_module(module_path)
             collector_class = getattr(module, class_name)
+            # AsyncBaseCollector 同样继承 BaseCollector，同步/异步采集器可并存
             if not issubclass(collector_class, BaseCollector):
                 logger.error("%s 不是 BaseCollector 的子类", class_path)
                 return None
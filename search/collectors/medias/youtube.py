@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 
 from ..base import BaseCollector
 from ...orchestrator.workflow import EventContext
@@ -102,8 +102,18 @@ class MediaYouTubeCollector(BaseCollector):
                 "thumbnails": snippet.get("thumbnails"),
             }
 
+    def next_page_payload(self, payload: Dict[str, Any], response) -> Optional[Dict[str, Any]]:
+        if response.status_code != 200:
+            return None
+        token = response.json().get("nextPageToken")
+        if not token:
+            return None
+        return {**payload, "params": {**(payload.get("params") or {}), "pageToken": token}}
+
     def collect(self, context: EventContext) -> List[Dict[str, Any]]:
-        items = super().collect(context)
+        return self.filter_window(context, super().collect(context))
+
+    def filter_window(self, context: EventContext, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         plan = context.query_plan or {}
         hours = plan.get("time_window_hours", 72)
         return self.filter_by_time(items, hours + 24)
@@ -3,15 +3,15 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 
-from ..base import BaseCollector
+from ..async_base import AsyncBaseCollector
 from ...orchestrator.workflow import EventContext
 
 logger = logging.getLogger(__name__)
 
 
-class NewsTheNewsAPICollector(BaseCollector):
+class NewsTheNewsAPICollector(AsyncBaseCollector):
     channel_name = "news_thenewsapi"
 
     def build_payload(
@@ -97,6 +97,17 @@ class NewsTheNewsAPICollector(BaseCollector):
                 "source": item.get("source", ""),
             }
 
+    def next_page_payload(self, payload: Dict[str, Any], response) -> Optional[Dict[str, Any]]:
+        if response.status_code != 200:
+            return None
+        meta = response.json().get("meta") or {}
+        params = payload.get("params") or {}
+        page = int(meta.get("page") or params.get("page", 1))
+        limit = int(meta.get("limit") or params.get("limit") or 0)
+        if not limit or page * limit >= int(meta.get("found") or 0):
+            return None
+        return {**payload, "params": {**params, "page": page + 1}}
+
     def post_process(
         self, items: List[Dict[str, Any]], channel_config: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
@@ -8,9 +8,12 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
 
 from ..base import BaseCollector
+from ..resilience import CircuitOpenError, QuotaDeniedError, call_with_retry
 from ...orchestrator.workflow import EventContext
 
 logger = logging.getLogger(__name__)
@@ -121,6 +124,8 @@ class OfficialTavilyCollector(BaseCollector):
                 "max_results": channel_config.get("max_results", 8),
             },
             "timeout": 30,
+            # 搜索为只读查询，POST 也可安全重试
+            "idempotent": True,
         }
 
     def parse_response(self, response, language: str) -> Iterable[Dict[str, Any]]:
@@ -149,20 +154,14 @@ class OfficialTavilyCollector(BaseCollector):
             logger.debug("%s 渠道未启用，跳过", self.channel_name)
             return []
 
-        keywords_map = plan.get("keywords") or {}
         items: List[Dict[str, Any]] = []
         
         # 优先使用官方 SDK
         if self._has_sdk:
             try:
                 client = self._get_client()
-                query_strings_map = plan.get("query_strings") or {}
-                for language, keywords in keywords_map.items():
-                    if not keywords:
-                        continue
-                    # 优先使用自然语言查询字符串
-                    query = query_strings_map.get(language) or " ".join(keywords)
-                    
+
+                def search_language(language: str, keywords: List[str], query: str) -> List[Dict[str, Any]]:
                     # 时间信息已经在 keywords 中（通过 KeywordPlanner 添加）
                     # 但可以在这里确保查询包含时间
                     event_time = context.rain_event.event_time
@@ -184,6 +183,7 @@ class OfficialTavilyCollector(BaseCollector):
                             date_str = f"{month_names.get(event_time.month, '')} {event_time.day}, {event_time.year}"
                         query = f"{query} {date_str}"
                     
+                    chunk: List[Dict[str, Any]] = []
                     try:
                         # 获取API Key用于调试（不记录完整内容）
                         api_key = self.config.TAVILY_API_KEY
@@ -191,16 +191,42 @@ class OfficialTavilyCollector(BaseCollector):
                                     query[:50] if len(query) > 50 else query,
                                     api_key[:8] if api_key and len(api_key) > 8 else "N/A")
                         
-                        response = client.search(
-                            query=query,
-                            search_depth="advanced",
-                            max_results=channel_config.get("max_results", 8),
-                        )
+                        # SDK 请求同样走响应缓存（以等价的请求参数作为缓存键）
+                        sdk_payload = {
+                            "method": "SDK",
+                            "url": channel_config.get("base_url"),
+                            "data": {
+                                "query": query,
+                                "search_depth": "advanced",
+                                "max_results": channel_config.get("max_results", 8),
+                            },
+                        }
+                        cache_key, cached = self.cache_lookup(context, sdk_payload, language)
+                        if cached is not None:
+                            response = cached.json()
+                        else:
+                            try:
+                                # 每次尝试（含重试）都需限流/配额许可
+                                response = call_with_retry(
+                                    "tavily-sdk",
+                                    lambda: client.search(
+                                        query=query,
+                                        search_depth="advanced",
+                                        max_results=channel_config.get("max_results", 8),
+                                    ),
+                                    self.config,
+                                    transient=(requests.ConnectionError, requests.Timeout),
+                                    permit=lambda: self.acquire_quota(context, channel_config),
+                                )
+                            except QuotaDeniedError:
+                                self.mark_skipped(context, language)
+                                return chunk
+                            self.cache_store(cache_key, channel_config, response)
                         
                         # 解析 SDK 响应
                         results = response.get("results", [])
                         for item in results:
-                            items.append({
+                            chunk.append({
                                 "channel": self.channel_name,
                                 "language": language,
                                 "title": item.get("title"),
@@ -209,7 +235,11 @@ class OfficialTavilyCollector(BaseCollector):
                                 "published_at": item.get("published_date"),
                                 "source": item.get("site_name"),
                             })
+                    except CircuitOpenError as e:
+                        logger.warning("Tavily SDK 跳过语言 %s：%s", language, e)
+                        self.mark_skipped(context, language)
                     except Exception as e:
+                        self.mark_skipped(context, language)
                         error_msg = str(e)
                         logger.exception("Tavily SDK 采集失败: %s", e)
                         # 如果是认证错误，提供更详细的提示
@@ -220,6 +250,10 @@ class OfficialTavilyCollector(BaseCollector):
                             logger.error("  2. API Key 未正确传递到Python进程")
                             logger.error("  3. 请检查 .env 文件中的 TAVILY_API_KEY 是否正确")
                             logger.error("  当前API Key前缀: %s...", api_key[:8] if api_key and len(api_key) > 8 else "N/A")
+                    return chunk
+
+                # 各语言查询并发执行，结果按语言顺序合并
+                items = self.collect_languages(context, search_language)
             except Exception as e:
                 logger.warning("使用 Tavily SDK 失败，回退到 REST API: %s", e)
                 # 回退到 REST API
@@ -229,6 +263,10 @@ class OfficialTavilyCollector(BaseCollector):
             items = super().collect(context)
         
         # 时间过滤
+        return self.filter_window(context, items)
+
+    def filter_window(self, context: EventContext, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        plan = context.query_plan or {}
         hours = plan.get("time_window_hours", 48)
         return self.filter_by_time(items, hours)
 
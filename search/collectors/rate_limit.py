@@ -0,0 +1,195 @@
+"""采集器按提供商的限流与每日配额。
+
+渠道定义（query/channels.py）中记录了各提供商的硬性配额，例如 TheNewsAPI 每日 50 次、
+GNews 每日 100 次、X 的 15 分钟窗口限流。这里为每个提供商维护：
+
+- 令牌桶：``rate_per_minute`` 速率补充、``burst`` 容量；令牌不足时等待而不是直接请求触发 429；
+- 每日配额：按 UTC 日期计数，达到 ``daily_quota`` 后当天不再请求；
+- 配额预留：剩余配额低于 ``QUOTA_RESERVE_FRACTION`` 时，只为降雨量不低于
+  ``QUOTA_PRIORITY_MIN_RAINFALL_MM`` 的高价值事件放行；
+- 429 退避：收到 429 后按 Retry-After 暂停该提供商。
+
+状态保存在 SQLite（``SEARCH_CACHE_DIR/rate_limits.sqlite3``），多个进程共享同一份计数。
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRateLimiter:
+    """基于 SQLite 的跨进程令牌桶与每日配额计数。"""
+
+    def __init__(self, path: Path, config: Settings):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.config = config
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                provider TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS daily_usage (
+                provider TEXT NOT NULL,
+                day TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (provider, day)
+            )
+            """
+        )
+
+    # ------------------------------------------------------------------
+    def acquire(
+        self,
+        provider: str,
+        rate_per_minute: Optional[float] = None,
+        burst: Optional[int] = None,
+        daily_quota: Optional[int] = None,
+        priority: float = 0.0,
+    ) -> bool:
+        """为一次请求获取许可；令牌不足时等待，超过最长等待或配额耗尽时返回 False。"""
+        deadline = time.monotonic() + self.config.RATE_LIMIT_MAX_WAIT_SECONDS
+        capacity = float(burst or max(1.0, (rate_per_minute or 0) / 6.0))
+        while True:
+            wait = self._try_acquire(provider, rate_per_minute, capacity, daily_quota, priority)
+            if wait is None:
+                return False
+            if wait <= 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                logger.warning("%s 限流等待超过 %ss，跳过本次请求", provider, self.config.RATE_LIMIT_MAX_WAIT_SECONDS)
+                return False
+            time.sleep(wait)
+
+    def _try_acquire(
+        self,
+        provider: str,
+        rate_per_minute: Optional[float],
+        capacity: float,
+        daily_quota: Optional[int],
+        priority: float,
+    ) -> Optional[float]:
+        """单次尝试：返回 0 表示已获得许可，>0 为需等待秒数，None 表示配额拒绝。"""
+        now = time.time()
+        day = datetime.utcnow().strftime("%Y-%m-%d")
+        with self._lock:
+            # BEGIN IMMEDIATE 取得写锁，保证多进程下读-改-写原子
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at, blocked_until FROM buckets WHERE provider = ?", (provider,)
+                ).fetchone()
+                tokens, updated_at, blocked_until = row if row else (capacity, now, 0.0)
+                if blocked_until > now:
+                    self._conn.execute("COMMIT")
+                    return blocked_until - now
+
+                if daily_quota:
+                    used_row = self._conn.execute(
+                        "SELECT used FROM daily_usage WHERE provider = ? AND day = ?", (provider, day)
+                    ).fetchone()
+                    used = used_row[0] if used_row else 0
+                    remaining = daily_quota - used
+                    if remaining <= 0:
+                        self._conn.execute("COMMIT")
+                        logger.warning("%s 今日配额已用完（%s/%s）", provider, used, daily_quota)
+                        return None
+                    reserve = daily_quota * self.config.QUOTA_RESERVE_FRACTION
+                    if remaining <= reserve and priority < self.config.QUOTA_PRIORITY_MIN_RAINFALL_MM:
+                        self._conn.execute("COMMIT")
+                        logger.info(
+                            "%s 剩余配额 %s 进入预留区，仅供降雨量 ≥ %smm 的事件使用（当前 %s）",
+                            provider, remaining, self.config.QUOTA_PRIORITY_MIN_RAINFALL_MM, priority,
+                        )
+                        return None
+
+                if rate_per_minute:
+                    tokens = min(capacity, tokens + (now - updated_at) * rate_per_minute / 60.0)
+                    if tokens < 1.0:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)", (provider, tokens, now, blocked_until)
+                        )
+                        self._conn.execute("COMMIT")
+                        return (1.0 - tokens) * 60.0 / rate_per_minute
+                    tokens -= 1.0
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)", (provider, tokens, now, blocked_until)
+                )
+                if daily_quota:
+                    self._conn.execute(
+                        """
+                        INSERT INTO daily_usage (provider, day, used) VALUES (?, ?, 1)
+                        ON CONFLICT(provider, day) DO UPDATE SET used = used + 1
+                        """,
+                        (provider, day),
+                    )
+                self._conn.execute("COMMIT")
+                return 0.0
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def report_throttled(self, provider: str, retry_after: Optional[float] = None) -> None:
+        """收到 429 时暂停该提供商（Retry-After 秒，缺省 60 秒）。"""
+        pause = retry_after if retry_after and retry_after > 0 else 60.0
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO buckets (provider, tokens, updated_at, blocked_until) VALUES (?, 0, ?, ?)
+                ON CONFLICT(provider) DO UPDATE SET tokens = 0, updated_at = excluded.updated_at,
+                    blocked_until = excluded.blocked_until
+                """,
+                (provider, now, now + pause),
+            )
+        logger.warning("%s 返回 429，暂停 %.0fs", provider, pause)
+
+    def usage_today(self, provider: str) -> int:
+        day = datetime.utcnow().strftime("%Y-%m-%d")
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM daily_usage WHERE provider = ? AND day = ?", (provider, day)
+            ).fetchone()
+        return row[0] if row else 0
+
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(config: Settings) -> Optional[ProviderRateLimiter]:
+    """获取进程内共享的限流器；限流被禁用或无法打开时返回 None。"""
+    if not config.RATE_LIMIT_ENABLED:
+        return None
+    path = Path(config.SEARCH_CACHE_DIR) / "rate_limits.sqlite3"
+    with _limiters_lock:
+        limiter = _limiters.get(str(path))
+        if limiter is None:
+            try:
+                limiter = ProviderRateLimiter(path, config)
+            except Exception:
+                logger.exception("无法打开限流状态 %s，本次不限流", path)
+                return None
+            _limiters[str(path)] = limiter
+        return limiter
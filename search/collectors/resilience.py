@@ -0,0 +1,228 @@
+"""采集器请求的重试与熔断。
+
+- 重试：仅对幂等请求（GET，或负载中标记 ``"idempotent": True`` 的 POST）在连接错误、
+  超时与 5xx/408 时重试；退避为带上限的指数退避加全抖动（full jitter），避免多个采集线程同时重试。
+- 熔断：按提供商（请求 URL 的主机名或 SDK 名称）计数连续失败，达到
+  ``CIRCUIT_BREAKER_FAILURE_THRESHOLD`` 后在 ``CIRCUIT_BREAKER_RECOVERY_SECONDS`` 内直接失败，
+  之后放行一次探测请求：成功则恢复，失败则继续熔断。一个宕机的 API 不再让批次中每个事件
+  都白等一次完整超时。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+from urllib.parse import urlparse
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_RETRYABLE_STATUS = {408, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """提供商处于熔断状态，请求未发出。"""
+
+
+class QuotaDeniedError(RuntimeError):
+    """限流器或每日配额拒绝了本次尝试，请求未发出（重试的每次尝试都单独获取许可）。"""
+
+
+class CircuitBreaker:
+    """单个提供商的熔断器（closed → open → half_open → closed）。"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = recovery_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """是否允许发出请求；熔断冷却结束后只放行一个探测请求。"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info("%s 熔断冷却结束，发送探测请求", self.name)
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("%s 探测成功，熔断恢复", self.name)
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """请求因非网络原因中止时归还探测名额，不改变熔断状态。"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(
+                        "%s 连续失败 %s 次，熔断 %.0fs", self.name, self._failures, self.recovery_seconds
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, config: Settings) -> CircuitBreaker:
+    """获取进程内共享的提供商熔断器。"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name, config.CIRCUIT_BREAKER_FAILURE_THRESHOLD, config.CIRCUIT_BREAKER_RECOVERY_SECONDS
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def provider_key(payload: Dict[str, Any]) -> str:
+    """熔断器的提供商键：请求 URL 的主机名。"""
+    return urlparse(str(payload.get("url") or "")).netloc or str(payload.get("url"))
+
+
+def is_idempotent(payload: Dict[str, Any]) -> bool:
+    if "idempotent" in payload:
+        return bool(payload["idempotent"])
+    return str(payload.get("method", "GET")).upper() in ("GET", "HEAD")
+
+
+def is_retryable_status(status_code: Optional[int]) -> bool:
+    return status_code in _RETRYABLE_STATUS
+
+
+def backoff_delay(attempt: int, config: Settings) -> float:
+    """第 attempt 次失败后的等待时间：[0, min(上限, 基数 * 2^(attempt-1))] 内均匀抖动。"""
+    ceiling = min(config.COLLECTOR_RETRY_MAX_BACKOFF_SECONDS, config.COLLECTOR_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+def _attempts(config: Settings, idempotent: bool) -> int:
+    return max(1, config.COLLECTOR_RETRY_MAX_ATTEMPTS) if idempotent else 1
+
+
+def call_with_retry(
+    name: str,
+    send: Callable[[], Any],
+    config: Settings,
+    idempotent: bool = True,
+    transient: Tuple[Type[BaseException], ...] = (),
+    permit: Optional[Callable[[], bool]] = None,
+) -> Any:
+    """经熔断器与重试执行 send()。
+
+    transient 中的异常与 5xx/408 响应视为可重试失败；重试用尽后抛出最后的异常或返回最后的响应。
+    熔断打开时抛出 CircuitOpenError。permit（限流/配额许可）在每次尝试前、熔断器放行之前调用，
+    限流等待期间不占用探测名额；返回 False 时抛出 QuotaDeniedError。
+    """
+    breaker = get_circuit_breaker(name, config)
+    attempts = _attempts(config, idempotent)
+    for attempt in range(1, attempts + 1):
+        if permit is not None and not permit():
+            raise QuotaDeniedError(f"{name} 未获得限流/配额许可")
+        if not breaker.allow():
+            raise CircuitOpenError(f"{name} 处于熔断状态")
+        try:
+            response = send()
+        except transient as exc:
+            breaker.record_failure()
+            if attempt >= attempts:
+                raise
+            delay = backoff_delay(attempt, config)
+            logger.warning("%s 请求失败（%s），%.1fs 后重试（%s/%s）", name, exc, delay, attempt, attempts - 1)
+            time.sleep(delay)
+            continue
+        except BaseException:
+            # 含取消（asyncio.CancelledError）与中断：归还探测名额，否则熔断器会一直拒绝该提供商
+            breaker.release()
+            raise
+        if not is_retryable_status(getattr(response, "status_code", None)):
+            breaker.record_success()
+            return response
+        breaker.record_failure()
+        if attempt >= attempts:
+            return response
+        delay = backoff_delay(attempt, config)
+        logger.warning(
+            "%s 返回状态码 %s，%.1fs 后重试（%s/%s）", name, response.status_code, delay, attempt, attempts - 1
+        )
+        time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def call_with_retry_async(
+    name: str,
+    send: Callable[[], Awaitable[Any]],
+    config: Settings,
+    idempotent: bool = True,
+    transient: Tuple[Type[BaseException], ...] = (),
+    permit: Optional[Callable[[], bool]] = None,
+) -> Any:
+    """call_with_retry 的协程版本（退避使用 asyncio.sleep，阻塞的 permit 在线程中执行）。"""
+    breaker = get_circuit_breaker(name, config)
+    attempts = _attempts(config, idempotent)
+    for attempt in range(1, attempts + 1):
+        if permit is not None and not await asyncio.to_thread(permit):
+            raise QuotaDeniedError(f"{name} 未获得限流/配额许可")
+        if not breaker.allow():
+            raise CircuitOpenError(f"{name} 处于熔断状态")
+        try:
+            response = await send()
+        except transient as exc:
+            breaker.record_failure()
+            if attempt >= attempts:
+                raise
+            delay = backoff_delay(attempt, config)
+            logger.warning("%s 请求失败（%s），%.1fs 后重试（%s/%s）", name, exc, delay, attempt, attempts - 1)
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # 含取消（asyncio.CancelledError）与中断：归还探测名额，否则熔断器会一直拒绝该提供商
+            breaker.release()
+            raise
+        if not is_retryable_status(getattr(response, "status_code", None)):
+            breaker.record_success()
+            return response
+        breaker.record_failure()
+        if attempt >= attempts:
+            return response
+        delay = backoff_delay(attempt, config)
+        logger.warning(
+            "%s 返回状态码 %s，%.1fs 后重试（%s/%s）", name, response.status_code, delay, attempt, attempts - 1
+        )
+        await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
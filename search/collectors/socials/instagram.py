@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 
 from ..base import BaseCollector
 from ...orchestrator.workflow import EventContext
@@ -20,6 +20,7 @@ class SocialInstagramCollector(BaseCollector):
         channel_config: Dict[str, Any],
         language: str,
         keywords: List[str],
+        query_string: Optional[str] = None,
     ) -> Dict[str, Any]:
         access_token = (
             context.metadata.get("instagram_access_token")
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 
 from ..base import BaseCollector
 from ...orchestrator.workflow import EventContext
@@ -20,6 +20,7 @@ class SocialXTwitterCollector(BaseCollector):
         channel_config: Dict[str, Any],
         language: str,
         keywords: List[str],
+        query_string: Optional[str] = None,
     ) -> Dict[str, Any]:
         token = context.metadata.get("x_bearer_token") or self.config.X_BEARER_TOKEN
         if not token:
@@ -66,7 +67,9 @@ class SocialXTwitterCollector(BaseCollector):
             }
 
     def collect(self, context: EventContext) -> List[Dict[str, Any]]:
-        items = super().collect(context)
+        return self.filter_window(context, super().collect(context))
+
+    def filter_window(self, context: EventContext, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         plan = context.query_plan or {}
         hours = plan.get("time_window_hours", 48)
         return self.filter_by_time(items, hours)
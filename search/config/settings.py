@@ -59,6 +59,12 @@ class Settings(BaseSettings):
     )
     # SQLite 数据库文件路径（已废弃）
     DB_FILE: Optional[str] = Field(None, description="SQLite 数据库文件路径（已废弃，现在使用 PocketBase）")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(
+        5000, description="SQLite 忙等待超时（毫秒），与 Node API 并发写入时等待而不是立即报错"
+    )
+    SQLITE_MMAP_SIZE: int = Field(
+        268435456, description="SQLite 内存映射读取的大小上限（字节，0 表示关闭）"
+    )
     DB_HOST: str = Field("127.0.0.1", description="数据库主机（已废弃）")
     DB_PORT: int = Field(3306, description="数据库端口（已废弃）")
     DB_USER: str = Field("search_user", description="数据库用户名（已废弃）")
@@ -97,12 +103,142 @@ class Settings(BaseSettings):
     MAX_EVENT_LOOKBACK_HOURS: int = Field(
         48, description="从当前时间向前回溯的事件窗口（小时）"
     )
+    BATCH_QUERY_DEDUP_ENABLED: bool = Field(
+        True,
+        description="批处理时合并同省、同国家、同日期且查询相同的事件，每组只采集一次并共享结果",
+    )
+    EVENT_MAX_CONCURRENCY: int = Field(
+        4, description="批处理时同时处理的事件（查询组）数量上限（1 表示逐个处理）"
+    )
+    EVENT_COLLECTION_CONCURRENCY: int = Field(
+        2, description="批处理时同时进行采集阶段的事件数上限（限制对搜索 API 的并发压力）"
+    )
+    EVENT_LLM_CONCURRENCY: int = Field(
+        3, description="批处理时同时进行 LLM 处理（验证、提取、报告）的事件数上限；流水线验证的每个在途批次也占用一个名额"
+    )
+    DAEMON_WORKERS: int = Field(
+        4, description="常驻模式（deep_search.py --daemon）的工作线程数，可用 --workers 覆盖"
+    )
+    DAEMON_CLAIM_TTL_SECONDS: int = Field(
+        1800, description="常驻模式下事件认领的有效期（秒），超时未完成的事件可被其它进程重新认领"
+    )
+    DAEMON_RETRY_DELAY_SECONDS: int = Field(
+        900, description="常驻模式下处理失败的事件再次认领前的等待时间（秒）"
+    )
     
     # ---------------------- 搜索时间窗口配置 ----------------------
     NEWS_SEARCH_WINDOW_DAYS: int = Field(
         3, description="新闻搜索时间窗口（天），从事件当天开始向后搜索的天数"
     )
     
+    # ---------------------- 采集并发配置 ----------------------
+    COLLECTOR_MAX_WORKERS: int = Field(
+        8, description="并发执行的采集器数量上限（1 表示按顺序逐个采集）"
+    )
+    COLLECTOR_LANGUAGE_CONCURRENCY: int = Field(
+        4, description="单个采集器内各语言请求的并发数"
+    )
+    COLLECTOR_TIMEOUT_SECONDS: float = Field(
+        45.0, description="单个采集器的超时时间（秒），可在渠道配置中用 timeout_seconds 覆盖"
+    )
+    COLLECTION_DEADLINE_SECONDS: float = Field(
+        90.0, description="整个采集阶段的总截止时间（秒），超时未返回的采集器结果记为空"
+    )
+    COLLECTOR_LAZY_LOADING: bool = Field(
+        True, description="是否惰性加载采集器（首次使用时才导入模块与 SDK，未启用的渠道不导入）"
+    )
+    COLLECTOR_MAX_PAGES: int = Field(
+        3, description="分页渠道最多拉取的页数（含首页）；首页之后的页仅在预过滤候选不足时按需请求，1 表示不分页"
+    )
+    HTTP_POOL_CONNECTIONS: int = Field(
+        32, description="共享 HTTP 会话缓存的主机连接池数量"
+    )
+    HTTP_POOL_MAXSIZE: int = Field(
+        16, description="共享 HTTP 会话中每个主机的最大 keep-alive 连接数"
+    )
+    HTTP_DNS_CACHE_SECONDS: float = Field(
+        300.0, description="DNS 解析结果缓存时间（秒），0 表示不缓存"
+    )
+    ASYNC_HTTP_MAX_CONNECTIONS: int = Field(
+        20, description="异步采集器共享 HTTP 客户端的连接池上限"
+    )
+    ASYNC_HTTP_KEEPALIVE_SECONDS: float = Field(
+        60.0, description="异步采集器空闲连接保活时间（秒），跨事件复用连接"
+    )
+
+    # ---------------------- 重试与熔断配置 ----------------------
+    COLLECTOR_RETRY_MAX_ATTEMPTS: int = Field(
+        3, description="幂等请求的最大尝试次数（含首次），网络错误与 5xx 时重试"
+    )
+    COLLECTOR_RETRY_BASE_SECONDS: float = Field(
+        0.5, description="重试退避基数（秒），按 2 的幂增长并加随机抖动"
+    )
+    COLLECTOR_RETRY_MAX_BACKOFF_SECONDS: float = Field(
+        8.0, description="单次重试退避的上限（秒）"
+    )
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = Field(
+        5, description="提供商连续失败多少次后熔断（熔断期间请求直接失败）"
+    )
+    CIRCUIT_BREAKER_RECOVERY_SECONDS: float = Field(
+        60.0, description="熔断持续时间（秒），之后放行一次探测请求"
+    )
+
+    # ---------------------- 响应缓存配置 ----------------------
+    SEARCH_CACHE_ENABLED: bool = Field(
+        True, description="是否启用采集器 HTTP 响应缓存（重复运行同一事件时不再重复调用付费 API）"
+    )
+    SEARCH_CACHE_DIR: Path = Field(
+        PROJECT_ROOT / "search_outputs" / "cache",
+        description="响应缓存目录（SQLite 文件）",
+    )
+    CHECKPOINT_ENABLED: bool = Field(
+        True, description="是否按阶段写入事件检查点（重跑时从最后完成的阶段继续，不重复调用搜索 API 与 LLM）"
+    )
+    CHECKPOINT_DIR: Path = Field(
+        PROJECT_ROOT / "search_outputs" / "checkpoints",
+        description="事件检查点目录（每个事件一个子目录，按输入哈希区分）",
+    )
+    CHECKPOINT_TTL_SECONDS: int = Field(
+        86400, description="检查点阶段的有效期（秒），过期阶段及其后续阶段重新执行；0 表示不过期"
+    )
+    SEARCH_CACHE_TTL_SECONDS: int = Field(
+        86400, description="响应缓存默认有效期（秒），渠道配置 cache_ttl_seconds 可覆盖"
+    )
+    SEARCH_CACHE_MAX_MB: float = Field(
+        200.0, description="响应缓存容量上限（MB），超出后按最近访问时间淘汰"
+    )
+
+    # ---------------------- 限流与配额配置 ----------------------
+    RATE_LIMIT_ENABLED: bool = Field(
+        True, description="是否按提供商执行令牌桶限流与每日配额（状态持久化，跨进程共享）"
+    )
+    RATE_LIMIT_MAX_WAIT_SECONDS: float = Field(
+        30.0, description="单次请求等待限流令牌的最长时间（秒），超过则跳过该请求"
+    )
+    QUOTA_RESERVE_FRACTION: float = Field(
+        0.2, description="每日配额预留比例：剩余配额低于该比例时只为高价值事件放行"
+    )
+    QUOTA_PRIORITY_MIN_RAINFALL_MM: float = Field(
+        100.0, description="可使用预留配额的事件最低降雨量（毫米）"
+    )
+
+    # ---------------------- 渠道产出调度配置 ----------------------
+    CHANNEL_YIELD_ENABLED: bool = Field(
+        True, description="是否按 (渠道, 国家, 语言) 记录历史产出，并据此跳过或降级低产出渠道"
+    )
+    CHANNEL_YIELD_MIN_EVENTS: int = Field(
+        5, description="渠道在该国家的历史事件数达到该值后才参与调度"
+    )
+    CHANNEL_YIELD_SKIP_BELOW: float = Field(
+        0.1, description="期望产出（送验条目被判为相关的比例）低于该值的渠道本次跳过"
+    )
+    CHANNEL_YIELD_DEPRIORITIZE_BELOW: float = Field(
+        0.3, description="期望产出（送验相关率）低于该值的渠道降级为只取首页（不分页补充）"
+    )
+    CHANNEL_YIELD_EXPLORATION_RATE: float = Field(
+        0.1, description="被判为低产出的渠道仍照常运行的概率（探索，保持统计更新）"
+    )
+
     # ---------------------- 预过滤配置 ----------------------
     PRE_FILTER_ENABLED: bool = Field(
         True, description="是否启用预过滤（在交给LLM前进行简单规则判断）"
@@ -113,12 +249,53 @@ class Settings(BaseSettings):
     PRE_FILTER_TIME_WINDOW_DAYS: int = Field(
         3, description="预过滤时间窗口（天），只保留事件时间 + N 天内的结果（不包括事件之前的内容）"
     )
+    NEAR_DUPLICATE_ENABLED: bool = Field(
+        True, description="预过滤前是否合并近重复结果（标题+摘要 MinHash LSH 聚类，每簇保留一条）"
+    )
+    NEAR_DUPLICATE_THRESHOLD: float = Field(
+        0.6, description="判定为近重复的最低 Jaccard 相似度（MinHash 估计，0-1）"
+    )
     MAX_ITEMS_FOR_LLM_VALIDATION: int = Field(
         10, description="预过滤后交给LLM验证的最大新闻数量（建议5-15，避免token超限）"
     )
     LLM_VALIDATION_TIME_WINDOW_DAYS: int = Field(
         5, description="LLM验证时间窗口（天），用于判断搜索结果是否属于该事件（事件时间 + N 天）"
     )
+    LLM_PIPELINED_VALIDATION: bool = Field(
+        False, description="流水线验证：各采集器结果到达即按微批次预过滤并调用 LLM 验证，采集与验证耗时重叠"
+    )
+    LLM_PIPELINE_BATCH_SIZE: int = Field(
+        5, description="流水线验证每个微批次的条目数"
+    )
+    LLM_PIPELINE_MAX_INFLIGHT: int = Field(
+        3, description="流水线验证同时进行的 LLM 调用数"
+    )
+    LLM_PIPELINE_MAX_ITEMS: int = Field(
+        30, description="流水线验证单个事件送入 LLM 的最大条目数（先到先验，媒体优先）"
+    )
+
+    # ---------------------- 正文抓取配置 ----------------------
+    ARTICLE_FETCH_ENABLED: bool = Field(
+        False, description="验证后是否抓取相关条目的文章正文，供时间线与影响提取使用"
+    )
+    ARTICLE_FETCH_CONCURRENCY: int = Field(
+        6, description="正文抓取的并发请求数"
+    )
+    ARTICLE_FETCH_PER_DOMAIN: int = Field(
+        2, description="同一域名同时进行的正文请求数上限"
+    )
+    ARTICLE_FETCH_DOMAIN_DELAY_SECONDS: float = Field(
+        1.0, description="同一域名相邻两次正文请求的最小间隔（秒）"
+    )
+    ARTICLE_FETCH_TIMEOUT_SECONDS: float = Field(
+        15.0, description="单个正文请求的超时时间（秒）"
+    )
+    ARTICLE_MAX_CHARS: int = Field(
+        4000, description="每篇文章保留的正文最大字符数（控制提取步骤的 token 用量）"
+    )
+    ARTICLE_CACHE_TTL_SECONDS: int = Field(
+        7 * 86400, description="正文缓存有效期（秒），按 URL 缓存抽取后的正文"
+    )
 
     # ---------------------- 搜索 API 配置 ---------------------
     TAVILY_API_KEY: Optional[str] = Field(None, description="Tavily 搜索 API 密钥")
@@ -0,0 +1,5 @@
+"""文章正文抓取模块。"""
+
+from .article_fetcher import ArticleFetcher, enrich_with_article_text, extract_main_text, get_article_fetcher
+
+__all__ = ["ArticleFetcher", "enrich_with_article_text", "extract_main_text", "get_article_fetcher"]
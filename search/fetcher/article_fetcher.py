@@ -0,0 +1,244 @@
+"""验证后相关条目的正文抓取。
+
+搜索 API 只返回约 200 字的摘要，伤亡人数、封闭道路数量等往往只出现在正文中。
+验证通过后（步骤 1 之后、步骤 2 之前）并发下载相关 URL 并抽取正文：
+
+- 礼貌性：每个域名同时最多 ``ARTICLE_FETCH_PER_DOMAIN`` 个请求，同域相邻请求间隔
+  至少 ``ARTICLE_FETCH_DOMAIN_DELAY_SECONDS`` 秒；抓取器进程内共享，限制跨事件（含并发事件）生效；
+- 抽取：标准库 HTMLParser，优先取 ``<article>``/``<main>`` 内的段落，跳过脚本、导航、页脚等；
+- 缓存：按 URL 缓存抽取后的正文（``SEARCH_CACHE_DIR/articles.sqlite3``，有效期
+  ``ARTICLE_CACHE_TTL_SECONDS``），重复处理同一事件不再重复下载；
+- 不消耗搜索 API 配额；视频与社交平台条目不抓取。
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional
+from pathlib import Path
+from urllib.parse import urlparse
+
+from ..collectors.cache import get_response_cache, make_cache_key
+from ..config.settings import Settings, settings
+from ..utils.http import get_session
+
+logger = logging.getLogger(__name__)
+
+# 不抓取正文的渠道（视频/社交平台页面没有可抽取的文章正文）
+_SKIP_CHANNELS = {"media", "social", "social_instagram"}
+_MAX_DOWNLOAD_BYTES = 2 * 1024 * 1024
+_USER_AGENT = "Mozilla/5.0 (compatible; rain-flood-search/1.0; article text extraction)"
+
+
+class _TextExtractor(HTMLParser):
+    """收集段落文本；遇到 article/main 时只保留其中的内容。"""
+
+    _SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe"}
+    _BLOCK_TAGS = {"p", "h1", "h2", "h3", "li", "blockquote"}
+    _CONTAINER_TAGS = {"article", "main"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        self._container_depth = 0
+        self._block_depth = 0
+        self._buffer: List[str] = []
+        self.blocks: List[str] = []
+        self.container_blocks: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self._CONTAINER_TAGS:
+            self._container_depth += 1
+        elif tag in self._BLOCK_TAGS:
+            self._block_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self._CONTAINER_TAGS:
+            self._container_depth = max(0, self._container_depth - 1)
+        elif tag in self._BLOCK_TAGS and self._block_depth:
+            self._block_depth -= 1
+            if self._block_depth == 0:
+                self._flush()
+
+    def handle_data(self, data):
+        if self._block_depth and not self._skip_depth:
+            self._buffer.append(data)
+
+    def _flush(self):
+        text = re.sub(r"\s+", " ", "".join(self._buffer)).strip()
+        self._buffer = []
+        # 过短的片段多为按钮、版权等噪声
+        if len(text) < 40:
+            return
+        self.blocks.append(text)
+        if self._container_depth:
+            self.container_blocks.append(text)
+
+
+def _detect_encoding(content_type: str, raw: bytes) -> str:
+    """编码优先取 Content-Type 的 charset，其次取页面 <meta charset>，缺省 UTF-8。"""
+    match = re.search(r"charset=[\"']?([\w-]+)", content_type, re.I) or re.search(
+        rb"<meta[^>]+charset=[\"']?([\w-]+)", raw[:4096], re.I
+    )
+    if match:
+        encoding = match.group(1)
+        encoding = encoding.decode("ascii", "ignore") if isinstance(encoding, bytes) else encoding
+        try:
+            "".encode(encoding)
+            return encoding
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def extract_main_text(html: str, max_chars: int) -> str:
+    """从 HTML 中抽取正文，最多 max_chars 个字符。"""
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        logger.debug("HTML 解析失败", exc_info=True)
+    blocks = parser.container_blocks or parser.blocks
+    text = "\n".join(dict.fromkeys(blocks))
+    return text[:max_chars]
+
+
+class ArticleFetcher:
+    """并发抓取文章正文，带域名礼貌限制与按 URL 的正文缓存。"""
+
+    def __init__(self, config: Settings | None = None):
+        self.config = config or settings
+        self._domain_locks: Dict[str, threading.Semaphore] = {}
+        self._domain_last: Dict[str, float] = {}
+        self._state_lock = threading.Lock()
+        self._cache = get_response_cache(self.config, name="articles")
+
+    def fetch_many(self, urls: Iterable[str]) -> Dict[str, str]:
+        """并发抓取多个 URL 的正文，返回 {url: 正文}（抓取失败或无正文的 URL 不出现在结果中）。"""
+        unique = [url for url in dict.fromkeys(urls) if url and url.startswith(("http://", "https://"))]
+        if not unique:
+            return {}
+        workers = max(1, min(self.config.ARTICLE_FETCH_CONCURRENCY, len(unique)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="article-fetch") as pool:
+            texts = list(pool.map(self.fetch, unique))
+        return {url: text for url, text in zip(unique, texts) if text}
+
+    def fetch(self, url: str) -> Optional[str]:
+        key = make_cache_key("article", {"url": url})
+        if self._cache is not None:
+            try:
+                cached = self._cache.get(key)
+            except Exception:
+                cached = None
+                logger.debug("读取正文缓存失败: %s", url, exc_info=True)
+            if cached is not None:
+                return cached.json().get("text")
+
+        text = self._download_and_extract(url)
+        if text and self._cache is not None:
+            try:
+                self._cache.put(key, "article", {"url": url, "text": text}, self.config.ARTICLE_CACHE_TTL_SECONDS)
+            except Exception:
+                logger.debug("写入正文缓存失败: %s", url, exc_info=True)
+        return text
+
+    def _download_and_extract(self, url: str) -> Optional[str]:
+        domain = urlparse(url).netloc.lower()
+        with self._domain_semaphore(domain):
+            self._wait_for_domain(domain)
+            try:
+                # 抓取在线程池中进行，每个线程使用自己的会话（共享连接池）
+                response = get_session(self.config).get(
+                    url,
+                    headers={"User-Agent": _USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+                    timeout=self.config.ARTICLE_FETCH_TIMEOUT_SECONDS,
+                    stream=True,
+                )
+            except Exception as e:
+                logger.debug("下载正文失败 %s: %s", url, e)
+                return None
+            finally:
+                with self._state_lock:
+                    self._domain_last[domain] = time.monotonic()
+
+        try:
+            if response.status_code != 200 or "html" not in response.headers.get("content-type", "html"):
+                logger.debug("跳过正文 %s（状态码 %s）", url, response.status_code)
+                return None
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= _MAX_DOWNLOAD_BYTES:
+                    break
+            raw = b"".join(chunks)
+            html = raw.decode(_detect_encoding(response.headers.get("content-type", ""), raw), errors="replace")
+        except Exception as e:
+            logger.debug("读取正文失败 %s: %s", url, e)
+            return None
+        finally:
+            response.close()
+        text = extract_main_text(html, self.config.ARTICLE_MAX_CHARS)
+        return text or None
+
+    def _domain_semaphore(self, domain: str) -> threading.Semaphore:
+        with self._state_lock:
+            semaphore = self._domain_locks.get(domain)
+            if semaphore is None:
+                semaphore = threading.Semaphore(max(1, self.config.ARTICLE_FETCH_PER_DOMAIN))
+                self._domain_locks[domain] = semaphore
+            return semaphore
+
+    def _wait_for_domain(self, domain: str) -> None:
+        """同域相邻请求至少间隔 ARTICLE_FETCH_DOMAIN_DELAY_SECONDS 秒。"""
+        delay = self.config.ARTICLE_FETCH_DOMAIN_DELAY_SECONDS
+        while True:
+            with self._state_lock:
+                last = self._domain_last.get(domain)
+                now = time.monotonic()
+                if last is None or now - last >= delay:
+                    # 先占位，避免同域的并发请求同时通过
+                    self._domain_last[domain] = now
+                    return
+                wait = delay - (now - last)
+            time.sleep(wait)
+
+
+_fetchers: Dict[str, ArticleFetcher] = {}
+_fetchers_lock = threading.Lock()
+
+
+def get_article_fetcher(config: Settings | None = None) -> ArticleFetcher:
+    """获取进程内共享的抓取器（按缓存目录区分），域名并发与间隔限制在各事件之间共享。"""
+    config = config or settings
+    key = str(Path(config.SEARCH_CACHE_DIR))
+    with _fetchers_lock:
+        fetcher = _fetchers.get(key)
+        if fetcher is None:
+            fetcher = _fetchers[key] = ArticleFetcher(config)
+        return fetcher
+
+
+def enrich_with_article_text(items: List[dict], config: Settings | None = None) -> int:
+    """为条目补充正文（写入 item["content"]），返回成功补充的条目数。"""
+    config = config or settings
+    targets = [item for item in items if item.get("url") and item.get("channel") not in _SKIP_CHANNELS]
+    if not targets:
+        return 0
+    texts = get_article_fetcher(config).fetch_many(item["url"] for item in targets)
+    for item in targets:
+        text = texts.get(item["url"])
+        if text:
+            item["content"] = text
+    return sum(1 for item in targets if item.get("url") in texts)
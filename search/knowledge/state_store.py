@@ -1,26 +1,122 @@
-﻿"""知识存储层占位实现。"""
+﻿"""知识存储层：事件结果与分阶段检查点。
+
+- ``save_event``：事件处理完成后将完整上下文保存为 JSON（``search_outputs/event_<id>.json``）；
+- 检查点：按 (event_id, 输入哈希) 将各阶段结果（location_profile、query_plan（不含渠道配置）、raw_contents、
+  validation、extraction、report）写入 ``CHECKPOINT_DIR/<event_id>/<hash>.json``。重跑同一事件时
+  从最后完成的阶段继续，不再重复地理解析、搜索 API 与 LLM 调用。
+
+输入哈希由事件字段计算，事件数据变化后自动使用新的检查点。重新写入某阶段时其后的阶段全部作废；
+超过 ``CHECKPOINT_TTL_SECONDS`` 的阶段视为不存在（随之重新执行并覆盖后续阶段）。
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
+import re
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from ..config.settings import Settings, settings
+from ..config.settings import PROJECT_ROOT, Settings, settings
 from ..orchestrator.workflow import EventContext
+from ..watcher.rain_event_watcher import RainEvent
 
 logger = logging.getLogger(__name__)
 
+# 检查点阶段（按流程顺序）
+STAGES = ("location_profile", "query_plan", "raw_contents", "validation", "extraction", "report")
+
+
+def input_hash(event: RainEvent) -> str:
+    """事件输入的哈希（事件字段变化后检查点失效）。"""
+    raw = json.dumps(event.as_dict(), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class EventCheckpoint:
+    """单个事件的分阶段检查点（一个 JSON 文件，原子替换写入）。"""
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with self.path.open("r", encoding="utf-8") as fp:
+                    self._stages = json.load(fp).get("stages", {})
+            except Exception:
+                logger.warning("检查点文件损坏，忽略: %s", self.path)
+                self._stages = {}
+
+    def get(self, stage: str) -> Optional[Any]:
+        """读取阶段结果；不存在或已过期时返回 None。"""
+        with self._lock:
+            entry = self._stages.get(stage)
+        if entry is None:
+            return None
+        if self.ttl_seconds and time.time() - entry.get("saved_at", 0) > self.ttl_seconds:
+            logger.info("检查点阶段 %s 已过期，重新执行", stage)
+            return None
+        return entry.get("value")
+
+    def save(self, stage: str, value: Any) -> None:
+        """写入阶段结果，并作废其后的所有阶段。"""
+        with self._lock:
+            self._stages[stage] = {"saved_at": time.time(), "value": value}
+            for later in STAGES[STAGES.index(stage) + 1 :]:
+                self._stages.pop(later, None)
+            payload = {"stages": self._stages}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            try:
+                with tmp_path.open("w", encoding="utf-8") as fp:
+                    json.dump(payload, fp, ensure_ascii=False, default=str)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                logger.warning("写入检查点失败: %s（阶段 %s）", self.path, stage, exc_info=True)
+
+    def completed_stages(self) -> List[str]:
+        with self._lock:
+            return [stage for stage in STAGES if stage in self._stages]
+
 
 class StateStore:
-    """将处理结果持久化（当前使用 JSON 文件占位）。"""
+    """将处理结果与检查点持久化到本地 JSON 文件。"""
 
     def __init__(self, config: Settings | None = None):
         self.config = config or settings
-        self.output_dir = Path(self.config.PROJECT_ROOT) / "search_outputs"
+        self.output_dir = PROJECT_ROOT / "search_outputs"
         self.output_dir.mkdir(exist_ok=True)
 
+    def checkpoint(self, event: RainEvent) -> EventCheckpoint:
+        """获取事件（按 event_id 与输入哈希）的检查点。"""
+        safe_id = re.sub(r"[^\w.-]+", "_", str(event.event_id))
+        path = Path(self.config.CHECKPOINT_DIR) / safe_id / f"{input_hash(event)}.json"
+        return EventCheckpoint(path, self.config.CHECKPOINT_TTL_SECONDS)
+
+    def save_report(self, context: EventContext) -> Optional[Path]:
+        """保存报告到 ``search_outputs/YYYYMMDD/<event_id>_report.md``（优先英文报告）；无报告时返回 None。"""
+        report = context.reports.get("english") or context.reports.get("local")
+        if not report:
+            return None
+        event = context.rain_event
+        # 从 event_id 提取日期部分（前8位：YYYYMMDD），否则使用 event_time
+        event_id = str(event.event_id)
+        date_dir = event_id[:8] if len(event_id) >= 8 else ""
+        if not date_dir.isdigit():
+            date_dir = event.event_time.strftime("%Y%m%d") if event.event_time else "unknown"
+        output_dir = self.output_dir / date_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_path = output_dir / f"{event_id.replace('/', '_').replace(chr(92), '_')}_report.md"
+        output_path.write_text(report, encoding="utf-8")
+        logger.info("报告已保存到: %s", output_path)
+        return output_path
+
     def save_event(self, context: EventContext) -> Path:
         payload = self._serialize_context(context)
         output_path = self.output_dir / f"event_{context.rain_event.event_id}.json"
@@ -41,4 +137,3 @@ class StateStore:
             "started_at": context.started_at,
             "finished_at": context.finished_at,
         }
-
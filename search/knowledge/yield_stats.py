@@ -0,0 +1,241 @@
+"""按渠道的历史产出统计与渠道调度。
+
+部分渠道对某些国家几乎不产生能通过 ``_step1_validation`` 的条目（例如 X、Instagram），
+却仍为每个事件消耗延迟与配额。这里按 (渠道, 国家, 语言) 记录每个事件的采集条数、实际送入
+LLM 验证的条数与验证为相关的条数（SQLite：``SEARCH_CACHE_DIR/channel_yield.sqlite3``），并在
+生成查询计划后据此调度：
+
+- 期望产出 = (相关条数 + 1) / (送验条数 + 2)，即送验条目被判为相关的比例（拉普拉斯平滑，
+  历史不足时偏乐观）。被近重复合并、预过滤或条数上限挡在 LLM 之外的条目没有被验证过，
+  不计入；某渠道/语言本事件没有条目送验时不记录。记录的事件数少于
+  ``CHANNEL_YIELD_MIN_EVENTS`` 时不做判断；
+- 期望产出低于 ``CHANNEL_YIELD_SKIP_BELOW`` 的渠道本次跳过；
+- 低于 ``CHANNEL_YIELD_DEPRIORITIZE_BELOW`` 的渠道降级为只取首页（不分页补充）；
+- 以 ``CHANNEL_YIELD_EXPLORATION_RATE`` 的概率照常运行被判为低产出的渠道，使统计保持更新。
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+SKIP = "skip"
+EXPLORE = "explore"
+DEPRIORITIZE = "deprioritize"
+
+
+class ChannelYieldStats:
+    """基于 SQLite 的渠道产出统计（跨进程共享）。"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS channel_yield (
+                channel TEXT NOT NULL,
+                country TEXT NOT NULL,
+                language TEXT NOT NULL,
+                events INTEGER NOT NULL,
+                collected INTEGER NOT NULL,
+                sent INTEGER NOT NULL DEFAULT 0,
+                relevant INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (channel, country, language)
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(channel_yield)")}
+        if "sent" not in columns:
+            # 旧统计按事件数计算产出，未被送验的条目也计为 0 相关，不可与新口径混用
+            with self._lock:
+                self._conn.execute("ALTER TABLE channel_yield ADD COLUMN sent INTEGER NOT NULL DEFAULT 0")
+                self._conn.execute("DELETE FROM channel_yield")
+            logger.info("渠道产出统计改为按送验条数计算，已清空旧统计: %s", self.path)
+
+    def record(self, channel: str, country: str, language: str, collected: int, sent: int, relevant: int) -> None:
+        """记录一个事件中某渠道在某语言下的采集条数、送验条数与相关条数。"""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO channel_yield (channel, country, language, events, collected, sent, relevant, updated_at)
+                VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT(channel, country, language) DO UPDATE SET
+                    events = events + 1,
+                    collected = collected + excluded.collected,
+                    sent = sent + excluded.sent,
+                    relevant = relevant + excluded.relevant,
+                    updated_at = excluded.updated_at
+                """,
+                (channel, country, language, collected, sent, relevant, time.time()),
+            )
+
+    def totals(self, channel: str, country: str, languages: Iterable[str]) -> Tuple[int, int, int, int]:
+        """返回 (事件数, 采集条数, 送验条数, 相关条数)；多种语言时事件数取各语言的最大值。"""
+        languages = list(languages)
+        if not languages:
+            return 0, 0, 0, 0
+        placeholders = ",".join("?" * len(languages))
+        with self._lock:
+            row = self._conn.execute(
+                f"""
+                SELECT COALESCE(MAX(events), 0), COALESCE(SUM(collected), 0), COALESCE(SUM(sent), 0),
+                       COALESCE(SUM(relevant), 0)
+                FROM channel_yield WHERE channel = ? AND country = ? AND language IN ({placeholders})
+                """,
+                (channel, country, *languages),
+            ).fetchone()
+        return int(row[0]), int(row[1]), int(row[2]), int(row[3])
+
+    def expected_yield(self, channel: str, country: str, languages: Iterable[str], min_events: int) -> Optional[float]:
+        """送验条目被判为相关的比例；历史事件数不足 min_events 时返回 None。"""
+        events, _, sent, relevant = self.totals(channel, country, languages)
+        if events < max(1, min_events):
+            return None
+        return (relevant + 1) / (sent + 2)
+
+
+_stores: Dict[str, ChannelYieldStats] = {}
+_stores_lock = threading.Lock()
+
+
+def get_yield_stats(config: Settings) -> Optional[ChannelYieldStats]:
+    """获取进程内共享的产出统计；功能关闭或无法打开时返回 None。"""
+    if not config.CHANNEL_YIELD_ENABLED:
+        return None
+    path = Path(config.SEARCH_CACHE_DIR) / "channel_yield.sqlite3"
+    with _stores_lock:
+        store = _stores.get(str(path))
+        if store is None:
+            try:
+                store = ChannelYieldStats(path)
+            except Exception:
+                logger.exception("无法打开渠道产出统计 %s，本次不做渠道调度", path)
+                return None
+            _stores[str(path)] = store
+        return store
+
+
+def country_key(location_profile: Dict[str, Any]) -> str:
+    profile = location_profile or {}
+    return str(profile.get("country_code") or profile.get("country") or "unknown").lower()
+
+
+def _channel_languages(query_plan: Dict[str, Any], channel_config: Dict[str, Any]) -> List[str]:
+    languages = list((query_plan.get("keywords") or {}).keys()) or ["en"]
+    allowed = channel_config.get("languages")
+    if allowed:
+        languages = [language for language in languages if language in allowed] or languages
+    return languages
+
+
+def schedule_channels(
+    query_plan: Dict[str, Any],
+    location_profile: Dict[str, Any],
+    config: Settings,
+    rng: random.Random | None = None,
+) -> Dict[str, str]:
+    """按历史产出调整查询计划中的渠道（原地修改），返回 {渠道: skip/explore/deprioritize}。
+
+    至少保留一个渠道：所有启用的渠道都会被跳过时，保留期望产出最高的那个。
+    """
+    store = get_yield_stats(config)
+    channels = (query_plan or {}).get("channels") or {}
+    if store is None or not channels:
+        return {}
+    rng = rng or random
+    country = country_key(location_profile)
+
+    estimates: Dict[str, float] = {}
+    for name, channel_config in channels.items():
+        if not channel_config.get("enabled", True):
+            continue
+        estimate = store.expected_yield(
+            name, country, _channel_languages(query_plan, channel_config), config.CHANNEL_YIELD_MIN_EVENTS
+        )
+        if estimate is not None:
+            estimates[name] = estimate
+
+    decisions: Dict[str, str] = {}
+    low = [name for name, estimate in estimates.items() if estimate < config.CHANNEL_YIELD_SKIP_BELOW]
+    enabled_count = sum(1 for channel_config in channels.values() if channel_config.get("enabled", True))
+    if low and len(low) == enabled_count:
+        low.remove(max(low, key=lambda name: estimates[name]))
+
+    for name, estimate in estimates.items():
+        channel_config = channels[name]
+        if name in low:
+            if rng.random() < config.CHANNEL_YIELD_EXPLORATION_RATE:
+                decisions[name] = EXPLORE
+                continue
+            channel_config["enabled"] = False
+            decisions[name] = SKIP
+        elif estimate < config.CHANNEL_YIELD_DEPRIORITIZE_BELOW:
+            channel_config["max_pages"] = 1
+            decisions[name] = DEPRIORITIZE
+
+    if decisions:
+        logger.info(
+            "渠道调度（%s）：%s",
+            country,
+            ", ".join(f"{name}={decision}（送验相关率 {estimates[name]:.2f}）" for name, decision in decisions.items()),
+        )
+    return decisions
+
+
+def record_event_yield(
+    query_plan: Dict[str, Any],
+    location_profile: Dict[str, Any],
+    raw_contents: Dict[str, List[Dict[str, Any]]],
+    validated_by_channel: Dict[str, Dict[str, int]],
+    config: Settings,
+    skipped: Optional[Iterable[Tuple[str, str]]] = None,
+    sent_by_channel: Optional[Dict[str, Dict[str, int]]] = None,
+) -> None:
+    """记录一个事件中各已运行渠道的产出。
+
+    只记录查询计划中启用（即实际运行）的渠道；条目语言不在查询语言中时（如 YouTube 返回的
+    视频语言）计入该渠道的第一种查询语言。skipped 中的 (渠道, 语言) 请求未完成（限流、熔断
+    或请求失败），sent_by_channel 中没有送验条目的渠道/语言未被验证过，均不计入统计。
+    """
+    store = get_yield_stats(config)
+    if store is None:
+        return
+    country = country_key(location_profile)
+    channels = (query_plan or {}).get("channels") or {}
+    skipped_requests = {(channel, language) for channel, language in (skipped or ())}
+    for name, items in (raw_contents or {}).items():
+        channel_config = channels.get(name)
+        if not channel_config or not channel_config.get("enabled", True):
+            continue
+        languages = _channel_languages(query_plan, channel_config)
+        collected: Counter = Counter()
+        sent: Counter = Counter()
+        relevant: Counter = Counter()
+        for item in items:
+            language = item.get("language")
+            collected[language if language in languages else languages[0]] += 1
+        for language, count in ((sent_by_channel or {}).get(name) or {}).items():
+            sent[language if language in languages else languages[0]] += count
+        for language, count in (validated_by_channel.get(name) or {}).items():
+            relevant[language if language in languages else languages[0]] += count
+        for language in languages:
+            if (name, language) in skipped_requests or not sent[language]:
+                continue
+            try:
+                store.record(name, country, language, collected[language], sent[language], relevant[language])
+            except Exception:
+                logger.debug("记录渠道产出失败: %s/%s", name, language, exc_info=True)
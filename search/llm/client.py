@@ -47,9 +47,13 @@ class OpenAIClient(LLMClient):
         try:
             import openai
 
+            from ..utils.http import get_httpx_client
+
             self.client = openai.OpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url if self.base_url != "https://api.openai.com/v1" else None,
+                # 复用进程级 httpx 连接池（未安装 httpx 时为 None，即 SDK 默认客户端）
+                http_client=get_httpx_client(self.config),
             )
         except ImportError:
             raise ImportError("请安装 openai 库: pip install openai")
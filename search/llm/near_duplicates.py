@@ -0,0 +1,139 @@
+"""近重复结果聚类 - 基于 MinHash LSH 的转载稿合并。
+
+同一篇通讯社稿件常以几十个 URL 出现在 TheNewsAPI、Tavily、GNews 的结果中，
+URL 去重无法识别，每个副本都会占用一个 LLM 验证名额。这里在预过滤前：
+
+1. 对标题+摘要做词级 3-gram shingle（词数不足时用字符 5-gram），计算 64 个 MinHash 值；
+2. 将签名分为 16 段（每段 4 行）做 LSH 分桶，只比较同桶的候选对，整体接近线性；
+3. 候选对的估计 Jaccard 相似度不低于阈值时用并查集合并，每簇保留信息最多的一条，
+   并附上簇大小与来源。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence
+
+_NUM_PERM = 64
+_BANDS = 16
+_ROWS = _NUM_PERM // _BANDS
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# 固定种子：同样的输入在不同进程中得到同样的签名
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_NUM_PERM)]
+_MEDIA_CHANNELS = {"media", "social", "social_instagram"}
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _shingles(text: str) -> set:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) >= 5:
+        return {" ".join(words[i : i + 3]) for i in range(len(words) - 2)}
+    compact = " ".join(words)
+    if len(compact) <= 5:
+        return {compact} if compact else set()
+    return {compact[i : i + 5] for i in range(len(compact) - 4)}
+
+
+def minhash(text: str) -> List[int]:
+    """计算文本的 MinHash 签名；空文本返回空列表。"""
+    values = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+        for shingle in _shingles(text)
+    ]
+    if not values:
+        return []
+    return [min((a * v + b) % _PRIME & _MAX_HASH for v in values) for a, b in _PERMUTATIONS]
+
+
+def _similarity(left: List[int], right: List[int]) -> float:
+    return sum(1 for x, y in zip(left, right) if x == y) / _NUM_PERM
+
+
+def _item_text(item: Dict[str, Any]) -> str:
+    return f"{item.get('title') or ''} {item.get('summary') or item.get('description') or ''}"
+
+
+def cluster_near_duplicates(items: Sequence[Dict[str, Any]], threshold: float = 0.6) -> List[List[int]]:
+    """返回近重复簇（条目下标列表，按首次出现排序）；媒体与新闻分开聚类。"""
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signatures = [minhash(_item_text(item)) for item in items]
+    buckets: Dict[tuple, List[int]] = defaultdict(list)
+    for index, signature in enumerate(signatures):
+        if not signature:
+            continue
+        kind = items[index].get("channel") in _MEDIA_CHANNELS
+        for band in range(_BANDS):
+            key = (kind, band, tuple(signature[band * _ROWS : (band + 1) * _ROWS]))
+            for other in buckets[key]:
+                if find(other) != find(index) and _similarity(signatures[other], signature) >= threshold:
+                    parent[find(index)] = find(other)
+            buckets[key].append(index)
+
+    clusters: Dict[int, List[int]] = {}
+    for index in range(len(items)):
+        clusters.setdefault(find(index), []).append(index)
+    return list(clusters.values())
+
+
+def collapse_near_duplicates(items: Sequence[Dict[str, Any]], threshold: float = 0.6) -> List[Dict[str, Any]]:
+    """每个近重复簇保留一条代表（标题+摘要最长者），按簇首次出现的位置保持原有顺序。
+
+    代表条目附加 ``duplicate_count``（簇大小）、``duplicate_sources``（各副本的来源）
+    与 ``duplicate_urls``（其余副本 URL，最多 10 个）。
+    """
+    result = []
+    for cluster in cluster_near_duplicates(items, threshold):
+        if len(cluster) == 1:
+            result.append((cluster[0], items[cluster[0]]))
+            continue
+        best = max(cluster, key=lambda i: (len(_item_text(items[i])), -i))
+        sources = list(dict.fromkeys(items[i].get("source") or items[i].get("channel") or "unknown" for i in cluster))
+        representative = {
+            **items[best],
+            "duplicate_count": len(cluster),
+            "duplicate_sources": sources,
+            "duplicate_urls": [items[i].get("url") for i in cluster if i != best][:10],
+        }
+        result.append((cluster[0], representative))
+    result.sort(key=lambda pair: pair[0])
+    return [item for _, item in result]
+
+
+class NearDuplicateIndex:
+    """增量近重复判断（与 ``cluster_near_duplicates`` 相同的分桶与阈值），用于逐条补充的候选。"""
+
+    def __init__(self, items: Sequence[Dict[str, Any]] = (), threshold: float = 0.6):
+        self.threshold = threshold
+        self._signatures: List[List[int]] = []
+        self._buckets: Dict[tuple, List[int]] = defaultdict(list)
+        for item in items:
+            self.add(item)
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """加入条目；与已加入的同类条目（媒体/新闻）近重复时不加入并返回 False。"""
+        signature = minhash(_item_text(item))
+        if not signature:
+            return True
+        kind = item.get("channel") in _MEDIA_CHANNELS
+        keys = [(kind, band, tuple(signature[band * _ROWS : (band + 1) * _ROWS])) for band in range(_BANDS)]
+        for key in keys:
+            for other in self._buckets[key]:
+                if _similarity(self._signatures[other], signature) >= self.threshold:
+                    return False
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for key in keys:
+            self._buckets[key].append(index)
+        return True
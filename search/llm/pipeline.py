@@ -0,0 +1,189 @@
+"""流水线验证：采集进行中按微批次预过滤并调用 LLM 验证。
+
+默认流程在所有采集器结束后才开始步骤 1，最慢的提供商决定了第一次 LLM 调用的时间。
+开启 ``LLM_PIPELINED_VALIDATION`` 后，每个采集器的结果一到达就：
+
+1. 按 URL 去掉已见过的条目，并在批内合并近重复结果；
+2. 做规则预过滤（时间 + 地点 + 关键词）；
+3. 按 ``LLM_PIPELINE_BATCH_SIZE`` 切分为微批次，提交给后台线程调用 LLM 验证。
+
+每个批次调用 LLM 时占用工作流的 LLM 名额（``EVENT_LLM_CONCURRENCY``），与其它事件的 LLM 阶段共同受限。
+
+采集结束后等待在途批次，合并各批次的相关性评分：跨批次再做一次近重复合并，按评分降序，
+媒体优先选出最终条目（与批量模式相同，最多 10 条）。送入 LLM 的条目总数受
+``LLM_PIPELINE_MAX_ITEMS`` 限制；分页结果流不参与补充（候选不足时请使用批量模式）。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.settings import Settings, settings
+from ..orchestrator.workflow import EventContext
+from .processor import LLMProcessor
+
+logger = logging.getLogger(__name__)
+
+_MEDIA_CHANNELS = {"media", "social"}
+
+
+class PipelinedValidator:
+    """单个事件的流水线验证器：``submit`` 接收各采集器结果，``result`` 返回合并后的验证结果。"""
+
+    def __init__(
+        self,
+        context: EventContext,
+        config: Settings | None = None,
+        processor: LLMProcessor | None = None,
+        llm_slots: Optional[threading.Semaphore] = None,
+    ):
+        self.context = context
+        self.config = config or settings
+        self.processor = processor or LLMProcessor(self.config)
+        # 提前创建客户端：创建失败时由调用方回退到批量模式
+        self.processor._get_client()
+        self.event_info = self.processor._prepare_event_info(context)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, self.config.LLM_PIPELINE_MAX_INFLIGHT), thread_name_prefix="llm-validate"
+        )
+        self._llm_slots = llm_slots
+        self._lock = threading.Lock()
+        # (批次 future, 批次条目)：只有成功验证的批次计入送验条数
+        self._futures: List[Tuple[Future, List[Dict[str, Any]]]] = []
+        self._seen_urls: set = set()
+        self._sent = 0
+        self._started = time.monotonic()
+        self._first_call: Optional[float] = None
+        self._result: Optional[Dict[str, Any]] = None
+
+    def submit(self, channel: str, items: List[Dict[str, Any]]) -> None:
+        """接收一个采集器的结果，预过滤后按微批次提交验证（在采集线程中调用，不阻塞）。"""
+        with self._lock:
+            if self._result is not None:
+                return
+            fresh = []
+            for item in items or []:
+                url = item.get("url")
+                if url and url in self._seen_urls:
+                    continue
+                if url:
+                    self._seen_urls.add(url)
+                fresh.append({**item, "channel": channel})
+        if not fresh:
+            return
+
+        if self.config.NEAR_DUPLICATE_ENABLED:
+            from .near_duplicates import collapse_near_duplicates
+
+            fresh = collapse_near_duplicates(fresh, self.config.NEAR_DUPLICATE_THRESHOLD)
+        if self.config.PRE_FILTER_ENABLED:
+            fresh, _ = self.processor._pre_filter_results(fresh, self.event_info)
+        # 媒体排在前面，预算不足时优先保留
+        fresh.sort(key=lambda item: item.get("channel") not in _MEDIA_CHANNELS)
+
+        batch_size = max(1, self.config.LLM_PIPELINE_BATCH_SIZE)
+        with self._lock:
+            budget = max(0, self.config.LLM_PIPELINE_MAX_ITEMS - self._sent)
+            dropped = max(0, len(fresh) - budget)
+            fresh = fresh[:budget]
+            self._sent += len(fresh)
+            for start in range(0, len(fresh), batch_size):
+                batch = fresh[start : start + batch_size]
+                future = self._pool.submit(contextvars.copy_context().run, self._validate_batch, batch)
+                self._futures.append((future, batch))
+        logger.info(
+            "流水线验证：%s 提交 %s 条（%s 个批次）%s",
+            channel,
+            len(fresh),
+            (len(fresh) + batch_size - 1) // batch_size,
+            f"，超出预算丢弃 {dropped} 条" if dropped else "",
+        )
+
+    def _validate_batch(self, batch: List[Dict[str, Any]]) -> tuple:
+        with self._lock:
+            if self._first_call is None:
+                self._first_call = time.monotonic() - self._started
+        if self._llm_slots is None:
+            media_items, news_items, irrelevant_items = self.processor._validate_items(self.event_info, batch)
+        else:
+            with self._llm_slots:
+                media_items, news_items, irrelevant_items = self.processor._validate_items(self.event_info, batch)
+        # 不相关项的 index 是批内下标，补充标题与 URL 便于在结果文件中识别
+        for item in irrelevant_items:
+            index = item.get("index", -1)
+            if isinstance(index, int) and 0 <= index < len(batch):
+                item.setdefault("title", batch[index].get("title"))
+                item.setdefault("url", batch[index].get("url"))
+        return media_items, news_items, irrelevant_items
+
+    def wait(self) -> None:
+        """等待已提交的批次结束（不合并结果）。"""
+        with self._lock:
+            futures = [future for future, _ in self._futures]
+        wait(futures)
+
+    def result(self) -> Dict[str, Any]:
+        """等待所有批次完成并合并评分，返回与 ``_step1_validation`` 相同结构的验证结果。
+
+        所有批次都失败时抛出 RuntimeError（调用方回退到批量验证）。
+        """
+        with self._lock:
+            if self._result is not None:
+                return self._result
+            futures = list(self._futures)
+        media_items: List[Dict[str, Any]] = []
+        news_items: List[Dict[str, Any]] = []
+        irrelevant_items: List[Dict[str, Any]] = []
+        sent_items: List[Dict[str, Any]] = []
+        failed = 0
+        for future, batch in futures:
+            try:
+                batch_media, batch_news, batch_irrelevant = future.result()
+            except Exception:
+                failed += 1
+                logger.exception("流水线验证批次失败")
+                continue
+            sent_items.extend(batch)
+            media_items.extend(batch_media)
+            news_items.extend(batch_news)
+            irrelevant_items.extend(batch_irrelevant)
+        self._pool.shutdown(wait=False)
+        if futures and failed == len(futures):
+            raise RuntimeError("流水线验证的所有批次均失败")
+
+        if self.config.NEAR_DUPLICATE_ENABLED:
+            from .near_duplicates import collapse_near_duplicates
+
+            media_items = collapse_near_duplicates(media_items, self.config.NEAR_DUPLICATE_THRESHOLD)
+            news_items = collapse_near_duplicates(news_items, self.config.NEAR_DUPLICATE_THRESHOLD)
+        media_items.sort(key=lambda item: item.get("relevance_score") or 0.0, reverse=True)
+        news_items.sort(key=lambda item: item.get("relevance_score") or 0.0, reverse=True)
+
+        logger.info(
+            "流水线验证：%s 个批次（失败 %s），送验 %s 条，首次 LLM 调用于开始后 %.1fs",
+            len(futures),
+            failed,
+            self._sent,
+            self._first_call or 0.0,
+        )
+        result = self.processor._finalize_validation(
+            self.context, self.event_info, media_items, news_items, irrelevant_items, sent_items=sent_items
+        )
+        result["pipeline"] = {
+            "batches": len(futures),
+            "failed_batches": failed,
+            "items_validated": self._sent,
+            "first_llm_call_seconds": round(self._first_call, 3) if self._first_call is not None else None,
+        }
+        with self._lock:
+            self._result = result
+        return result
+
+    def close(self) -> None:
+        """放弃未开始的批次（事件处理中止时调用）。"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
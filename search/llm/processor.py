@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from ..config.settings import Settings, settings
 from ..orchestrator.workflow import EventContext
@@ -18,6 +18,16 @@ from .prompts import (
 logger = logging.getLogger(__name__)
 
 
+def _count_by_channel(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """按 渠道 → 语言 统计条目数。"""
+    counts: Dict[str, Dict[str, int]] = {}
+    for item in items:
+        per_language = counts.setdefault(item.get("channel", ""), {})
+        language = item.get("language") or ""
+        per_language[language] = per_language.get(language, 0) + 1
+    return counts
+
+
 class LLMProcessor:
     """LLM 处理器 - 4 个步骤的智能处理。"""
 
@@ -44,7 +54,21 @@ class LLMProcessor:
 
             # 步骤 1: 事件验证和冲突解决
             logger.info("步骤 1: 事件验证和冲突解决...")
-            validation_result = self._step1_validation(context, event_info)
+            checkpoint = context.checkpoint
+            validation_result = checkpoint.get("validation") if checkpoint is not None else None
+            if validation_result is not None:
+                logger.info("步骤 1: 使用检查点中的验证结果")
+            else:
+                if context.validation_pipeline is not None:
+                    try:
+                        validation_result = context.validation_pipeline.result()
+                    except Exception:
+                        logger.exception("流水线验证失败，回退到批量验证")
+                if validation_result is None:
+                    validation_result = self._step1_validation(context, event_info)
+                # 与 _checkpointed 相同：空结果不写入检查点，下次运行重试该阶段
+                if checkpoint is not None and validation_result.get("relevant_items"):
+                    checkpoint.save("validation", validation_result)
 
             # 检查是否有相关结果
             relevant_items = validation_result.get("relevant_items", [])
@@ -71,9 +95,17 @@ class LLMProcessor:
 
             # 步骤 2: 时间线和影响提取
             logger.info("步骤 2: 时间线和影响提取...")
-            extraction_result = self._step2_extraction(
-                context, event_info, validation_result
-            )
+            extraction_result = checkpoint.get("extraction") if checkpoint is not None else None
+            if extraction_result is not None:
+                logger.info("步骤 2: 使用检查点中的提取结果")
+            else:
+                extraction_result = self._step2_extraction(
+                    context, event_info, validation_result
+                )
+                if checkpoint is not None and (
+                    extraction_result.get("timeline") or extraction_result.get("impact")
+                ):
+                    checkpoint.save("extraction", extraction_result)
 
             # 步骤 3: 从验证结果中提取多媒体（不再单独调用LLM）
             logger.info("步骤 3: 提取验证后的多媒体内容...")
@@ -81,9 +113,15 @@ class LLMProcessor:
 
             # 步骤 4: 报告生成
             logger.info("步骤 4: 报告生成...")
-            report = self._step4_report_generation(
-                context, event_info, extraction_result, validation_result, media_result
-            )
+            report = checkpoint.get("report") if checkpoint is not None else None
+            if report is not None:
+                logger.info("步骤 4: 使用检查点中的报告")
+            else:
+                report = self._step4_report_generation(
+                    context, event_info, extraction_result, validation_result, media_result
+                )
+                if checkpoint is not None and report:
+                    checkpoint.save("report", report)
 
             return {
                 "validation": validation_result,
@@ -186,9 +224,15 @@ class LLMProcessor:
         self,
         all_items: List[Dict[str, Any]],
         event_info: Dict[str, Any],
+        streams: Optional[Dict[str, Iterator[Dict[str, Any]]]] = None,
+        raw_contents: Optional[Dict[str, List[Dict[str, Any]]]] = None,
     ) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         """预过滤搜索结果，媒体优先进入15条（最多3条媒体）。
         
+        Args:
+            streams: 各渠道的惰性结果流（context.source_streams）；候选不足时从中继续拉取
+            raw_contents: 事件的原始采集结果（context.raw_contents）；从结果流拉取的条目追加到对应渠道
+        
         Returns:
             (filtered_items, filter_details): 过滤后的结果列表（最多15条，媒体优先）和过滤详情列表
         """
@@ -200,6 +244,19 @@ class LLMProcessor:
         filtered_media, media_filter_details = self._pre_filter_results(media_items, event_info)
         filtered_news, news_filter_details = self._pre_filter_results(news_items, event_info)
         
+        # 2.1 候选不足时从结果流继续拉取（逐页请求，够数即停）
+        if streams:
+            self._top_up_from_streams(
+                streams,
+                event_info,
+                media_items + news_items,
+                filtered_media,
+                filtered_news,
+                media_filter_details,
+                news_filter_details,
+                raw_contents,
+            )
+        
         # 3. 媒体优先：最多取3条（如果有）
         selected_media = filtered_media[:3] if len(filtered_media) >= 3 else filtered_media
         
@@ -223,6 +280,69 @@ class LLMProcessor:
         
         return filtered_items, all_filter_details
     
+    def _top_up_from_streams(
+        self,
+        streams: Dict[str, Iterator[Dict[str, Any]]],
+        event_info: Dict[str, Any],
+        candidates: List[Dict[str, Any]],
+        filtered_media: List[Dict[str, Any]],
+        filtered_news: List[Dict[str, Any]],
+        media_filter_details: List[Dict[str, Any]],
+        news_filter_details: List[Dict[str, Any]],
+        raw_contents: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    ) -> None:
+        """从结果流逐条拉取并预过滤，直到媒体满 3 条、总数满 15 条或流耗尽。
+
+        流在消费到页尾时才请求下一页，因此够数后立即停止，不会为用不到的结果消耗配额。
+        与已有候选（candidates，含其它渠道）URL 重复或近重复的条目跳过；新条目追加到
+        raw_contents，过滤详情的 index 接着媒体/新闻候选各自的编号。
+        """
+        seen_urls = {item.get("url") for item in candidates if item.get("url")}
+        near_duplicates = None
+        if self.config.NEAR_DUPLICATE_ENABLED:
+            from .near_duplicates import NearDuplicateIndex
+
+            near_duplicates = NearDuplicateIndex(candidates, self.config.NEAR_DUPLICATE_THRESHOLD)
+        next_index = {
+            True: sum(1 for item in candidates if item.get("channel") in {"media", "social"}),
+            False: sum(1 for item in candidates if item.get("channel") not in {"media", "social"}),
+        }
+        pulled = 0
+        skipped = 0
+        # 媒体流先拉：媒体数量决定新闻还需补多少条
+        for channel in sorted(streams, key=lambda name: name not in {"media", "social"}):
+            is_media = channel in {"media", "social"}
+            kept, details = (filtered_media, media_filter_details) if is_media else (filtered_news, news_filter_details)
+            stream = streams[channel]
+            while True:
+                if is_media:
+                    needed = len(filtered_media) < 3
+                else:
+                    needed = len(filtered_news) < 15 - min(3, len(filtered_media))
+                if not needed:
+                    break
+                item = next(stream, None)
+                if item is None:
+                    break
+                pulled += 1
+                candidate = {**item, "channel": channel}
+                url = item.get("url")
+                if (url and url in seen_urls) or (near_duplicates is not None and not near_duplicates.add(candidate)):
+                    skipped += 1
+                    continue
+                if url:
+                    seen_urls.add(url)
+                if raw_contents is not None:
+                    raw_contents.setdefault(channel, []).append(item)
+                passed, item_details = self._pre_filter_results([candidate], event_info)
+                for detail in item_details:
+                    detail["index"] = next_index[is_media]
+                next_index[is_media] += 1
+                kept.extend(passed)
+                details.extend(item_details)
+        if pulled:
+            logger.info("预过滤候选不足，从结果流补充拉取 %s 条（重复跳过 %s 条）", pulled, skipped)
+
     def _extract_date_from_url(self, url: str) -> Optional[datetime]:
         """从URL中提取日期（常见格式：/2025/10/27/ 或 /2025-10-27/）。"""
         if not url:
@@ -813,15 +933,31 @@ This rainfall event in {event.location_name}, {event.country}, recorded {event.r
             return {
                 "relevant_items": [],
                 "irrelevant_items": [],
+                "validated_by_channel": {},
+                "sent_by_channel": {},
             }
 
         # 保存原始搜索结果到文件（预过滤前）
         self._save_raw_items_before_filter(all_items, context, event_info)
 
+        # 合并近重复结果（转载稿），每簇只保留一条代表进入预过滤
+        if self.config.NEAR_DUPLICATE_ENABLED:
+            from .near_duplicates import collapse_near_duplicates
+
+            before = len(all_items)
+            all_items = collapse_near_duplicates(all_items, self.config.NEAR_DUPLICATE_THRESHOLD)
+            if len(all_items) < before:
+                logger.info("近重复合并：%s 条结果合并为 %s 条", before, len(all_items))
+
         # 预过滤：在交给LLM前进行简单规则判断，媒体优先进入15条
         if self.config.PRE_FILTER_ENABLED:
             original_count = len(all_items)
-            all_items, filter_details = self._pre_filter_with_media_priority(all_items, event_info)
+            # 取快照：超时被放弃的采集线程可能仍在登记结果流
+            with context.streams_lock:
+                streams = dict(context.source_streams)
+            all_items, filter_details = self._pre_filter_with_media_priority(
+                all_items, event_info, streams=streams, raw_contents=context.raw_contents
+            )
             filtered_count = len(all_items)
             if original_count > filtered_count:
                 logger.info(
@@ -851,9 +987,18 @@ This rainfall event in {event.location_name}, {event.country}, recorded {event.r
             )
             all_items = all_items[:15]
 
+        media_items, news_items, irrelevant_items = self._validate_items(event_info, all_items)
+        return self._finalize_validation(
+            context, event_info, media_items, news_items, irrelevant_items, sent_items=all_items
+        )
+
+    def _validate_items(
+        self, event_info: Dict[str, Any], items: List[Dict[str, Any]]
+    ) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """调用 LLM 判断一批条目的相关性，返回 (相关媒体, 相关新闻, 不相关项)。"""
         # 构建 prompt（只使用简短信息：标题+日期+摘要200字符）
         time_window_days = self.config.LLM_VALIDATION_TIME_WINDOW_DAYS
-        messages = build_validation_prompt(event_info, all_items, time_window_days)
+        messages = build_validation_prompt(event_info, items, time_window_days)
 
         # 调用 LLM
         client = self._get_client()
@@ -867,7 +1012,7 @@ This rainfall event in {event.location_name}, {event.country}, recorded {event.r
         # 解析响应
         result = client.parse_json_response(response)
 
-        # 映射回原始数据，并实现媒体优先
+        # 映射回原始数据
         relevant_items_raw = result.get("relevant_items", [])
         
         # 分离媒体和新闻
@@ -875,8 +1020,8 @@ This rainfall event in {event.location_name}, {event.country}, recorded {event.r
         news_items = []
         for item in relevant_items_raw:
             idx = item.get("index", -1)
-            if 0 <= idx < len(all_items):
-                original = all_items[idx]
+            if 0 <= idx < len(items):
+                original = items[idx]
                 item_with_score = {
                     **original,
                     "relevance_score": item.get("relevance_score", 0.0),
@@ -888,7 +1033,21 @@ This rainfall event in {event.location_name}, {event.country}, recorded {event.r
                     media_items.append(item_with_score)
                 else:
                     news_items.append(item_with_score)
-        
+        return media_items, news_items, result.get("irrelevant_items", [])
+
+    def _finalize_validation(
+        self,
+        context: EventContext,
+        event_info: Dict[str, Any],
+        media_items: List[Dict[str, Any]],
+        news_items: List[Dict[str, Any]],
+        irrelevant_items: List[Dict[str, Any]],
+        sent_items: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """媒体优先选出最终相关条目（最多 10 条），保存验证结果。
+
+        sent_items 为实际送入 LLM 验证的条目，用于按渠道/语言统计送验条数。
+        """
         # 媒体优先：即使评分低也优先保留（最多3条）
         # 如果媒体在前10条中，优先保留；如果没有，就跳过
         selected_media = media_items[:3] if len(media_items) >= 3 else media_items
@@ -900,7 +1059,6 @@ This rainfall event in {event.location_name}, {event.country}, recorded {event.r
         # 合并（媒体优先）
         relevant_items = selected_media + selected_news
         
-        irrelevant_items = result.get("irrelevant_items", [])
         logger.info(
             "验证完成: %s 条相关（媒体 %s 条，新闻 %s 条），%s 条不相关",
             len(relevant_items),
@@ -917,9 +1075,13 @@ This rainfall event in {event.location_name}, {event.country}, recorded {event.r
             event_info=event_info,
         )
 
+        # 各渠道/语言送验条数与验证为相关的条数（截断到 10 条之前），用于渠道产出统计；
+        # 被近重复合并、预过滤或条数上限挡在 LLM 之外的条目不计入
         return {
             "relevant_items": relevant_items,
             "irrelevant_items": irrelevant_items,
+            "validated_by_channel": _count_by_channel(media_items + news_items),
+            "sent_by_channel": _count_by_channel(sent_items),
         }
 
     def _step2_extraction(
@@ -935,6 +1097,16 @@ This rainfall event in {event.location_name}, {event.country}, recorded {event.r
             logger.warning("没有验证后的信息需要提取")
             return {"timeline": [], "impact": {}}
 
+        # 可选：抓取相关条目的正文，补充摘要中没有的数字细节
+        if self.config.ARTICLE_FETCH_ENABLED:
+            try:
+                from ..fetcher import enrich_with_article_text
+
+                enriched = enrich_with_article_text(verified_items, self.config)
+                logger.info("正文抓取：%s/%s 条相关结果补充了正文", enriched, len(verified_items))
+            except Exception as e:
+                logger.warning("正文抓取失败，仅使用摘要进行提取: %s", e)
+
         # 构建 prompt
         messages = build_extraction_prompt(event_info, verified_items)
         
@@ -122,6 +122,8 @@ def build_extraction_prompt(
         items_text += f"\n[{idx}] {title}\n"
         items_text += f"    Published: {published_at}\n"
         items_text += f"    Summary: {summary}\n"
+        if item.get('content'):
+            items_text += f"    Article text: {item.get('content')}\n"
         if item.get('url'):
             items_text += f"    URL: {item.get('url')}\n"
 
@@ -8,10 +8,15 @@
 
 from __future__ import annotations
 
+import contextvars
+import copy
 import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from ..config.settings import Settings, settings
 from ..watcher.rain_event_watcher import RainEvent, RainEventWatcher
@@ -30,10 +35,26 @@ class EventContext:
     processed_summary: Dict[str, Any] = field(default_factory=dict)
     reports: Dict[str, str] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # 各渠道的惰性结果流（首页之后的结果），由预过滤按需拉取
+    source_streams: Dict[str, Iterator[Dict[str, Any]]] = field(default_factory=dict, repr=False)
+    # 保护 source_streams：超时被放弃的采集线程可能在事件收尾时仍在登记结果流
+    streams_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    streams_closed: bool = field(default=False, repr=False)
+    # 流水线验证器（LLM_PIPELINED_VALIDATION 开启时），采集期间已开始验证
+    validation_pipeline: Optional[Any] = field(default=None, repr=False)
+    # 分阶段检查点（CHECKPOINT_ENABLED 开启时），重跑时从最后完成的阶段继续
+    checkpoint: Optional[Any] = field(default=None, repr=False)
     started_at: datetime = field(default_factory=datetime.utcnow)
     finished_at: Optional[datetime] = None
 
 
+def _has_content(value: Any) -> bool:
+    """阶段结果是否值得写入检查点：采集结果至少有一条，其它结果非空。"""
+    if isinstance(value, dict) and value and all(isinstance(items, list) for items in value.values()):
+        return any(value.values())
+    return bool(value)
+
+
 class SearchWorkflow:
     """处理降雨事件并生成报告的 orchestrator。"""
 
@@ -43,34 +64,125 @@ class SearchWorkflow:
         self._geo_resolver = None
         self._keyword_planner = None
         self._collectors = None
+        self._collectors_version: Optional[int] = None
         self._processor = None
         self._reporter = None
+        # 多事件并发时各阶段的并发上限（单事件处理不受影响）
+        self._collection_slots = threading.BoundedSemaphore(max(1, self.config.EVENT_COLLECTION_CONCURRENCY))
+        self._llm_slots = threading.BoundedSemaphore(max(1, self.config.EVENT_LLM_CONCURRENCY))
+        self._collectors_lock = threading.Lock()
+        self._state_store = None
+        # 标记事件已处理前保存报告与表2数据（常驻模式开启：没有 Node.js 读取 stdout）
+        self.store_outputs = False
 
     # ------------------------------------------------------------------
     # 公开接口
     # ------------------------------------------------------------------
     def process_pending_events(self) -> List[EventContext]:
-        """从 watcher 拉取事件并依次处理。"""
+        """从 watcher 拉取事件并批量处理。
 
-        contexts: List[EventContext] = []
+        先为每个事件生成查询计划，再按等价查询分组：每组只采集一次，
+        结果分发给组内所有事件后再逐个完成 LLM 处理。
+
+        各组最多 ``EVENT_MAX_CONCURRENCY`` 个并发处理，采集与 LLM 阶段分别受
+        ``EVENT_COLLECTION_CONCURRENCY`` 与 ``EVENT_LLM_CONCURRENCY`` 限制；单个事件失败不影响其它事件，
+        每个事件完成后立即标记为已处理。返回的结果按事件顺序排列。
+        """
+
+        prepared: List[EventContext] = []
         for event in self.watcher.fetch_pending_events():
             try:
-                context = self.run_for_event(event)
+                prepared.append(self.prepare_event(event))
+            except Exception:
+                logger.exception("处理降雨事件 %s 时出错", event.event_id)
+
+        if self.config.BATCH_QUERY_DEDUP_ENABLED:
+            from ..query.batch_planner import BatchQueryPlanner
+
+            groups = [group.contexts for group in BatchQueryPlanner().group(prepared)]
+        else:
+            groups = [[context] for context in prepared]
+
+        workers = max(1, min(self.config.EVENT_MAX_CONCURRENCY, len(groups)))
+        if workers == 1:
+            finished = [self._process_group(group) for group in groups]
+        else:
+            logger.info("并发处理 %s 组事件（并发 %s）", len(groups), workers)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="event") as pool:
+                finished = list(pool.map(self._process_group, groups))
+        return [context for contexts in finished for context in contexts]
+
+    def _process_group(self, group: List[EventContext]) -> List[EventContext]:
+        """采集一组等价查询的事件并逐个完成处理；异常只影响出错的事件。"""
+        from ..utils.detailed_logger import bind_event
+
+        contexts: List[EventContext] = []
+        leader = group[0]
+        bind_event(leader.rain_event.event_id)
+        try:
+            with self._collection_slots:
+                # 流水线验证按事件进行，只用于单事件组
+                raw_contents = self._checkpointed(
+                    leader,
+                    "raw_contents",
+                    lambda: self._collect_with_pipeline(leader) if len(group) == 1 else self._collect_sources(leader),
+                )
+        except Exception:
+            logger.exception("处理降雨事件 %s 时出错", leader.rain_event.event_id)
+            self._close_pipeline(leader)
+            return contexts
+        for index, context in enumerate(group):
+            event = context.rain_event
+            bind_event(event.event_id)
+            try:
+                # 组内其它事件使用结果副本，避免后续处理相互影响
+                context.raw_contents = raw_contents if index == 0 else copy.deepcopy(raw_contents)
+                if index > 0 and context.checkpoint is not None and context.checkpoint.get("raw_contents") is None:
+                    context.checkpoint.save("raw_contents", raw_contents)
+                if len(group) > 1:
+                    context.metadata["query_group"] = {
+                        "leader": leader.rain_event.event_id,
+                        "size": len(group),
+                    }
+                self.finish_event(context)
+                if self.store_outputs:
+                    self._store_outputs(context)
                 contexts.append(context)
                 self.watcher.mark_event_completed(event, processed_at=context.finished_at)
             except Exception:
                 logger.exception("处理降雨事件 %s 时出错", event.event_id)
+                self._close_pipeline(context)
         return contexts
 
+    def process_event(self, event: RainEvent) -> Optional[EventContext]:
+        """处理单个待处理事件（受各阶段并发上限约束），完成后标记为已处理；失败时返回 None。"""
+        try:
+            context = self.prepare_event(event)
+        except Exception:
+            logger.exception("处理降雨事件 %s 时出错", event.event_id)
+            return None
+        finished = self._process_group([context])
+        return finished[0] if finished else None
+
     def run_for_event(self, event: RainEvent) -> EventContext:
         """针对单个降雨事件执行完整流程。"""
-        from ..utils.detailed_logger import get_detailed_logger
+        context = self.prepare_event(event)
+        context.raw_contents = self._checkpointed(
+            context, "raw_contents", lambda: self._collect_with_pipeline(context)
+        )
+        return self.finish_event(context)
+
+    def prepare_event(self, event: RainEvent) -> EventContext:
+        """阶段一：解析地理信息并生成查询计划。"""
+        from ..utils.detailed_logger import bind_event, get_detailed_logger
         
         detailed_logger = get_detailed_logger()
+        bind_event(event.event_id)
         context = EventContext(rain_event=event)
         logger.info("开始处理降雨事件 %s", event.event_id)
+        context.checkpoint = self._open_checkpoint(event)
 
-        context.location_profile = self._resolve_location(event)
+        context.location_profile = self._checkpointed(context, "location_profile", lambda: self._resolve_location(event))
         detailed_logger.log_processing_step(
             "地理信息解析",
             {"event_id": event.event_id, "location": event.location_name},
@@ -78,15 +190,18 @@ class SearchWorkflow:
             "解析事件的地理位置和语言信息"
         )
         
-        context.query_plan = self._build_query_plan(context)
+        context.query_plan = self._query_plan(context)
         detailed_logger.log_processing_step(
             "查询计划生成",
             context.location_profile,
             context.query_plan,
             "生成多语言关键词和搜索渠道配置"
         )
-        
-        context.raw_contents = self._collect_sources(context)
+        return context
+
+    def finish_event(self, context: EventContext) -> EventContext:
+        """阶段三：基于已采集的 raw_contents 完成 LLM 处理与报告生成。"""
+        event = context.rain_event
         
         # 检查是否采集到数据
         total_items = sum(len(items) for items in context.raw_contents.values())
@@ -109,8 +224,14 @@ class SearchWorkflow:
             context.reports = self._generate_minimal_report(context)
         else:
             logger.info("✓ 采集到 %s 条数据（来源：%s）", total_items, list(context.raw_contents.keys()))
-            context.processed_summary = self._process_contents(context)
+            if context.validation_pipeline is not None:
+                # 流水线批次自身占用 LLM 名额，先在名额外等其结束，避免持有名额等待批次造成死锁
+                context.validation_pipeline.wait()
+            with self._llm_slots:
+                context.processed_summary = self._process_contents(context)
         
+        self._record_channel_yield(context)
+
         # 从 LLM 处理结果中提取报告
         llm_result = context.processed_summary
         if llm_result and "report" in llm_result:
@@ -118,10 +239,88 @@ class SearchWorkflow:
         else:
             context.reports = self._generate_reports(context)
 
+        # 未消费完的结果流不再需要，关闭以释放其持有的响应与上下文
+        with context.streams_lock:
+            streams = list(context.source_streams.values())
+            context.source_streams.clear()
+            context.streams_closed = True
+        for stream in streams:
+            try:
+                stream.close()
+            except ValueError:
+                # 生成器仍在其它线程中执行（generator already executing），由该线程结束后回收
+                logger.debug("结果流仍在使用，跳过关闭: %s", event.event_id)
+        self._close_pipeline(context)
+
         context.finished_at = datetime.utcnow()
+        try:
+            self._get_state_store().save_event(context)
+        except Exception:
+            logger.exception("保存事件结果失败: %s", event.event_id)
         logger.info("完成降雨事件 %s 的处理", event.event_id)
         return context
 
+    def _store_outputs(self, context: EventContext) -> None:
+        """保存报告文件并写入表2记录；表2数据缺失或写入失败时抛出异常，事件不会被标记为已处理。"""
+        self._get_state_store().save_report(context)
+        table2_data = (context.processed_summary or {}).get("table2_data")
+        if not table2_data:
+            raise RuntimeError(f"事件 {context.rain_event.event_id} 没有表2数据")
+        self.watcher.save_flood_impact(table2_data)
+
+    # ------------------------------------------------------------------
+    # 检查点
+    # ------------------------------------------------------------------
+    def _get_state_store(self):
+        if self._state_store is None:
+            from ..knowledge.state_store import StateStore
+
+            self._state_store = StateStore(self.config)
+        return self._state_store
+
+    def _open_checkpoint(self, event: RainEvent):
+        if not self.config.CHECKPOINT_ENABLED:
+            return None
+        try:
+            checkpoint = self._get_state_store().checkpoint(event)
+        except Exception:
+            logger.exception("无法打开事件 %s 的检查点，本次不使用检查点", event.event_id)
+            return None
+        completed = checkpoint.completed_stages()
+        if completed:
+            logger.info("事件 %s 存在检查点（已完成: %s），从断点继续", event.event_id, ", ".join(completed))
+        return checkpoint
+
+    def _checkpointed(self, context: EventContext, stage: str, compute: Callable[[], Any]) -> Any:
+        """阶段结果存在检查点时直接返回，否则执行 compute 并写入检查点（空结果不写入，下次重试）。"""
+        checkpoint = context.checkpoint
+        if checkpoint is not None:
+            value = checkpoint.get(stage)
+            if value is not None:
+                logger.info("事件 %s：使用检查点中的 %s", context.rain_event.event_id, stage)
+                return value
+        value = compute()
+        if checkpoint is not None and _has_content(value):
+            checkpoint.save(stage, value)
+        return value
+
+    def _query_plan(self, context: EventContext) -> Dict[str, Any]:
+        """查询计划：关键词部分可来自检查点，渠道配置总是取当前渠道计划（采集器配置可能已热重载）。"""
+        checkpoint = context.checkpoint
+        cached = checkpoint.get("query_plan") if checkpoint is not None else None
+        if cached:
+            from ..query.channel_plan import get_channel_plan
+            from ..query.keyword_planner import channels_to_dict
+
+            logger.info("事件 %s：使用检查点中的 query_plan（渠道配置取当前版本）", context.rain_event.event_id)
+            plan = {**cached, "channels": channels_to_dict(get_channel_plan().channels)}
+            self._schedule_channels(context, plan)
+            return plan
+        plan = self._build_query_plan(context)
+        if checkpoint is not None and plan:
+            checkpoint.save("query_plan", {key: value for key, value in plan.items() if key != "channels"})
+        return plan
+
     # ------------------------------------------------------------------
     # 阶段性处理
     # ------------------------------------------------------------------
@@ -149,34 +348,182 @@ class SearchWorkflow:
                 from ..query.keyword_planner import KeywordPlanner
 
                 self._keyword_planner = KeywordPlanner(self.config)
-            return self._keyword_planner.plan(context)
+            plan = self._keyword_planner.plan(context)
+            self._schedule_channels(context, plan)
+            return plan
         except ImportError:
             logger.warning("KeywordPlanner 未实现，返回空查询计划")
         except Exception:
             logger.exception("生成查询计划失败: %s", context.rain_event.event_id)
         return {}
 
-    def _collect_sources(self, context: EventContext) -> Dict[str, List[Dict[str, Any]]]:
+    def _schedule_channels(self, context: EventContext, plan: Dict[str, Any]) -> None:
+        """按历史产出跳过或降级低产出渠道（保留探索比例）。"""
+        try:
+            from ..knowledge.yield_stats import schedule_channels
+
+            decisions = schedule_channels(plan, context.location_profile, self.config)
+            if decisions:
+                context.metadata["channel_schedule"] = decisions
+        except Exception:
+            logger.exception("渠道调度失败，按原计划采集: %s", context.rain_event.event_id)
+
+    def _record_channel_yield(self, context: EventContext) -> None:
+        """记录本事件各渠道的采集条数与验证为相关的条数。
+
+        只记录本次实际完成采集的渠道；采集结果来自检查点或同组组长事件时不记录
+        （采集器未在本事件上运行，组内结果只由组长记录一次）。
+        """
+        completed = context.metadata.get("completed_channels")
+        if completed is None:
+            return
+        validation = (context.processed_summary or {}).get("validation")
+        if validation is None:
+            return
+        validated = validation.get("validated_by_channel")
+        if validated is None and any(context.raw_contents.values()):
+            # 验证步骤未完成（如 LLM 调用失败），不计入统计
+            return
+        try:
+            from ..knowledge.yield_stats import record_event_yield
+
+            record_event_yield(
+                context.query_plan,
+                context.location_profile,
+                {name: items for name, items in context.raw_contents.items() if name in completed},
+                validated or {},
+                self.config,
+                skipped=context.metadata.get("skipped_requests"),
+                sent_by_channel=validation.get("sent_by_channel"),
+            )
+        except Exception:
+            logger.exception("记录渠道产出失败: %s", context.rain_event.event_id)
+
+    @staticmethod
+    def _close_pipeline(context: EventContext) -> None:
+        """关闭事件的流水线验证器，放弃未开始的批次。"""
+        if context.validation_pipeline is not None:
+            context.validation_pipeline.close()
+            context.validation_pipeline = None
+
+    def _collect_with_pipeline(self, context: EventContext) -> Dict[str, List[Dict[str, Any]]]:
+        """采集数据；开启流水线验证时各采集器的结果一到达即开始 LLM 验证。"""
+        if not self.config.LLM_PIPELINED_VALIDATION:
+            return self._collect_sources(context)
+        try:
+            from ..llm.pipeline import PipelinedValidator
+
+            context.validation_pipeline = PipelinedValidator(context, self.config, llm_slots=self._llm_slots)
+        except Exception:
+            logger.exception("无法启动流水线验证，采集后使用批量验证: %s", context.rain_event.event_id)
+            return self._collect_sources(context)
+        return self._collect_sources(context, on_result=context.validation_pipeline.submit)
+
+    def _collect_sources(
+        self,
+        context: EventContext,
+        on_result: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
         try:
-            if self._collectors is None:
-                from ..collectors.loader import CollectorLoader
-
-                loader = CollectorLoader(self.config)
-                self._collectors = loader.load_all()
-
-            results: Dict[str, List[Dict[str, Any]]] = {}
-            for name, collector in self._collectors.items():
-                try:
-                    results[name] = collector.collect(context)
-                except Exception:
-                    logger.exception("采集器 %s 执行失败", name)
-            return results
+            from ..query.channel_plan import get_channel_plan
+
+            # 采集器配置变化（渠道计划版本更新）时重新加载，长时间运行的 worker 无需重启
+            plan_version = get_channel_plan().version
+            with self._collectors_lock:
+                if self._collectors is None or self._collectors_version != plan_version:
+                    from ..collectors.loader import CollectorLoader
+
+                    loader = CollectorLoader(self.config)
+                    self._collectors = loader.load_all()
+                    self._collectors_version = plan_version
+                collectors = self._collectors
+
+            return self._run_collectors(context, collectors, on_result)
         except ImportError:
             logger.warning("数据采集器尚未全部实现，返回空数据")
         except Exception:
             logger.exception("采集数据源失败: %s", context.rain_event.event_id)
         return {}
 
+    def _run_collectors(
+        self,
+        context: EventContext,
+        collectors: Dict[str, Any],
+        on_result: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """并发执行各采集器，带单采集器超时与全局截止时间。
+
+        单采集器超时从其任务开始执行时计时，在线程池中排队的时间只受全局截止时间约束。
+        结果按采集器加载顺序写入，与完成先后无关；超时或失败的采集器不计入结果。
+        on_result 按完成先后对每个成功的采集器调用一次（流水线验证使用）。
+        实际完成的渠道记入 metadata["completed_channels"]，其中未完成的语言请求由采集器记入
+        metadata["skipped_requests"]，供渠道产出统计使用。
+        """
+        if not collectors:
+            return {}
+        channels = (context.query_plan or {}).get("channels") or {}
+        workers = max(1, min(self.config.COLLECTOR_MAX_WORKERS, len(collectors)))
+        started = time.monotonic()
+        deadline = started + self.config.COLLECTION_DEADLINE_SECONDS
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        # 在采集线程启动前创建，线程内只做 append
+        context.metadata["skipped_requests"] = []
+        timeouts: Dict[str, float] = {}
+        for name, collector in collectors.items():
+            channel_config = channels.get(getattr(collector, "channel_name", name)) or {}
+            timeouts[name] = float(channel_config.get("timeout_seconds") or self.config.COLLECTOR_TIMEOUT_SECONDS)
+        # 各采集器任务实际开始执行的时间（在采集线程中写入）
+        task_started: Dict[str, float] = {}
+
+        def run(name: str, collector: Any) -> List[Dict[str, Any]]:
+            task_started[name] = time.monotonic()
+            return collector.collect(context)
+
+        def limit(name: str, now: float) -> float:
+            # 尚未开始的任务若此刻开始，最早在 now + timeout 超时
+            begun = task_started.get(name, now)
+            return min(begun + timeouts[name], deadline)
+
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="collector")
+        try:
+            # 复制 contextvars，采集线程中的详细日志仍归属当前事件
+            pending = {
+                name: pool.submit(contextvars.copy_context().run, run, name, collector)
+                for name, collector in collectors.items()
+            }
+            while pending:
+                now = time.monotonic()
+                for name in [name for name, future in pending.items() if not future.done() and limit(name, now) <= now]:
+                    pending.pop(name).cancel()
+                    logger.warning("采集器 %s 超时（限时 %.0fs，全局截止 %.0fs），跳过", name, timeouts[name], self.config.COLLECTION_DEADLINE_SECONDS)
+                if not pending:
+                    break
+                done, _ = wait(
+                    pending.values(),
+                    timeout=max(0.0, min(limit(name, now) for name in pending) - now),
+                    return_when=FIRST_COMPLETED,
+                )
+                for name in [name for name, future in pending.items() if future in done]:
+                    future = pending.pop(name)
+                    try:
+                        results[name] = future.result()
+                    except Exception:
+                        logger.exception("采集器 %s 执行失败", name)
+                        continue
+                    if on_result is not None:
+                        try:
+                            on_result(name, results[name])
+                        except Exception:
+                            logger.exception("处理采集器 %s 的结果回调失败", name)
+        finally:
+            # 不等待超时线程结束；尚未开始的任务直接取消
+            pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("采集阶段耗时 %.1fs（%s 个采集器，并发 %s）", time.monotonic() - started, len(collectors), workers)
+        context.metadata["completed_channels"] = [
+            getattr(collectors[name], "channel_name", name) for name in collectors if name in results
+        ]
+        return {name: results[name] for name in collectors if name in results}
+
     def _build_rain_event_data(self, context: EventContext) -> Dict[str, Any]:
         """从 context 构建表1数据字典。
         
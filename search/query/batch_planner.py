@@ -0,0 +1,73 @@
+"""跨事件查询合并。
+
+同一批待处理事件中，常有多个雨量站事件落在同一省份、同一天，它们由
+KeywordPlanner 生成的查询几乎相同。批量规划阶段按 (省, 国家, 日期, 各语言查询)
+分组，每组只采集一次，再把结果分发给组内所有事件，API 调用量随事件聚集程度成比例下降。
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from ..orchestrator.workflow import EventContext
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryGroup:
+    """共享同一组查询的事件集合；第一个事件作为采集代表。"""
+
+    key: Tuple[Any, ...]
+    contexts: List[EventContext] = field(default_factory=list)
+
+    @property
+    def leader(self) -> EventContext:
+        return self.contexts[0]
+
+
+class BatchQueryPlanner:
+    """将已生成查询计划的事件按等价查询分组。"""
+
+    @staticmethod
+    def group_key(context: EventContext) -> Tuple[Any, ...]:
+        """分组键：省、国家、事件日期，以及各语言的查询字符串与启用渠道。
+
+        采集器构建请求时只用到事件的国家与日期（精确到天），因此键相同的事件
+        发出的请求完全一致。
+        """
+        event = context.rain_event
+        plan = context.query_plan or {}
+        query_strings = plan.get("query_strings") or {}
+        keywords = plan.get("keywords") or {}
+        languages = tuple(
+            (language, query_strings.get(language) or " ".join(terms))
+            for language, terms in keywords.items()
+            if terms
+        )
+        channels = tuple(
+            sorted(name for name, channel in (plan.get("channels") or {}).items() if channel.get("enabled", True))
+        )
+        return (
+            (event.extras.get("province") or "").strip().lower(),
+            (event.country or "").strip().lower(),
+            event.event_time.date().isoformat() if event.event_time else None,
+            languages,
+            channels,
+        )
+
+    def group(self, contexts: List[EventContext]) -> List[QueryGroup]:
+        """按首次出现顺序返回分组；没有查询计划的事件各自成组。"""
+        groups: Dict[Tuple[Any, ...], QueryGroup] = {}
+        for index, context in enumerate(contexts):
+            if not context.query_plan:
+                key: Tuple[Any, ...] = ("__unplanned__", index)
+            else:
+                key = self.group_key(context)
+            groups.setdefault(key, QueryGroup(key=key)).contexts.append(context)
+        result = list(groups.values())
+        if len(result) < len(contexts):
+            logger.info("批量规划：%s 个事件合并为 %s 个查询组", len(contexts), len(result))
+        return result
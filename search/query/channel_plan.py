@@ -0,0 +1,138 @@
+"""编译后的渠道计划。
+
+渠道信息有两个来源：``channels.default_channels()``（提供商、URL、配额等）与
+``collectors/collector_config.json``（启用哪些采集器，可选 ``channel_overrides`` 覆盖字段）。
+过去二者分别被 KeywordPlanner 与 CollectorLoader 读取，在采集时再通过 ``enabled`` 协调。
+
+这里将两者合并一次并在进程内缓存：渠道只有在两处都启用时才启用。每次获取时检查 JSON 文件的
+mtime，文件变化后自动重新编译，长时间运行的 worker 无需重启即可生效。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .channels import Channel, default_channels
+
+logger = logging.getLogger(__name__)
+
+COLLECTOR_CONFIG_PATH = Path(__file__).resolve().parents[1] / "collectors" / "collector_config.json"
+
+# 配置文件缺失或无法解析时使用的默认采集器配置
+DEFAULT_COLLECTOR_CONFIG: Dict[str, Any] = {
+    "collectors": {
+        "news": {
+            "enabled": ["news_thenewsapi"],
+            "disabled": ["news_gnews", "news_serpapi"],
+        },
+        "officials": {
+            "enabled": ["official"],
+            "disabled": [],
+        },
+        "medias": {
+            "enabled": ["media"],
+            "disabled": [],
+        },
+        "socials": {
+            "enabled": ["social"],
+            "disabled": [],
+        },
+    },
+}
+
+
+@dataclass(frozen=True)
+class CompiledChannelPlan:
+    """合并后的渠道配置（只读，可在线程间共享）。"""
+
+    channels: Dict[str, Channel]
+    # 启用的采集器 -> 所属类别（news / officials / medias / socials），保持配置文件中的顺序
+    categories: Dict[str, str]
+    raw_config: Dict[str, Any]
+    source_mtime: Optional[float]
+    version: int
+
+    def enabled_collectors(self) -> Dict[str, List[str]]:
+        enabled: Dict[str, List[str]] = {}
+        for name, category in self.categories.items():
+            enabled.setdefault(category, []).append(name)
+        return enabled
+
+    def is_enabled(self, name: str) -> bool:
+        channel = self.channels.get(name)
+        return bool(channel and channel.enabled)
+
+
+def _read_config(path: Path) -> tuple:
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        logger.warning("采集器配置文件不存在: %s，使用默认配置", path)
+        return DEFAULT_COLLECTOR_CONFIG, None
+    try:
+        with path.open("r", encoding="utf-8") as fp:
+            return json.load(fp), mtime
+    except Exception:
+        logger.exception("加载采集器配置失败，使用默认配置")
+        return DEFAULT_COLLECTOR_CONFIG, mtime
+
+
+def compile_channel_plan(raw_config: Dict[str, Any], source_mtime: Optional[float], version: int) -> CompiledChannelPlan:
+    """合并 default_channels() 与采集器配置：渠道需在两处都启用才启用。"""
+    categories: Dict[str, str] = {}
+    disabled = set()
+    for category, category_config in (raw_config.get("collectors") or {}).items():
+        disabled.update(category_config.get("disabled", []))
+        for name in category_config.get("enabled", []):
+            categories.setdefault(name, category)
+    for name in disabled:
+        categories.pop(name, None)
+
+    overrides = raw_config.get("channel_overrides") or {}
+    channels: Dict[str, Channel] = {}
+    for name, channel in default_channels().items():
+        fields = {key: value for key, value in (overrides.get(name) or {}).items() if key in Channel.__dataclass_fields__}
+        fields["enabled"] = channel.enabled and fields.get("enabled", True) and name in categories
+        channels[name] = dataclasses.replace(channel, **fields)
+
+    return CompiledChannelPlan(
+        channels=channels,
+        categories=categories,
+        raw_config=raw_config,
+        source_mtime=source_mtime,
+        version=version,
+    )
+
+
+_lock = threading.Lock()
+_plans: Dict[Path, CompiledChannelPlan] = {}
+
+
+def get_channel_plan(path: Path | None = None) -> CompiledChannelPlan:
+    """获取进程内缓存的渠道计划；配置文件 mtime 变化时重新编译。"""
+    path = Path(path or COLLECTOR_CONFIG_PATH)
+    try:
+        mtime: Optional[float] = path.stat().st_mtime
+    except OSError:
+        mtime = None
+    with _lock:
+        plan = _plans.get(path)
+        if plan is not None and plan.source_mtime == mtime:
+            return plan
+        raw_config, mtime = _read_config(path)
+        version = plan.version + 1 if plan is not None else 1
+        plan = compile_channel_plan(raw_config, mtime, version)
+        _plans[path] = plan
+        if version > 1:
+            logger.info(
+                "采集器配置已变更，重新编译渠道计划（版本 %s，启用: %s）",
+                version,
+                ", ".join(name for name, channel in plan.channels.items() if channel.enabled) or "无",
+            )
+        return plan
@@ -21,6 +21,14 @@ class Channel:
     languages: Optional[List[str]] = None
     max_results: int = 10
     notes: str | None = None
+    # 响应缓存有效期（秒），None 表示使用 SEARCH_CACHE_TTL_SECONDS
+    cache_ttl_seconds: Optional[int] = None
+    # 提供商限流：每分钟请求数（令牌桶速率）、突发容量与每日配额，None 表示不限制
+    rate_per_minute: Optional[float] = None
+    burst: Optional[int] = None
+    daily_quota: Optional[int] = None
+    # 分页拉取的最大页数（含首页），None 表示使用 COLLECTOR_MAX_PAGES
+    max_pages: Optional[int] = None
 
 
 def default_channels() -> Dict[str, Channel]:
@@ -33,6 +41,9 @@ def default_channels() -> Dict[str, Channel]:
             base_url="https://api.tavily.com/search",
             notes="政府、气象等官方网站优先",
             max_results=8,
+            cache_ttl_seconds=86400,
+            rate_per_minute=100,
+            burst=5,
         ),
         # 新闻渠道 - 多个可选 provider
         "news_thenewsapi": Channel(
@@ -42,6 +53,8 @@ def default_channels() -> Dict[str, Channel]:
             notes="The News API - 支持历史数据（免费层每日50次，最多50条/次）",
             max_results=50,
             enabled=True,
+            cache_ttl_seconds=86400,
+            daily_quota=50,
         ),
         "news_gnews": Channel(
             name="news_gnews",
@@ -50,6 +63,9 @@ def default_channels() -> Dict[str, Channel]:
             notes="GNews API - 免费层每日100次，最多10条/次（仅限30天内）",
             max_results=10,
             enabled=False,  # 默认禁用，按需启用
+            cache_ttl_seconds=21600,
+            rate_per_minute=60,
+            daily_quota=100,
         ),
         "news_serpapi": Channel(
             name="news_serpapi",
@@ -58,6 +74,8 @@ def default_channels() -> Dict[str, Channel]:
             notes="SerpAPI Google News - 免费层100次，需付费升级",
             max_results=15,
             enabled=False,  # 默认禁用，按需启用
+            cache_ttl_seconds=21600,
+            daily_quota=100,
         ),
         "social": Channel(
             name="social",
@@ -66,6 +84,9 @@ def default_channels() -> Dict[str, Channel]:
             notes="X (Twitter) - 社交媒体搜索（付费 $200/月）",
             max_results=20,
             enabled=False,
+            cache_ttl_seconds=3600,
+            rate_per_minute=4,  # recent search：15 分钟 60 次
+            burst=2,
         ),
         "social_instagram": Channel(
             name="social_instagram",
@@ -74,6 +95,9 @@ def default_channels() -> Dict[str, Channel]:
             notes="Instagram Graph API - Meta 官方 API（需 App 审核）",
             max_results=25,
             enabled=True,
+            cache_ttl_seconds=3600,
+            rate_per_minute=3,  # Graph API：每小时约 200 次
+            burst=2,
         ),
         "media": Channel(
             name="media",
@@ -81,6 +105,8 @@ def default_channels() -> Dict[str, Channel]:
             base_url="https://www.googleapis.com/youtube/v3/search",
             notes="视频平台搜索，选取至少5条",
             max_results=12,
+            cache_ttl_seconds=43200,
+            daily_quota=100,  # 每日 10000 单位，search.list 每次 100 单位
         ),
     }
 
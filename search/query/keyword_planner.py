@@ -11,7 +11,8 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
 from ..config.settings import Settings, settings
-from ..query.channels import Channel, default_channels
+from ..query.channel_plan import get_channel_plan
+from ..query.channels import Channel
 from ..watcher.rain_event_watcher import RainEvent
 from ..orchestrator.workflow import EventContext
 
@@ -40,6 +41,26 @@ class KeywordBundle:
         return deduped
 
 
+def channels_to_dict(channels: Dict[str, Channel]) -> Dict[str, Dict]:
+    """渠道配置转为查询计划中的字典形式。"""
+    return {
+        name: {
+            "provider": channel.provider,
+            "base_url": channel.base_url,
+            "max_results": channel.max_results,
+            "enabled": channel.enabled,
+            "languages": channel.languages,
+            "notes": channel.notes,
+            "cache_ttl_seconds": channel.cache_ttl_seconds,
+            "rate_per_minute": channel.rate_per_minute,
+            "burst": channel.burst,
+            "daily_quota": channel.daily_quota,
+            "max_pages": channel.max_pages,
+        }
+        for name, channel in channels.items()
+    }
+
+
 @dataclass
 class QueryPlan:
     """最终输出给采集器使用的搜索计划。"""
@@ -52,17 +73,7 @@ class QueryPlan:
 
     def to_dict(self) -> Dict[str, Dict]:
         return {
-            "channels": {
-                name: {
-                    "provider": channel.provider,
-                    "base_url": channel.base_url,
-                    "max_results": channel.max_results,
-                    "enabled": channel.enabled,
-                    "languages": channel.languages,
-                    "notes": channel.notes,
-                }
-                for name, channel in self.channels.items()
-            },
+            "channels": channels_to_dict(self.channels),
             "keywords": {
                 lang: bundle.expanded() if isinstance(bundle, KeywordBundle) else bundle
                 for lang, bundle in self.keywords.items()
@@ -78,7 +89,6 @@ class KeywordPlanner:
 
     def __init__(self, config: Settings | None = None):
         self.config = config or settings
-        self._channels = default_channels()
 
     def plan(self, context: EventContext) -> Dict[str, Dict]:
         rain_event = context.rain_event
@@ -107,7 +117,8 @@ class KeywordPlanner:
             bundles[primary_language] = native_bundle
 
         plan = QueryPlan(
-            channels=self._channels,
+            # 合并 default_channels 与采集器配置后的渠道（进程内缓存，配置文件变化时自动重载）
+            channels=get_channel_plan().channels,
             keywords=bundles,
             time_window_hours=self.config.MAX_EVENT_LOOKBACK_HOURS,
             rainfall_mm=rain_event.rainfall_mm,
@@ -0,0 +1 @@
+"""开发与压测工具。"""
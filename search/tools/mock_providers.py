@@ -0,0 +1,456 @@
+"""本地模拟搜索提供商服务器。
+
+压测采集阶段不能消耗真实 API 配额，``test_api_keys.py`` 也只做在线连通性检查。这里用标准库
+``ThreadingHTTPServer`` 为每个提供商（Tavily、TheNewsAPI、GNews、SerpAPI、YouTube、X、Instagram）
+各启动一个本地端口，返回与真实 API 相同结构的响应，并可配置：
+
+- 延迟分布：中位延迟 ``latency_ms`` 与 99 分位 ``p99_latency_ms``（对数正态分布；二者相等时为固定延迟）；
+- 错误率：``error_rate`` 概率返回 500/502/503；
+- 429：``rate_limit_per_second``（令牌桶，突发 ``burst``）超出时返回 429 与 ``Retry-After``，
+  ``daily_quota`` 为累计请求上限，用尽后一律返回 429；
+- 分页：TheNewsAPI 与 YouTube 最多返回 ``pages`` 页。
+
+每个提供商独占一个端口，熔断器与连接池（均按主机:端口区分）的行为与线上一致。
+
+独立运行（打印可写入 collector_config.json 的 ``channel_overrides``）::
+
+    python -m search.tools.mock_providers --latency-ms 300 --p99-ms 2000 --error-rate 0.02 --rate-limit 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+# 正态分布 99 分位对应的 z 值
+_Z99 = 2.326
+
+
+@dataclass
+class ProviderBehavior:
+    """单个模拟提供商的响应行为。"""
+
+    latency_ms: float = 200.0
+    p99_latency_ms: float = 1000.0
+    error_rate: float = 0.0
+    rate_limit_per_second: Optional[float] = None
+    burst: int = 5
+    retry_after_seconds: int = 1
+    daily_quota: Optional[int] = None
+    pages: int = 3
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """按对数正态分布抽取一次延迟（秒）。"""
+        median = max(0.0, self.latency_ms) / 1000.0
+        if median <= 0:
+            return 0.0
+        if self.p99_latency_ms <= self.latency_ms:
+            return median
+        sigma = math.log(self.p99_latency_ms / self.latency_ms) / _Z99
+        return rng.lognormvariate(math.log(median), sigma)
+
+
+def _stable_id(*parts: Any) -> str:
+    return hashlib.blake2b("|".join(str(part) for part in parts).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def _fake_articles(provider: str, query: str, page: int, count: int) -> List[Dict[str, Any]]:
+    """生成确定性的模拟条目（同一查询与页码得到同样的结果）。"""
+    topic = (query or "heavy rain").replace('"', "").split(" OR ")[0].strip() or "heavy rain"
+    now = datetime.now(timezone.utc)
+    articles = []
+    for index in range(count):
+        ident = _stable_id(provider, query, page, index)
+        published = now - timedelta(minutes=(int(ident[:4], 16) % 1440))
+        articles.append(
+            {
+                "id": ident,
+                "title": f"{topic}: flooding update {page}-{index + 1} ({ident[:6]})",
+                "summary": (
+                    f"Mock {provider} report {ident}: authorities respond to {topic}, "
+                    f"roads closed and residents evacuated in affected districts."
+                ),
+                "url": f"https://{provider}.mock.invalid/articles/{ident}",
+                "published_at": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "source": f"{provider.title()} Mock Wire",
+            }
+        )
+    return articles
+
+
+def _int(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+# ----------------------------------------------------------------------
+# 各提供商的响应结构（与对应采集器的 parse_response 一致）
+# ----------------------------------------------------------------------
+def _tavily(params: Dict[str, Any], behavior: ProviderBehavior) -> Dict[str, Any]:
+    query = params.get("query", "")
+    count = min(_int(params.get("max_results"), 5), 20)
+    return {
+        "query": query,
+        "results": [
+            {
+                "title": item["title"],
+                "content": item["summary"],
+                "url": item["url"],
+                "published_date": item["published_at"],
+                "site_name": item["source"],
+                "score": 0.9,
+            }
+            for item in _fake_articles("tavily", query, 1, count)
+        ],
+        "response_time": 0.0,
+    }
+
+
+def _thenewsapi(params: Dict[str, Any], behavior: ProviderBehavior) -> Dict[str, Any]:
+    query = params.get("search", "")
+    limit = min(_int(params.get("limit"), 3), 50)
+    page = max(1, _int(params.get("page"), 1))
+    items = _fake_articles("thenewsapi", query, page, limit) if page <= behavior.pages else []
+    return {
+        "meta": {"found": limit * behavior.pages, "returned": len(items), "limit": limit, "page": page},
+        "data": [
+            {
+                "uuid": item["id"],
+                "title": item["title"],
+                "description": item["summary"],
+                "url": item["url"],
+                "published_at": item["published_at"],
+                "source": item["source"],
+                "language": params.get("language", "en"),
+            }
+            for item in items
+        ],
+    }
+
+
+def _gnews(params: Dict[str, Any], behavior: ProviderBehavior) -> Dict[str, Any]:
+    query = params.get("q", "")
+    items = _fake_articles("gnews", query, 1, min(_int(params.get("max"), 10), 10))
+    return {
+        "totalArticles": len(items),
+        "articles": [
+            {
+                "title": item["title"],
+                "description": item["summary"],
+                "url": item["url"],
+                "publishedAt": item["published_at"],
+                "source": {"name": item["source"], "url": "https://gnews.mock.invalid"},
+            }
+            for item in items
+        ],
+    }
+
+
+def _serpapi(params: Dict[str, Any], behavior: ProviderBehavior) -> Dict[str, Any]:
+    query = params.get("q", "")
+    items = _fake_articles("serpapi", query, 1, min(_int(params.get("num"), 15), 100))
+    return {
+        "search_metadata": {"status": "Success"},
+        "news_results": [
+            {
+                "title": item["title"],
+                "snippet": item["summary"],
+                "link": item["url"],
+                "date": item["published_at"],
+                "source": {"name": item["source"]},
+            }
+            for item in items
+        ],
+    }
+
+
+def _youtube(params: Dict[str, Any], behavior: ProviderBehavior) -> Dict[str, Any]:
+    query = params.get("q", "")
+    page = _int(str(params.get("pageToken", "page-1")).rsplit("-", 1)[-1], 1)
+    items = _fake_articles("youtube", query, page, min(_int(params.get("maxResults"), 12), 50))
+    response: Dict[str, Any] = {
+        "kind": "youtube#searchListResponse",
+        "pageInfo": {"totalResults": len(items) * behavior.pages, "resultsPerPage": len(items)},
+        "items": [
+            {
+                "id": {"kind": "youtube#video", "videoId": item["id"]},
+                "snippet": {
+                    "title": item["title"],
+                    "description": item["summary"],
+                    "publishedAt": item["published_at"],
+                    "channelTitle": item["source"],
+                    "thumbnails": {"default": {"url": f"https://i.mock.invalid/{item['id']}.jpg"}},
+                },
+            }
+            for item in items
+        ],
+    }
+    if page < behavior.pages:
+        response["nextPageToken"] = f"page-{page + 1}"
+    return response
+
+
+def _x(params: Dict[str, Any], behavior: ProviderBehavior) -> Dict[str, Any]:
+    query = params.get("query", "")
+    items = _fake_articles("x", query, 1, min(_int(params.get("max_results"), 20), 100))
+    return {
+        "data": [
+            {
+                "id": str(int(item["id"], 16)),
+                "text": f"{item['title']} — {item['summary']}",
+                "lang": "en",
+                "created_at": item["published_at"],
+                "public_metrics": {"retweet_count": 3, "reply_count": 1, "like_count": 12, "quote_count": 0},
+            }
+            for item in items
+        ],
+        "meta": {"result_count": len(items)},
+    }
+
+
+def _instagram(params: Dict[str, Any], behavior: ProviderBehavior) -> Dict[str, Any]:
+    hashtag = str(params.get("q", "flood")).lower() or "flood"
+    return {"data": [{"id": str(int(_stable_id("instagram", hashtag), 16)), "name": hashtag}]}
+
+
+# 提供商 -> (响应构造函数, 使用它的渠道, 渠道 base_url 的路径部分)
+PROVIDERS: Dict[str, Tuple[Callable[[Dict[str, Any], ProviderBehavior], Dict[str, Any]], str, str]] = {
+    "tavily": (_tavily, "official", "/search"),
+    "thenewsapi": (_thenewsapi, "news_thenewsapi", "/v1/news/all"),
+    "gnews": (_gnews, "news_gnews", "/api/v4/search"),
+    "serpapi": (_serpapi, "news_serpapi", "/search"),
+    "youtube": (_youtube, "media", "/youtube/v3/search"),
+    "x": (_x, "social", "/2"),
+    "instagram": (_instagram, "social_instagram", "/v21.0"),
+}
+
+
+class _ProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, provider: str, behavior: ProviderBehavior, seed: Optional[int]):
+        super().__init__(address, _Handler)
+        self.provider = provider
+        self.behavior = behavior
+        self.stats: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(max(1, behavior.burst))
+        self._refilled_at = time.monotonic()
+
+    def admit(self) -> Tuple[Optional[int], float]:
+        """决定本次请求的结果：返回 (错误状态码或 None, 延迟秒数)。"""
+        behavior = self.behavior
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = behavior.sample_latency(self._rng)
+            if behavior.daily_quota is not None and self.stats["requests"] > behavior.daily_quota:
+                return 429, 0.0
+            if behavior.rate_limit_per_second:
+                now = time.monotonic()
+                self._tokens = min(
+                    float(max(1, behavior.burst)),
+                    self._tokens + (now - self._refilled_at) * behavior.rate_limit_per_second,
+                )
+                self._refilled_at = now
+                if self._tokens < 1:
+                    return 429, 0.0
+                self._tokens -= 1
+            if behavior.error_rate and self._rng.random() < behavior.error_rate:
+                return self._rng.choice((500, 502, 503)), delay
+        return None, delay
+
+    def record(self, status: int) -> None:
+        with self._lock:
+            self.stats[status] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _ProviderServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._respond(dict((key, values[-1]) for key, values in parse_qs(urlparse(self.path).query).items()))
+
+    def do_POST(self):
+        length = _int(self.headers.get("Content-Length"), 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        except ValueError:
+            body = {}
+        self._respond(body if isinstance(body, dict) else {})
+
+    def _respond(self, params: Dict[str, Any]) -> None:
+        server = self.server
+        status, delay = server.admit()
+        if delay:
+            time.sleep(delay)
+        headers = {}
+        if status == 429:
+            headers["Retry-After"] = str(server.behavior.retry_after_seconds)
+            payload: Dict[str, Any] = {"error": {"code": 429, "message": "Rate limit exceeded (mock)"}}
+        elif status is not None:
+            payload = {"error": {"code": status, "message": "Upstream error (mock)"}}
+        else:
+            status = 200
+            payload = PROVIDERS[server.provider][0](params, server.behavior)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        server.record(status)
+
+    def log_message(self, format, *args):  # noqa: A002 - 覆盖基类签名
+        logger.debug("[%s] %s", self.server.provider, format % args)
+
+
+class MockProviderCluster:
+    """为每个提供商启动一个本地模拟服务器。
+
+    ``behaviors`` 可按提供商覆盖默认行为；``base_port`` 为 0 时使用随机空闲端口。
+    """
+
+    def __init__(
+        self,
+        default: ProviderBehavior | None = None,
+        behaviors: Optional[Dict[str, ProviderBehavior]] = None,
+        host: str = "127.0.0.1",
+        base_port: int = 0,
+        seed: Optional[int] = None,
+    ):
+        self.host = host
+        self.base_port = base_port
+        self.seed = seed
+        default = default or ProviderBehavior()
+        self.behaviors = {name: (behaviors or {}).get(name, default) for name in PROVIDERS}
+        self._servers: Dict[str, _ProviderServer] = {}
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "MockProviderCluster":
+        for offset, provider in enumerate(PROVIDERS):
+            port = self.base_port + offset if self.base_port else 0
+            seed = None if self.seed is None else self.seed + offset
+            server = _ProviderServer((self.host, port), provider, self.behaviors[provider], seed)
+            thread = threading.Thread(target=server.serve_forever, name=f"mock-{provider}", daemon=True)
+            thread.start()
+            self._servers[provider] = server
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+        self._threads.clear()
+
+    def __enter__(self) -> "MockProviderCluster":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def channel_base_urls(self) -> Dict[str, str]:
+        """渠道名 -> 指向模拟服务器的 base_url。"""
+        urls = {}
+        for provider, server in self._servers.items():
+            _, channel, path = PROVIDERS[provider]
+            host, port = server.server_address[:2]
+            urls[channel] = f"http://{host}:{port}{path}"
+        return urls
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """各提供商的请求数（``requests``）与按状态码的响应数。"""
+        return {
+            provider: {str(key): value for key, value in server.stats.items()}
+            for provider, server in self._servers.items()
+        }
+
+
+def load_behaviors(path: str, default: ProviderBehavior) -> Dict[str, ProviderBehavior]:
+    """从 JSON 文件读取按提供商覆盖的行为，如 ``{"youtube": {"error_rate": 0.1}}``。"""
+    with open(path, "r", encoding="utf-8") as fp:
+        data = json.load(fp)
+    fields = {field.name for field in dataclasses.fields(ProviderBehavior)}
+    behaviors = {}
+    for provider, overrides in data.items():
+        if provider not in PROVIDERS:
+            raise ValueError(f"未知的模拟提供商: {provider}（可选: {', '.join(PROVIDERS)}）")
+        behaviors[provider] = dataclasses.replace(
+            default, **{key: value for key, value in overrides.items() if key in fields}
+        )
+    return behaviors
+
+
+def add_behavior_arguments(parser: argparse.ArgumentParser) -> None:
+    """注册模拟行为相关的命令行参数（本模块与压测脚本共用）。"""
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="中位延迟（毫秒，默认 200）")
+    parser.add_argument("--p99-ms", type=float, default=1000.0, help="99 分位延迟（毫秒，默认 1000）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 5xx 的概率（默认 0）")
+    parser.add_argument("--rate-limit", type=float, default=None, help="每秒允许的请求数，超出返回 429")
+    parser.add_argument("--burst", type=int, default=5, help="限流突发容量（默认 5）")
+    parser.add_argument("--daily-quota", type=int, default=None, help="累计请求上限，用尽后一律返回 429")
+    parser.add_argument("--pages", type=int, default=3, help="支持分页的提供商最多返回的页数（默认 3）")
+    parser.add_argument("--profile", type=str, default=None, help="按提供商覆盖行为的 JSON 文件")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子（延迟与错误可复现）")
+
+
+def cluster_from_args(args: argparse.Namespace, host: str = "127.0.0.1", base_port: int = 0) -> MockProviderCluster:
+    default = ProviderBehavior(
+        latency_ms=args.latency_ms,
+        p99_latency_ms=args.p99_ms,
+        error_rate=args.error_rate,
+        rate_limit_per_second=args.rate_limit,
+        burst=args.burst,
+        daily_quota=args.daily_quota,
+        pages=args.pages,
+    )
+    behaviors = load_behaviors(args.profile, default) if args.profile else None
+    return MockProviderCluster(default, behaviors, host=host, base_port=base_port, seed=args.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地模拟搜索提供商服务器")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    parser.add_argument("--port", type=int, default=8900, help="起始端口，各提供商依次占用（默认 8900）")
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    cluster = cluster_from_args(args, host=args.host, base_port=args.port).start()
+    overrides = {channel: {"base_url": url} for channel, url in cluster.channel_base_urls().items()}
+    print("将以下内容写入 collector_config.json 的 channel_overrides 即可让采集器请求模拟服务器：")
+    print(json.dumps({"channel_overrides": overrides}, ensure_ascii=False, indent=2))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(cluster.stats(), ensure_ascii=False))
+        cluster.stop()
+
+
+if __name__ == "__main__":
+    main()
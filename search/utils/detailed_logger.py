@@ -1,13 +1,27 @@
-"""详细日志记录器 - 记录整个搜索流程的详细信息。"""
+"""详细日志记录器 - 记录整个搜索流程的详细信息。
 
+日志条目带上当前事件 ID（``bind_event`` 设置的 contextvar）。并发处理多个事件的常驻进程中，
+各事件的条目分开保存：``flush(event_id)`` 只取出该事件（及未绑定事件）的条目并追加写入日志文件。
+采集与验证的线程池提交任务时复制调用方的 contextvars，条目仍归属发起的事件。
+"""
+
+import contextvars
 import json
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+_current_event: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("detailed_log_event", default=None)
+
+
+def bind_event(event_id: Any) -> None:
+    """将当前上下文（线程/协程）中记录的日志条目归属到该事件。"""
+    _current_event.set(str(event_id) if event_id is not None else None)
+
 
 class DetailedLogger:
     """详细日志记录器，记录整个流程并保存到文件。"""
@@ -16,6 +30,13 @@ class DetailedLogger:
         self.output_file = Path(output_file)
         self.log_entries: List[Dict[str, Any]] = []
         self.current_section: Optional[str] = None
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        entry["event_id"] = _current_event.get()
+        with self._lock:
+            self.log_entries.append(entry)
 
     def start_section(self, title: str, description: str = ""):
         """开始一个新的日志部分。"""
@@ -26,7 +47,7 @@ class DetailedLogger:
             "description": description,
             "timestamp": datetime.now().isoformat(),
         }
-        self.log_entries.append(entry)
+        self._append(entry)
         logger.info("=" * 80)
         logger.info("开始: %s", title)
         if description:
@@ -40,7 +61,7 @@ class DetailedLogger:
             "data": event_data,
             "timestamp": datetime.now().isoformat(),
         }
-        self.log_entries.append(entry)
+        self._append(entry)
         logger.info("📥 输入事件数据:")
         logger.info(json.dumps(event_data, indent=2, ensure_ascii=False))
 
@@ -64,7 +85,7 @@ class DetailedLogger:
             "payload": payload,
             "timestamp": datetime.now().isoformat(),
         }
-        self.log_entries.append(entry)
+        self._append(entry)
         logger.info("🔍 搜索请求:")
         logger.info("  采集器: %s", collector_name)
         logger.info("  渠道: %s", channel)
@@ -90,7 +111,7 @@ class DetailedLogger:
             "filter_details": filter_details,
             "timestamp": datetime.now().isoformat(),
         }
-        self.log_entries.append(entry)
+        self._append(entry)
         logger.info("🔍 预过滤详情:")
         logger.info("  原始结果: %s 条", original_count)
         logger.info("  过滤后: %s 条", filtered_count)
@@ -126,7 +147,7 @@ class DetailedLogger:
             "sample_items": response_data[:3] if isinstance(response_data, list) and len(response_data) > 3 else response_data,
             "timestamp": datetime.now().isoformat(),
         }
-        self.log_entries.append(entry)
+        self._append(entry)
         logger.info("✅ 搜索响应:")
         logger.info("  采集器: %s", collector_name)
         logger.info("  渠道: %s", channel)
@@ -137,6 +158,27 @@ class DetailedLogger:
             for idx, item in enumerate(response_data[:3], 1):
                 logger.info("    [%s] %s", idx, json.dumps(item, indent=6, ensure_ascii=False))
 
+    def log_cache_hit(
+        self,
+        collector_name: str,
+        channel: str,
+        language: str,
+        cache_key: str,
+        age_seconds: float,
+    ):
+        """记录响应缓存命中（未发起网络请求）。"""
+        entry = {
+            "type": "cache_hit",
+            "collector": collector_name,
+            "channel": channel,
+            "language": language,
+            "cache_key": cache_key,
+            "age_seconds": round(age_seconds, 1),
+            "timestamp": datetime.now().isoformat(),
+        }
+        self._append(entry)
+        logger.info("💾 响应缓存命中: %s / %s / %s（缓存时长 %.0fs）", collector_name, channel, language, age_seconds)
+
     def log_llm_request(
         self,
         step: str,
@@ -157,7 +199,7 @@ class DetailedLogger:
             "config": config,
             "timestamp": datetime.now().isoformat(),
         }
-        self.log_entries.append(entry)
+        self._append(entry)
         logger.info("🤖 LLM 请求 (步骤 %s: %s):", step_number, step)
         logger.info("  提供商: %s", provider)
         logger.info("  模型: %s", model)
@@ -191,7 +233,7 @@ class DetailedLogger:
             "token_usage": token_usage,
             "timestamp": datetime.now().isoformat(),
         }
-        self.log_entries.append(entry)
+        self._append(entry)
         logger.info("🤖 LLM 响应 (步骤 %s: %s):", step_number, step)
         logger.info("  提供商: %s", provider)
         logger.info("  原始响应长度: %s 字符", len(raw_response) if raw_response else 0)
@@ -221,7 +263,7 @@ class DetailedLogger:
             "description": description,
             "timestamp": datetime.now().isoformat(),
         }
-        self.log_entries.append(entry)
+        self._append(entry)
         logger.info("⚙️ 处理步骤: %s", step_name)
         if description:
             logger.info("  描述: %s", description)
@@ -255,21 +297,44 @@ class DetailedLogger:
             "error_details": error_details,
             "timestamp": datetime.now().isoformat(),
         }
-        self.log_entries.append(entry)
+        self._append(entry)
         logger.error("❌ 错误: %s", error_type)
         logger.error("  消息: %s", error_message)
         if error_details:
             logger.error("  详情: %s", json.dumps(error_details, indent=4, ensure_ascii=False))
 
-    def save_to_file(self):
-        """保存日志到文件。"""
+    def flush(self, event_id: Any = None):
+        """取出某事件的条目追加写入日志文件（常驻进程每个事件后调用，避免条目无限累积）。
+
+        未绑定事件的条目一并取出；event_id 为 None 时取出全部条目。其它并发事件的条目保留。
+        """
+        key = str(event_id) if event_id is not None else None
+        with self._lock:
+            if key is None:
+                entries, self.log_entries = self.log_entries, []
+            else:
+                entries = [e for e in self.log_entries if e.get("event_id") in (key, None)]
+                self.log_entries = [e for e in self.log_entries if e.get("event_id") not in (key, None)]
+        if entries:
+            self.save_to_file(entries, title=f"事件 {key} 详细流程日志" if key else None, append=True)
+
+    def save_to_file(
+        self,
+        entries: Optional[List[Dict[str, Any]]] = None,
+        title: Optional[str] = None,
+        append: bool = False,
+    ):
+        """保存日志到文件；append 为 True 时追加到文件末尾（常驻进程按事件追加）。"""
+        if entries is None:
+            with self._lock:
+                entries = list(self.log_entries)
         try:
-            with open(self.output_file, "w", encoding="utf-8") as f:
-                f.write("# 详细流程日志\n\n")
+            with self._file_lock, open(self.output_file, "a" if append else "w", encoding="utf-8") as f:
+                f.write(f"# {title or '详细流程日志'}\n\n")
                 f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
                 f.write("---\n\n")
 
-                for entry in self.log_entries:
+                for entry in entries:
                     entry_type = entry.get("type", "unknown")
                     timestamp = entry.get("timestamp", "")
 
@@ -341,6 +406,15 @@ class DetailedLogger:
                                 f.write(json.dumps(item, indent=2, ensure_ascii=False))
                                 f.write("\n```\n\n")
 
+                    elif entry_type == "cache_hit":
+                        f.write(f"### 💾 缓存命中: {entry.get('collector', 'Unknown')}\n\n")
+                        f.write(f"**时间**: {timestamp}\n\n")
+                        f.write(f"- **渠道**: {entry.get('channel', 'Unknown')}\n")
+                        f.write(f"- **语言**: {entry.get('language', 'Unknown')}\n")
+                        f.write(f"- **缓存键**: `{entry.get('cache_key', '')[:16]}`\n")
+                        f.write(f"- **缓存时长**: {entry.get('age_seconds', 0)} 秒\n\n")
+                        f.write("---\n\n")
+
                     elif entry_type == "llm_request":
                         f.write(f"### 🤖 LLM 请求: 步骤 {entry.get('step_number', '?')} - {entry.get('step', 'Unknown')}\n\n")
                         f.write(f"**时间**: {timestamp}\n\n")
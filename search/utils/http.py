@@ -0,0 +1,139 @@
+"""进程内共享的 HTTP 传输。
+
+采集器、LLM 客户端与 test_api_keys.py 过去各自创建 ``requests.Session`` 或 SDK 自带的客户端，
+批量处理事件时同一主机的 TCP/TLS 连接无法复用。这里集中提供：
+
+- ``get_session()``：每个线程一个 ``requests.Session``（Session 的 cookie 与状态不是线程安全的），
+  各线程的会话挂载同一个 ``HTTPAdapter``，urllib3 按主机维护的 keep-alive 连接池仍在进程内共享，
+  池大小由 ``HTTP_POOL_CONNECTIONS``（缓存的主机数）与 ``HTTP_POOL_MAXSIZE``（每主机连接数）控制；
+- ``get_httpx_client()``：共享的同步 ``httpx.Client``，供 OpenAI SDK 通过 ``http_client`` 复用；
+- DNS 缓存：``HTTP_DNS_CACHE_SECONDS`` > 0 时缓存 ``socket.getaddrinfo`` 结果（仅缓存成功解析），
+  对 requests、httpx 与各 SDK 同样生效；条目数超过 ``_DNS_CACHE_MAX_ENTRIES`` 时先清除过期条目，
+  仍超出则淘汰最早写入的条目。
+"""
+
+from __future__ import annotations
+
+import logging
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config.settings import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_adapter: Optional[HTTPAdapter] = None
+_local = threading.local()
+_httpx_client = None
+
+_original_getaddrinfo = socket.getaddrinfo
+_dns_cache: Dict[Tuple[Any, ...], Tuple[float, Any]] = {}
+_dns_lock = threading.Lock()
+_dns_ttl = 0.0
+_DNS_CACHE_MAX_ENTRIES = 1024
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    hit = _dns_cache.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+    result = _original_getaddrinfo(host, port, family, type, proto, flags)
+    with _dns_lock:
+        _dns_cache.pop(key, None)
+        if len(_dns_cache) >= _DNS_CACHE_MAX_ENTRIES:
+            for stale in [k for k, (expires, _) in _dns_cache.items() if expires <= now]:
+                del _dns_cache[stale]
+            # 仍然超出时按写入顺序淘汰最早的条目
+            while len(_dns_cache) >= _DNS_CACHE_MAX_ENTRIES:
+                del _dns_cache[next(iter(_dns_cache))]
+        _dns_cache[key] = (now + _dns_ttl, result)
+    return result
+
+
+def install_dns_cache(ttl_seconds: float) -> None:
+    """启用（ttl > 0）或关闭进程级 DNS 缓存。"""
+    global _dns_ttl
+    _dns_ttl = ttl_seconds
+    if ttl_seconds > 0:
+        socket.getaddrinfo = _cached_getaddrinfo
+    else:
+        socket.getaddrinfo = _original_getaddrinfo
+        with _dns_lock:
+            _dns_cache.clear()
+
+
+def _get_adapter(config: Settings) -> HTTPAdapter:
+    """获取进程共享的 HTTPAdapter（首次调用时按配置创建连接池并启用 DNS 缓存）。"""
+    global _adapter
+    with _lock:
+        if _adapter is None:
+            install_dns_cache(config.HTTP_DNS_CACHE_SECONDS)
+            _adapter = HTTPAdapter(
+                pool_connections=config.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=config.HTTP_POOL_MAXSIZE,
+            )
+            logger.debug(
+                "已创建共享 HTTP 连接池（主机池 %s，每主机连接 %s）",
+                config.HTTP_POOL_CONNECTIONS,
+                config.HTTP_POOL_MAXSIZE,
+            )
+        return _adapter
+
+
+def get_session(config: Settings | None = None) -> requests.Session:
+    """获取当前线程的 requests.Session；各线程的会话共享同一个 HTTPAdapter（连接池）。
+
+    会话不要跨线程保存复用，每次请求前调用本函数取得。
+    """
+    adapter = _adapter or _get_adapter(config or settings)
+    session = getattr(_local, "session", None)
+    # close_all() 之后 adapter 会重建，旧会话随之替换
+    if session is None or session.get_adapter("https://") is not adapter:
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+def get_httpx_client(config: Settings | None = None):
+    """获取共享的同步 httpx.Client；未安装 httpx 时返回 None（调用方使用 SDK 默认客户端）。"""
+    global _httpx_client
+    config = config or settings
+    try:
+        import httpx
+    except ImportError:
+        logger.debug("未安装 httpx，SDK 使用其默认 HTTP 客户端")
+        return None
+    with _lock:
+        if _httpx_client is None:
+            install_dns_cache(config.HTTP_DNS_CACHE_SECONDS)
+            limits = httpx.Limits(
+                max_connections=config.HTTP_POOL_MAXSIZE,
+                max_keepalive_connections=config.HTTP_POOL_MAXSIZE,
+                keepalive_expiry=config.ASYNC_HTTP_KEEPALIVE_SECONDS,
+            )
+            # 超时由 SDK 在每次请求时传入
+            _httpx_client = httpx.Client(limits=limits, timeout=None, follow_redirects=True)
+        return _httpx_client
+
+
+def close_all() -> None:
+    """关闭共享会话与客户端（测试或进程退出前调用）。"""
+    global _adapter, _httpx_client
+    with _lock:
+        # 各线程的会话在下次 get_session() 时发现 adapter 已更换并重建
+        if _adapter is not None:
+            _adapter.close()
+            _adapter = None
+        if _httpx_client is not None:
+            _httpx_client.close()
+            _httpx_client = None
@@ -0,0 +1,279 @@
+"""降雨事件常驻监听进程。
+
+``deep_search.py`` 默认处理一次即退出，每次启动都要重新导入模块、创建 LLM 客户端与缓存连接。
+常驻模式下由 ``WatcherDaemon`` 按 ``POLL_INTERVAL_SECONDS`` 轮询
+``RainEventWatcher.fetch_pending_events``，认领事件后放入工作队列，交给共享同一个
+``SearchWorkflow`` 的工作线程处理，导入、客户端与缓存在事件之间保持复用。
+
+认领记录保存在 SQLite（``SEARCH_CACHE_DIR/event_claims.sqlite3``），同一主机上的多个常驻进程
+共享：
+
+- 认领是一条原子的 upsert，只有插入成功或接管已过期记录的一方拿到事件；
+- 处理中的认领在 ``DAEMON_CLAIM_TTL_SECONDS`` 后过期（进程崩溃后事件可被重新认领）；
+- 处理失败的事件在 ``DAEMON_RETRY_DELAY_SECONDS`` 后才重试；
+- 处理完成的事件在回溯窗口（``MAX_EVENT_LOOKBACK_HOURS``）内不再认领，即使回写 processed 标记失败。
+
+每个进程只认领能在短时间内开始处理的事件（队列长度不超过工作线程数），其余事件留给其它进程。
+
+常驻模式没有 Node.js 读取 stdout：事件标记为已处理之前，报告写入 ``search_outputs/YYYYMMDD/``，
+表2数据直接写入 ``rain_flood_impact``；任一步失败时事件不标记，按失败重试。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import signal
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import Settings, settings
+from .rain_event_watcher import RainEvent
+
+logger = logging.getLogger(__name__)
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class EventClaims:
+    """基于 SQLite 的事件认领表（跨进程共享）。"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS event_claims (
+                event_id TEXT PRIMARY KEY,
+                worker TEXT NOT NULL,
+                state TEXT NOT NULL,
+                claimed_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+
+    def claim(self, event_id: str, worker: str, ttl_seconds: float) -> bool:
+        """认领事件；已被认领且未过期时返回 False。"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO event_claims (event_id, worker, state, claimed_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(event_id) DO UPDATE SET
+                    worker = excluded.worker,
+                    state = excluded.state,
+                    claimed_at = excluded.claimed_at,
+                    expires_at = excluded.expires_at
+                WHERE event_claims.expires_at <= excluded.claimed_at
+                """,
+                (event_id, worker, RUNNING, now, now + ttl_seconds),
+            )
+            return cursor.rowcount == 1
+
+    def finish(self, event_id: str, worker: str, state: str, hold_seconds: float) -> None:
+        """将本进程的认领标记为完成/失败，并在 hold_seconds 内保持（不再被认领）。"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE event_claims SET state = ?, expires_at = ? WHERE event_id = ? AND worker = ?",
+                (state, time.time() + hold_seconds, event_id, worker),
+            )
+
+    def release(self, event_id: str, worker: str) -> None:
+        """放弃本进程的认领（未开始处理的事件），其它进程可立即认领。"""
+        with self._lock:
+            self._conn.execute("DELETE FROM event_claims WHERE event_id = ? AND worker = ?", (event_id, worker))
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM event_claims WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class WatcherDaemon:
+    """轮询待处理事件、认领并交给工作线程处理的常驻进程。"""
+
+    def __init__(self, config: Settings | None = None, workers: int | None = None, workflow=None):
+        self.config = config or settings
+        if workflow is None:
+            from ..orchestrator.workflow import SearchWorkflow
+
+            workflow = SearchWorkflow(self.config)
+        self.workflow = workflow
+        # 没有 Node.js 读取 stdout：报告与表2数据在标记事件已处理前由工作流直接保存
+        self.workflow.store_outputs = True
+        self.workers = max(1, workers or self.config.DAEMON_WORKERS)
+        self.claims = EventClaims(Path(self.config.SEARCH_CACHE_DIR) / "event_claims.sqlite3")
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._queue: "queue.Queue[Optional[RainEvent]]" = queue.Queue()
+        self._stop = threading.Event()
+        # 工作线程空闲且上次轮询仍有未认领事件时提前唤醒轮询
+        self._wakeup = threading.Event()
+        self._backlog = False
+        # 已认领但尚未处理完的事件数（队列中 + 处理中）
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self.stats: Dict[str, int] = {"polls": 0, "claimed": 0, "completed": 0, "failed": 0}
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+    def run(self) -> None:
+        """启动工作线程并轮询，直到 ``stop`` 被调用（或收到 SIGINT/SIGTERM）。"""
+        self._install_signal_handlers()
+        logger.info(
+            "常驻模式启动：%s 个工作线程，轮询间隔 %ss（%s）",
+            self.workers,
+            self.config.POLL_INTERVAL_SECONDS,
+            self.worker_id,
+        )
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"daemon-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.poll_once()
+                except Exception:
+                    logger.exception("轮询待处理事件失败")
+                self._wakeup.wait(self.config.POLL_INTERVAL_SECONDS)
+                self._wakeup.clear()
+        finally:
+            self._shutdown()
+
+    def stop(self) -> None:
+        """请求退出：不再认领新事件，正在处理的事件完成后退出。"""
+        self._stop.set()
+        self._wakeup.set()
+
+    def poll_once(self) -> int:
+        """拉取待处理事件并认领（最多补满工作队列），返回本次认领的事件数。
+
+        每次只拉取空闲工作线程数的事件，watcher 的游标不会越过本进程未认领的事件；
+        被其它进程认领的事件跳过后继续拉取，直到补满或读到末尾。
+        """
+        self.stats["polls"] += 1
+        self.claims.purge_expired()
+        watcher = self.workflow.watcher
+        claimed = 0
+        backlog = False
+        while not self._stop.is_set():
+            free = self.workers - self._inflight_count()
+            if free <= 0:
+                backlog = True
+                break
+            events = watcher.fetch_pending_events(limit=free)
+            for event in events:
+                if not self.claims.claim(str(event.event_id), self.worker_id, self.config.DAEMON_CLAIM_TTL_SECONDS):
+                    continue
+                with self._inflight_lock:
+                    self._inflight += 1
+                self._queue.put(event)
+                claimed += 1
+            if len(events) < free:
+                break
+        self._backlog = backlog
+        self.stats["claimed"] += claimed
+        if claimed:
+            logger.info("认领 %s 个事件", claimed)
+        return claimed
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+    def _worker_loop(self) -> None:
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            try:
+                self._handle(event)
+            finally:
+                self._flush_detailed_log(event.event_id)
+                with self._inflight_lock:
+                    self._inflight -= 1
+                if self._backlog:
+                    self._wakeup.set()
+
+    def _handle(self, event: RainEvent) -> None:
+        event_id = str(event.event_id)
+        started = time.monotonic()
+        try:
+            context = self.workflow.process_event(event)
+        except Exception:
+            logger.exception("处理降雨事件 %s 时出错", event_id)
+            context = None
+        if context is None:
+            with self._inflight_lock:
+                self.stats["failed"] += 1
+            self.claims.finish(event_id, self.worker_id, FAILED, self.config.DAEMON_RETRY_DELAY_SECONDS)
+            logger.warning("事件 %s 处理失败，%ss 后重试", event_id, self.config.DAEMON_RETRY_DELAY_SECONDS)
+            return
+        with self._inflight_lock:
+            self.stats["completed"] += 1
+        self.claims.finish(event_id, self.worker_id, DONE, self.config.MAX_EVENT_LOOKBACK_HOURS * 3600)
+        logger.info("事件 %s 处理完成（%.1fs）", event_id, time.monotonic() - started)
+
+    @staticmethod
+    def _flush_detailed_log(event_id: Any) -> None:
+        """每个事件后追加写出并清空该事件的详细日志（进程级单例，常驻进程中不清空会无限增长）。
+
+        只取出该事件的条目，其它并发事件的条目留到各自完成时写出。
+        """
+        from ..utils.detailed_logger import get_detailed_logger
+
+        try:
+            get_detailed_logger().flush(event_id)
+        except Exception:
+            logger.debug("写出详细日志失败", exc_info=True)
+
+    def _inflight_count(self) -> int:
+        with self._inflight_lock:
+            return self._inflight
+
+    def _shutdown(self) -> None:
+        # 尚未开始处理的事件放弃认领，留给其它进程
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is not None:
+                self.claims.release(str(event.event_id), self.worker_id)
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+        self.workflow.watcher.close()
+        logger.info(
+            "常驻模式退出：轮询 %s 次，认领 %s，完成 %s，失败 %s",
+            self.stats["polls"],
+            self.stats["claimed"],
+            self.stats["completed"],
+            self.stats["failed"],
+        )
+
+    def _install_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        def handle(signum, _frame):
+            logger.info("收到信号 %s，等待正在处理的事件完成后退出", signum)
+            self.stop()
+
+        for name in ("SIGINT", "SIGTERM"):
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), handle)
@@ -3,21 +3,38 @@
 负责从 ``rain_events`` 表中拉取待处理的降雨记录，结合配置阈值过滤，
 并在处理完成后回写状态。默认实现以 SQLite 为主，其他数据库类型
 可在后续扩展对应适配器。
+
+降雨量阈值、回溯窗口、排序与条数上限都在 SQL 中完成，只查询需要的列，并使用
+(时间, ID) 的高水位游标分页：每次轮询从上次返回的最后一条之后继续，读到末尾后回到窗口起点
+（重新扫描失败或迟到的事件）。表上按需创建仅包含未处理记录的部分索引
+``idx_re_pending``，每次轮询的开销与批大小相关，而与表大小无关。
+
+数据库连接按线程复用（WAL、``synchronous=NORMAL``、``busy_timeout``、``mmap_size``），与共享
+同一数据库文件的 Node API 读写互不阻塞。多个事件同时完成时，已处理标记合并在一个事务中写入。
 """
 
 from __future__ import annotations
 
 import logging
 import sqlite3
+import threading
+import weakref
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from ..config.settings import Settings, settings
 
 logger = logging.getLogger(__name__)
 
+# 依次尝试的事件 ID 列名
+_ID_COLUMNS = ("rain_event_id", "id", "event_id")
+# 除配置的列外，下游使用的附加列（存在时才查询，写入 RainEvent.extras）
+_EXTRA_COLUMNS = ("province", "threshold", "seq", "return_period_band")
+# 表2（处理结果）表名，与 Node API 的表结构一致
+_IMPACT_TABLE = "rain_flood_impact"
+
 
 @dataclass
 class RainEvent:
@@ -52,11 +69,38 @@ class RainEvent:
         return self.as_dict()
 
 
+class _ThreadConnection:
+    """线程局部连接的持有者（sqlite3.Connection 不支持弱引用）。"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def close(self) -> None:
+        try:
+            self.connection.close()
+        except sqlite3.Error:
+            pass
+
+
 class RainEventWatcher:
     """轮询 ``rain_events`` 表并挑选需处理事件。"""
 
     def __init__(self, config: Settings | None = None):
         self.config = config or settings
+        # 高水位游标：上次返回的最后一条记录的 (时间, ID)
+        self._cursor: Optional[Tuple[Any, Any]] = None
+        # (ID 列, 查询列) ，首次查询时根据表结构确定
+        self._columns: Optional[Tuple[str, List[str]]] = None
+        self._table_columns: set = set()
+        # 按线程复用的连接（线程结束后随线程局部变量释放），close() 时统一关闭
+        self._db_path: Optional[Path] = None
+        self._local = threading.local()
+        self._connections: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        # 待写入的已处理标记：持有写锁的线程一次写入所有排队的标记（组提交）
+        self._pending_marks: List[Tuple[RainEvent, datetime]] = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
 
         if self.config.DB_DIALECT != "sqlite":
             logger.warning(
@@ -67,33 +111,32 @@ class RainEventWatcher:
     # ------------------------------------------------------------------
     # 对外接口
     # ------------------------------------------------------------------
-    def fetch_pending_events(self) -> List[RainEvent]:
-        """拉取符合阈值且未处理的事件。"""
+    def fetch_pending_events(self, limit: Optional[int] = None) -> List[RainEvent]:
+        """按时间顺序拉取符合阈值且未处理的下一批事件（最多 limit 条，默认 ``BATCH_LIMIT``）。"""
 
-        rows = list(self._iter_sqlite_rows())
+        limit = limit or self.config.BATCH_LIMIT
         cutoff = datetime.utcnow() - timedelta(
             hours=self.config.MAX_EVENT_LOOKBACK_HOURS
         )
 
+        rows = list(self._iter_sqlite_rows(cutoff, limit))
+        if len(rows) < limit:
+            # 已读到末尾，下次轮询回到窗口起点
+            self._cursor = None
+        else:
+            last = rows[-1]
+            self._cursor = (last[self.config.EVENT_TIME_COLUMN], last[self._columns[0]])
+
         filtered: List[RainEvent] = []
         for row in rows:
             event = self._row_to_event(row)
 
-            if event.rainfall_mm is None or event.rainfall_mm < self.config.MIN_RAINFALL_MM:
-                continue
-
+            # SQL 按文本比较时间，这里按解析后的时间再精确过滤一次
             if event.event_time and event.event_time < cutoff:
                 continue
 
             filtered.append(event)
 
-        filtered.sort(
-            key=lambda e: e.event_time or datetime.min,
-        )
-
-        if len(filtered) > self.config.BATCH_LIMIT:
-            filtered = filtered[: self.config.BATCH_LIMIT]
-
         logger.debug("筛选待处理事件数量: %s", len(filtered))
         return filtered
 
@@ -102,38 +145,103 @@ class RainEventWatcher:
         event: RainEvent,
         processed_at: Optional[datetime] = None,
     ) -> None:
-        """标记事件已处理完毕。"""
+        """标记事件已处理完毕。
+
+        并发完成的事件合并写入：排队后等待写锁，持有写锁的线程在一个事务中写入当前排队的
+        所有标记，返回时本事件的标记已写入。
+        """
 
-        processed_at = processed_at or datetime.utcnow()
         if self.config.DB_DIALECT != "sqlite":
             return
 
+        with self._pending_lock:
+            self._pending_marks.append((event, processed_at or datetime.utcnow()))
+        with self._write_lock:
+            with self._pending_lock:
+                batch, self._pending_marks = self._pending_marks, []
+            if batch:
+                self._write_completed(batch)
+
+    def mark_events_completed(
+        self,
+        events: Iterable[RainEvent],
+        processed_at: Optional[datetime] = None,
+    ) -> None:
+        """在一个事务中将多个事件标记为已处理。"""
+
+        if self.config.DB_DIALECT != "sqlite":
+            return
+
+        processed_at = processed_at or datetime.utcnow()
+        batch = [(event, processed_at) for event in events]
+        if batch:
+            with self._write_lock:
+                self._write_completed(batch)
+
+    def save_flood_impact(self, record: Dict[str, Any]) -> None:
+        """写入（或更新）一条表2（rain_flood_impact）记录。
+
+        一次性运行时表2数据经 stdout 交给 Node.js 写入；常驻模式没有读取方，由这里直接写入。
+        只写入表中存在的列，失败时抛出异常（调用方据此不标记事件为已处理）。
+        """
+
+        if self.config.DB_DIALECT != "sqlite":
+            raise RuntimeError(f"{self.config.DB_DIALECT} 不支持写入表2")
+
+        with self._sqlite_connection() as conn:
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({_IMPACT_TABLE})")}
+            if not existing:
+                raise sqlite3.OperationalError(f"no such table: {_IMPACT_TABLE}")
+            columns = [name for name in record if name in existing]
+            updates = [f"{name} = excluded.{name}" for name in columns if name != "rain_event_id"]
+            if "updated_at" in existing:
+                updates.append("updated_at = datetime('now')")
+            conn.execute(
+                f"INSERT INTO {_IMPACT_TABLE} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT(rain_event_id) DO UPDATE SET {', '.join(updates)}",
+                [record[name] for name in columns],
+            )
+        logger.info("已写入表2记录: %s", record.get("rain_event_id"))
+
+    def close(self) -> None:
+        """关闭所有线程的数据库连接。"""
+        with self._connections_lock:
+            holders = list(self._connections)
+            self._connections.clear()
+        for holder in holders:
+            holder.close()
+        self._local = threading.local()
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+    def _write_completed(self, batch: List[Tuple[RainEvent, datetime]]) -> None:
         try:
             with self._sqlite_connection() as conn:
-                cursor = conn.cursor()
-                query = (
-                    f"UPDATE {self.config.RAIN_EVENTS_TABLE} "
-                    f"SET {self.config.PROCESSED_FLAG_COLUMN} = 1, "
-                    f"{self.config.PROCESSED_AT_COLUMN} = ? "
-                    f"WHERE rain_event_id = ?"
-                )
-                cursor.execute(
-                    query,
-                    (
-                        processed_at.isoformat(timespec="seconds"),
-                        event.event_id,
-                    ),
+                id_column, _ = self._prepare_table(conn)
+                assignments = f"{self.config.PROCESSED_FLAG_COLUMN} = 1"
+                if self.config.PROCESSED_AT_COLUMN in self._table_columns:
+                    assignments += f", {self.config.PROCESSED_AT_COLUMN} = :processed_at"
+                conn.executemany(
+                    f"UPDATE {self.config.RAIN_EVENTS_TABLE} SET {assignments} WHERE {id_column} = :event_id",
+                    [
+                        {"processed_at": processed_at.isoformat(timespec="seconds"), "event_id": event.event_id}
+                        for event, processed_at in batch
+                    ],
                 )
-                conn.commit()
+            logger.debug("已标记 %s 个事件为已处理", len(batch))
         except sqlite3.OperationalError as exc:
             logger.warning("更新 processed 标记失败（可能列不存在）: %s", exc)
         except Exception:
-            logger.exception("标记降雨事件 %s 为已处理时出错", event.event_id)
+            logger.exception(
+                "标记降雨事件 %s 为已处理时出错", ", ".join(str(event.event_id) for event, _ in batch)
+            )
+
+    def _resolve_db_path(self) -> Path:
+        if self._db_path is not None:
+            return self._db_path
 
-    # ------------------------------------------------------------------
-    # 内部实现
-    # ------------------------------------------------------------------
-    def _sqlite_connection(self) -> sqlite3.Connection:
         # 优先使用 DB_FILE，如果没有则使用默认路径（统一使用一个路径：apps/database/dev.db）
         db_file = self.config.DB_FILE
         if not db_file:
@@ -150,24 +258,107 @@ class RainEventWatcher:
 
         # 确保目录存在
         db_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        connection = sqlite3.connect(str(db_path))
+        self._db_path = db_path
+        return db_path
+
+    def _sqlite_connection(self) -> sqlite3.Connection:
+        """当前线程的数据库连接（首次使用时创建并设置 PRAGMA）。"""
+        holder = getattr(self._local, "holder", None)
+        if holder is not None:
+            return holder.connection
+
+        connection = sqlite3.connect(
+            str(self._resolve_db_path()),
+            timeout=self.config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+        )
         connection.row_factory = sqlite3.Row
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA busy_timeout={int(self.config.SQLITE_BUSY_TIMEOUT_MS)}")
+            connection.execute(f"PRAGMA mmap_size={int(self.config.SQLITE_MMAP_SIZE)}")
+        except sqlite3.DatabaseError as exc:
+            logger.warning("设置 SQLite PRAGMA 失败: %s", exc)
+
+        holder = _ThreadConnection(connection)
+        self._local.holder = holder
+        with self._connections_lock:
+            self._connections.add(holder)
         return connection
 
-    def _iter_sqlite_rows(self) -> Iterable[sqlite3.Row]:
+    def _pending_predicate(self) -> str:
+        # 与部分索引的 WHERE 子句保持字面一致，SQLite 才会使用该索引
+        flag = self.config.PROCESSED_FLAG_COLUMN
+        return f"({flag} IS NULL OR {flag} = 0)"
+
+    def _prepare_table(self, conn: sqlite3.Connection) -> Tuple[str, List[str]]:
+        """确定 ID 列与查询列，并创建未处理记录的部分索引（每个实例只执行一次）。"""
+        if self._columns is not None:
+            return self._columns
+
+        table = self.config.RAIN_EVENTS_TABLE
+        existing = [row["name"] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if not existing:
+            raise sqlite3.OperationalError(f"no such table: {table}")
+        self._table_columns = set(existing)
+        id_column = next((name for name in _ID_COLUMNS if name in existing), None)
+        if id_column is None:
+            raise sqlite3.OperationalError(f"{table} 缺少事件 ID 列（{'/'.join(_ID_COLUMNS)}）: {existing}")
+        wanted = [
+            id_column,
+            self.config.EVENT_TIME_COLUMN,
+            self.config.LOCATION_COLUMN,
+            self.config.COUNTRY_COLUMN,
+            self.config.LATITUDE_COLUMN,
+            self.config.LONGITUDE_COLUMN,
+            self.config.RAINFALL_COLUMN,
+            self.config.SEVERITY_COLUMN,
+            self.config.DATA_SOURCE_COLUMN,
+            *_EXTRA_COLUMNS,
+        ]
+        columns = list(dict.fromkeys(name for name in wanted if name in existing))
+
+        try:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_re_pending ON {table}"
+                f"({self.config.EVENT_TIME_COLUMN}, {id_column}) "
+                f"WHERE {self._pending_predicate()}"
+            )
+            conn.commit()
+        except sqlite3.DatabaseError as exc:
+            logger.warning("创建 %s 的未处理记录索引失败，查询将退化为全表扫描: %s", table, exc)
+
+        self._columns = (id_column, columns)
+        return self._columns
+
+    def _iter_sqlite_rows(self, cutoff: datetime, limit: int) -> Iterable[sqlite3.Row]:
         if self.config.DB_DIALECT != "sqlite":
             return []
 
         try:
             with self._sqlite_connection() as conn:
-                cursor = conn.cursor()
+                id_column, columns = self._prepare_table(conn)
+                time_column = self.config.EVENT_TIME_COLUMN
+                conditions = [
+                    self._pending_predicate(),
+                    f"{self.config.RAINFALL_COLUMN} >= ?",
+                    f"{time_column} >= ?",
+                ]
+                params: List[Any] = [
+                    self.config.MIN_RAINFALL_MM,
+                    cutoff.isoformat(sep=" ", timespec="seconds"),
+                ]
+                if self._cursor is not None:
+                    conditions.append(f"({time_column}, {id_column}) > (?, ?)")
+                    params.extend(self._cursor)
                 query = (
-                    f"SELECT * FROM {self.config.RAIN_EVENTS_TABLE} "
-                    f"WHERE {self.config.PROCESSED_FLAG_COLUMN} IS NULL "
-                    f"OR {self.config.PROCESSED_FLAG_COLUMN} = 0"
+                    f"SELECT {', '.join(columns)} FROM {self.config.RAIN_EVENTS_TABLE} "
+                    f"WHERE {' AND '.join(conditions)} "
+                    f"ORDER BY {time_column}, {id_column} LIMIT ?"
                 )
-                for row in cursor.execute(query):
+                params.append(limit)
+                for row in conn.execute(query, params):
                     yield row
         except sqlite3.OperationalError as exc:
             logger.error("查询 rain_events 表失败: %s", exc)